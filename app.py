@@ -3,17 +3,33 @@ import os
 sys.path.append(os.path.dirname(__file__))
 
 
+import threading
+from datetime import date, datetime, time
+
 import streamlit as st
 from services.student_manager import StudentManager
+from services.sharded_manager import ShardedStudentManager
+from services.history import History
+from services.tenants import TenantRegistry
+from services.instrumentation import profiler
+from services.metrics import start_exporters
 from ui.components import (
     render_add_student_form, 
     render_update_student_form, 
     render_student_table, 
+    render_sorted_directory,
     render_search_filters,
     render_dashboard_header,
-    render_statistics_overview
+    render_statistics_overview,
+    render_student_picker,
+    render_pending_popups,
+    render_performance_panel,
+    render_duplicate_review,
+    queue_popup
 )
 
+profiler.start_rerun()
+
 # Page configuration with custom theme
 st.set_page_config(
     page_title="Student Management System",
@@ -539,24 +555,122 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Initialize student manager
-if 'manager' not in st.session_state:
-    st.session_state.manager = StudentManager()
+history_enabled = os.environ.get('SMS_HISTORY') == '1'
+change_feed_enabled = history_enabled or os.environ.get('SMS_CHANGE_FEED') == '1'
+
+
+@st.cache_resource
+def get_tenant_registry(path):
+    """One registry shared by every session, so each school is loaded once per process"""
+    return TenantRegistry.from_path(
+        path,
+        memory_budget_mb=float(os.environ.get('SMS_TENANT_MEMORY_MB', 512)),
+        change_feed=change_feed_enabled
+    )
+
+
+@st.cache_resource
+def get_manager(data_file, encoding):
+    """One manager per data file shared by every session, like the tenant registry's"""
+    return StudentManager(data_file=data_file, encoding=encoding,
+                          background_load=True, change_feed=change_feed_enabled)
+
+
+@st.cache_resource
+def get_sharded_manager(data_dir):
+    """One sharded manager per shard directory shared by every session"""
+    return ShardedStudentManager(data_dir=data_dir, change_feed=change_feed_enabled)
+
+
+@st.cache_resource
+def get_histories():
+    """data file -> History, shared by every session so each feed has one subscriber"""
+    return threading.Lock(), {}
+
+
+def get_history(manager):
+    """
+    History for a manager's data file, created once per process
+
+    A tenant evicted and reloaded by the registry comes back as a new
+    manager; its old History is closed and replaced.
+    """
+    lock, histories = get_histories()
+    with lock:
+        history = histories.get(manager.data_file)
+        if history is not None and history.manager is not manager:
+            history.close()
+            history = None
+        if history is None:
+            history = histories[manager.data_file] = History(manager)
+        return history
+
+
+tenant_registry = None
+if os.environ.get('SMS_TENANTS'):
+    tenant_registry = get_tenant_registry(os.environ['SMS_TENANTS'])
+    with st.sidebar:
+        st.markdown("### 🏫 SCHOOL")
+        tenant = st.selectbox(
+            "School",
+            tenant_registry.keys(),
+            format_func=tenant_registry.name,
+            label_visibility="collapsed"
+        )
+    if st.session_state.get('tenant') != tenant:
+        # Selections and review state belong to the previous school
+        for key in ('duplicate_pairs', 'dismissed_pairs', 'delete_confirmation',
+                    'selected_student_for_deletion'):
+            st.session_state.pop(key, None)
+        st.session_state.tenant = tenant
+    # Resolve on every rerun: the registry may have evicted and reloaded the school
+    st.session_state.manager = tenant_registry.get(tenant)
+elif 'manager' not in st.session_state and os.environ.get('SMS_SHARD_DIR'):
+    st.session_state.manager = get_sharded_manager(os.environ['SMS_SHARD_DIR'])
+elif 'manager' not in st.session_state:
+    st.session_state.manager = get_manager(
+        os.environ.get('SMS_DATA_FILE', 'data/students.json'),
+        os.environ.get('SMS_DATA_ENCODING', 'pretty')
+    )
+history = None
+if history_enabled and not st.session_state.manager.is_loading():
+    history = get_history(st.session_state.manager)
+start_exporters()
 
 # Dashboard Header
 render_dashboard_header()
+render_pending_popups()
+
+if st.session_state.manager.is_loading():
+    st.info(f"⏳ Loading student records... "
+            f"{len(st.session_state.manager.get_all_students()):,} available so far")
 
 # Sidebar navigation
 with st.sidebar:
     st.markdown("### 🎯 NAVIGATION")
     page = st.radio(
         "Links",
-        ["📊 Dashboard", "👥 All Students", "➕ Add Student", "✏️ Update Student", "🗑️ Delete Student", "🔍 Search & Filter"],
+        ["📊 Dashboard", "👥 All Students", "➕ Add Student", "✏️ Update Student", "🗑️ Delete Student", "🔍 Search & Filter", "🧬 Duplicate Review"],
         label_visibility="collapsed"
     )
+    st.markdown("---")
+    show_performance = st.toggle("⏱️ Performance Panel", value=False)
+    as_of_date = None
+    if history is not None:
+        as_of_date = st.date_input("🕰️ View as of", value=date.today(), max_value=date.today(),
+                                   help="Show the Dashboard and Search pages as they were at the end of this day")
+
+# Read-only pages can show a past version of the roster
+view_manager = st.session_state.manager
+if as_of_date is not None and as_of_date < date.today():
+    try:
+        view_manager = history.as_of(datetime.combine(as_of_date, time.max))
+    except ValueError:
+        st.warning(f"🕰️ No history recorded as far back as {as_of_date}; showing the current roster.")
 
 # Dashboard
 if page == "📊 Dashboard":
-    render_statistics_overview(st.session_state.manager)
+    render_statistics_overview(view_manager)
 
 # View All Students
 elif page == "👥 All Students":
@@ -575,7 +689,7 @@ elif page == "👥 All Students":
             st.metric("⭐ Excellence", excellent)
         
         st.markdown("---")
-        render_student_table(students)
+        render_sorted_directory(st.session_state.manager)
     else:
         st.info("🎓 No students enrolled yet. Start by adding your first student!")
 
@@ -598,11 +712,13 @@ elif page == "🗑️ Delete Student":
     students = st.session_state.manager.get_all_students()
     
     if students:
-        student_options = {f"{s.student_id} - {s.name}": s.student_id for s in students}
-        selected = st.selectbox("📋 Select Student to Remove", options=list(student_options.keys()))
+        student_id = render_student_picker(
+            st.session_state.manager,
+            "📋 Select Student to Remove",
+            key="delete_picker"
+        )
         
-        if selected:
-            student_id = student_options[selected]
+        if student_id:
             student = st.session_state.manager.get_student_by_id(student_id)
             
             if student:
@@ -652,18 +768,15 @@ elif page == "🗑️ Delete Student":
                         if st.button("✅ Yes, Delete", type="primary", use_container_width=True):
                             student_name = student.name
                             if st.session_state.manager.delete_student(student_id):
-                                from ui.components import show_popup
                                 # Reset confirmation state
                                 st.session_state.delete_confirmation = False
                                 st.session_state.selected_student_for_deletion = None
-                                show_popup(
+                                queue_popup(
                                     "Student Removed",
                                     f"✅ {student_name} has been successfully removed from the system.",
                                     icon="🗑️",
                                     type="success"
                                 )
-                                import time
-                                time.sleep(1)
                                 st.rerun()
                             else:
                                 st.error("❌ Unable to delete student. Please try again.")
@@ -679,7 +792,13 @@ elif page == "🗑️ Delete Student":
 elif page == "🔍 Search & Filter":
     st.markdown("## 🔍 Advanced Search")
     st.markdown("*Find students using filters and search criteria*")
-    render_search_filters(st.session_state.manager)
+    render_search_filters(view_manager)
+
+# Duplicate Review
+elif page == "🧬 Duplicate Review":
+    st.markdown("## 🧬 Duplicate Review")
+    st.markdown("*Find students enrolled more than once and merge their records*")
+    render_duplicate_review(st.session_state.manager)
 
 # Footer
 st.markdown("---")
@@ -688,4 +807,16 @@ st.markdown("""
     <p style='font-size: 0.875rem; margin-bottom: 0.5rem;'>Student Management System • Premium Edition</p>
     <p style='font-size: 0.75rem; color: #cbd5e1;'>Built with Python & Streamlit • © 2024</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+if show_performance:
+    with st.sidebar:
+        render_performance_panel()
+
+# Record every rerun's total, whether or not the panel is open
+profiler.finish_rerun()
+
+# Keep refreshing while the roster streams in
+if st.session_state.manager.is_loading():
+    st.session_state.manager.wait_until_loaded(timeout=0.5)
+    st.rerun()
@@ -0,0 +1,206 @@
+"""
+HTTP API Throughput Benchmark
+Drives services.api with keep-alive clients and reports requests per second
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+from benchmarks.generator import write_roster
+from benchmarks.runner import collect_metadata
+from services.instrumentation import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Request mix: (name, weight); writes are opt-in because each one saves the file
+READ_MIX = [
+    ('get_student', 60),
+    ('query', 10),
+    ('fuzzy_search', 10),
+    ('sorted_page', 15),
+    ('stats', 5),
+]
+
+QUERIES = [
+    'grade in (10, 11) and performance >= Good and age between 15 and 17',
+    'performance = Poor and age < 8',
+    'name startswith "emma" and grade = Senior',
+]
+
+
+def _free_port():
+    """A port nothing is listening on right now"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _request_path(kind, rng, roster):
+    """Method, path and body for one request of a kind"""
+    if kind == 'get_student':
+        return 'GET', f"/students/BEN{rng.randrange(roster):07d}", None
+    if kind == 'query':
+        return 'GET', f"/query?q={quote(rng.choice(QUERIES))}", None
+    if kind == 'fuzzy_search':
+        return 'GET', f"/search?fuzzy=1&limit=10&q={rng.choice(['wiliams', 'jonson', 'tomas'])}", None
+    if kind == 'sorted_page':
+        key = rng.choice(['name', 'age', 'performance'])
+        return 'GET', f"/students?sort={key}&limit=20&offset={rng.randrange(roster // 2)}", None
+    if kind == 'stats':
+        return 'GET', '/stats', None
+    body = json.dumps({'performance': rng.choice(['Excellent', 'Good', 'Average'])})
+    return 'PATCH', f"/students/BEN{rng.randrange(roster):07d}", body
+
+
+def run_client(port, roster, duration, mix, seed):
+    """
+    One keep-alive connection issuing requests back to back
+
+    Returns:
+        dict: kind -> list of latencies in ms, plus error count
+    """
+    rng = random.Random(seed)
+    kinds = [kind for kind, _ in mix]
+    weights = [weight for _, weight in mix]
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    latencies = {kind: [] for kind in kinds}
+    errors = 0
+    stop_at = time.perf_counter() + duration
+    while time.perf_counter() < stop_at:
+        kind = rng.choices(kinds, weights)[0]
+        method, path, body = _request_path(kind, rng, roster)
+        started = time.perf_counter()
+        try:
+            headers = {'Content-Type': 'application/json'} if body else {}
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            continue
+        latencies[kind].append((time.perf_counter() - started) * 1000)
+    connection.close()
+    return {'latencies': latencies, 'errors': errors}
+
+
+def run_level(port, clients, roster, duration, mix, seed):
+    """
+    Run ``clients`` client processes at once
+
+    Returns:
+        dict: Throughput and latency summary for this level
+    """
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=clients) as pool:
+        futures = [pool.submit(run_client, port, roster, duration, mix, seed + i)
+                   for i in range(clients)]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - started
+
+    by_kind = {}
+    for result in results:
+        for kind, samples in result['latencies'].items():
+            by_kind.setdefault(kind, []).extend(samples)
+    every = sorted(ms for samples in by_kind.values() for ms in samples)
+    return {
+        'clients': clients,
+        'requests': len(every),
+        'errors': sum(result['errors'] for result in results),
+        'throughput_rps': round(len(every) / duration, 1),
+        'elapsed_s': round(elapsed, 3),
+        'p50_ms': round(percentile(every, 50), 3),
+        'p99_ms': round(percentile(every, 99), 3),
+        'mean_ms': round(statistics.fmean(every), 3) if every else 0,
+        'endpoints': {
+            kind: {'requests': len(samples),
+                   'p50_ms': round(percentile(sorted(samples), 50), 3),
+                   'p99_ms': round(percentile(sorted(samples), 99), 3)}
+            for kind, samples in by_kind.items() if samples
+        }
+    }
+
+
+def _wait_until_up(port, process, timeout=120):
+    """Poll /health until the server answers"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                connection.close()
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("API server did not start in time")
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Throughput benchmark for services.api")
+    parser.add_argument('--roster', type=int, default=10_000, help="Generated students")
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 4, 16],
+                        help="Concurrent keep-alive connections per level")
+    parser.add_argument('--duration', type=float, default=5.0, help="Seconds per level")
+    parser.add_argument('--workers', type=int, default=16, help="Server worker threads")
+    parser.add_argument('--write-ratio', type=float, default=0.0,
+                        help="Share of requests that PATCH a student (each saves the file)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    mix = list(READ_MIX)
+    if args.write_ratio > 0:
+        reads = sum(weight for _, weight in mix)
+        mix.append(('update_student', reads * args.write_ratio / (1 - args.write_ratio)))
+
+    report = {'meta': collect_metadata(), 'roster': args.roster, 'workers': args.workers,
+              'write_ratio': args.write_ratio, 'levels': []}
+    with tempfile.TemporaryDirectory(prefix='sms-api-') as workdir:
+        data_file = os.path.join(workdir, 'students.json')
+        write_roster(data_file, args.roster, args.seed)
+        port = _free_port()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'services.api', data_file, '--port', str(port),
+             '--workers', str(args.workers), '--encoding', 'compact'],
+            cwd=ROOT)
+        try:
+            _wait_until_up(port, server)
+            for clients in args.clients:
+                level = run_level(port, clients, args.roster, args.duration, mix, args.seed)
+                report['levels'].append(level)
+                print(f"clients={clients:<4} {level['throughput_rps']:>9} req/s  "
+                      f"p50 {level['p50_ms']:.2f} ms  p99 {level['p99_ms']:.2f} ms  "
+                      f"errors {level['errors']}", file=sys.stderr)
+        finally:
+            server.terminate()
+            server.wait()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
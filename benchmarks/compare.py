@@ -0,0 +1,207 @@
+"""
+Benchmark Regression Gate
+Compares fresh benchmark runs against a committed baseline
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+from benchmarks.memory import run_memory_size
+from benchmarks.runner import collect_metadata, run_size
+from benchmarks.scenarios import SCENARIOS
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+DEFAULT_CONFIG = {'sizes': [1_000, 10_000], 'repeat': 5, 'modes': ['time', 'memory']}
+
+DEFAULT_TOLERANCES = {
+    'time': 0.5,            # allowed fractional slowdown of min_ms
+    'memory': 0.1,          # allowed fractional growth of bytes_per_student
+    'min_delta_ms': 0.05,   # ignore timing changes smaller than this
+    'scenarios': {}         # per-scenario overrides, e.g. {"save_data": 1.0}
+}
+
+
+def _metric(result):
+    """The value compared for a result row and its unit"""
+    if result['scenario'].startswith('memory.'):
+        return result['bytes_per_student'], 'B/student'
+    # Interference only ever slows a repeat down, so the fastest one is
+    # the steadiest figure to gate on; older result files only have median_ms
+    return result.get('min_ms', result['median_ms']), 'ms'
+
+
+def run_benchmarks(config):
+    """
+    Run the time and memory benchmarks described by a baseline config
+
+    Args:
+        config (dict): sizes, repeat and modes
+
+    Returns:
+        list: Result rows in the runner's format
+    """
+    results = []
+    with tempfile.TemporaryDirectory(prefix='sms-gate-') as workdir:
+        for size in config['sizes']:
+            if 'time' in config['modes']:
+                results.extend(run_size(size, list(SCENARIOS), config['repeat'], workdir))
+            if 'memory' in config['modes']:
+                results.extend(run_memory_size(size, workdir))
+    return results
+
+
+def compare(baseline_results, current_results, tolerances):
+    """
+    Compare current results to the baseline
+
+    Args:
+        baseline_results (list): Baseline result rows
+        current_results (list): Fresh result rows
+        tolerances (dict): Tolerance settings (see DEFAULT_TOLERANCES)
+
+    Returns:
+        list: Comparison rows with a 'status' of ok, regressed, improved,
+        missing or new
+    """
+    baseline = {(r['scenario'], r['size']): r for r in baseline_results}
+    current = {(r['scenario'], r['size']): r for r in current_results}
+    overrides = tolerances.get('scenarios', {})
+
+    rows = []
+    for key in sorted(set(baseline) | set(current), key=lambda k: (k[1], k[0])):
+        scenario, size = key
+        row = {'scenario': scenario, 'size': size, 'baseline': None, 'current': None,
+               'change': None, 'limit': None, 'unit': '', 'status': 'ok'}
+        if key not in current:
+            row['status'] = 'missing'
+        elif key not in baseline:
+            row['status'] = 'new'
+        else:
+            old, unit = _metric(baseline[key])
+            new, _ = _metric(current[key])
+            kind = 'memory' if unit == 'B/student' else 'time'
+            limit = overrides.get(scenario, tolerances[kind])
+            change = (new - old) / old if old else 0.0
+            row.update(baseline=old, current=new, change=change, limit=limit, unit=unit)
+            small = kind == 'time' and abs(new - old) < tolerances['min_delta_ms']
+            if change > limit and not small:
+                row['status'] = 'regressed'
+            elif change < -limit and not small:
+                row['status'] = 'improved'
+        rows.append(row)
+    return rows
+
+
+def format_table(rows):
+    """
+    Render comparison rows as a fixed-width table
+
+    Args:
+        rows (list): Rows from compare()
+
+    Returns:
+        str: Table text
+    """
+    def fmt(value, unit):
+        return '-' if value is None else f"{value:,.3f} {unit}"
+
+    header = f"{'Scenario':<32}{'Size':>10}{'Baseline':>20}{'Current':>20}{'Change':>10}{'Limit':>8}  Status"
+    lines = [header, '-' * len(header)]
+    for row in rows:
+        change = '-' if row['change'] is None else f"{row['change']:+.0%}"
+        limit = '-' if row['limit'] is None else f"{row['limit']:.0%}"
+        status = row['status'].upper() if row['status'] == 'regressed' else row['status']
+        lines.append(f"{row['scenario']:<32}{row['size']:>10}"
+                     f"{fmt(row['baseline'], row['unit']):>20}{fmt(row['current'], row['unit']):>20}"
+                     f"{change:>10}{limit:>8}  {status}")
+    return "\n".join(lines)
+
+
+def load_baseline(path):
+    """Read the baseline file, filling in defaults for missing sections"""
+    if not os.path.exists(path):
+        return {'config': dict(DEFAULT_CONFIG), 'tolerances': dict(DEFAULT_TOLERANCES), 'results': []}
+    with open(path) as f:
+        baseline = json.load(f)
+    baseline.setdefault('config', dict(DEFAULT_CONFIG))
+    tolerances = dict(DEFAULT_TOLERANCES)
+    tolerances.update(baseline.get('tolerances', {}))
+    baseline['tolerances'] = tolerances
+    return baseline
+
+
+def _strip(result):
+    """Drop bulky per-run detail before storing a baseline"""
+    return {k: v for k, v in result.items() if k != 'top_allocators'}
+
+
+def _machine(meta):
+    """Fields identifying the machine a run was recorded on"""
+    return {key: meta.get(key) for key in ('python', 'platform', 'processor')}
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Fail when benchmarks regress against the baseline")
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--current', help="Compare this results JSON instead of running benchmarks")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Store the current results as the new baseline")
+    parser.add_argument('--allow-missing', action='store_true',
+                        help="Do not fail on baseline scenarios that did not run (e.g. the UI "
+                             "scenarios without streamlit/pandas installed)")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+
+    if args.current:
+        with open(args.current) as f:
+            current_results = json.load(f)['results']
+    else:
+        current_results = run_benchmarks(baseline['config'])
+
+    rows = compare(baseline['results'], current_results, baseline['tolerances'])
+    missing = [row for row in rows if row['status'] == 'missing']
+
+    if args.update_baseline:
+        if missing and not args.allow_missing:
+            print(f"{len(missing)} baseline scenario(s) did not run "
+                  f"({', '.join(sorted({row['scenario'] for row in missing}))}); install "
+                  "requirements.txt, or pass --allow-missing to drop them from the baseline")
+            return 1
+        baseline['meta'] = collect_metadata()
+        baseline['results'] = [_strip(r) for r in current_results]
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+            f.write('\n')
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    print(format_table(rows))
+
+    recorded_on = _machine(baseline.get('meta', {}))
+    if recorded_on != _machine(collect_metadata()):
+        print(f"\nNote: the baseline was recorded on {recorded_on}; timings are absolute, "
+              "so only compare runs on that machine (or re-record it locally first)")
+
+    regressed = [row for row in rows if row['status'] == 'regressed']
+    unchecked = [row for row in rows if row['status'] == 'new']
+    if regressed:
+        print(f"\n{len(regressed)} scenario(s) regressed beyond tolerance")
+    if unchecked:
+        print(f"\n{len(unchecked)} scenario(s) have no baseline; record them with --update-baseline")
+    if missing:
+        print(f"\n{len(missing)} baseline scenario(s) did not run; install requirements.txt"
+              + (" (allowed by --allow-missing)" if args.allow_missing else ""))
+    if regressed or unchecked or (missing and not args.allow_missing):
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
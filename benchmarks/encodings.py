@@ -0,0 +1,75 @@
+"""
+Encoding Benchmarks
+Size and throughput trade-offs of each data-file encoding
+"""
+
+import os
+import sys
+import time
+
+from benchmarks.generator import generate_students
+from services import storage
+from services.columnar import SNAPSHOT_EXTENSION, ColumnarSnapshot, write_snapshot
+
+
+def _best_of(func, repeat):
+    """Fastest of ``repeat`` calls, in milliseconds"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_encodings_size(size, workdir, repeat=3, seed=42):
+    """
+    Time save and load for every encoding and JSON backend
+
+    Args:
+        size (int): Number of students
+        workdir (str): Directory for the encoded files
+        repeat (int): Calls per measurement (best is kept)
+        seed (int): Generator seed
+
+    Returns:
+        list: One result dict per encoding/backend pair
+    """
+    records = list(generate_students(size, seed))
+    backends = [('json', False)] + ([('orjson', True)] if storage.orjson is not None else [])
+
+    results = []
+    for encoding in storage.ENCODINGS:
+        for backend, fast in backends:
+            path = os.path.join(workdir, f"students_{size}.{encoding}.{backend}")
+            save_ms = _best_of(lambda: storage.write_records(path, records, encoding, fast), repeat)
+            load_ms = _best_of(lambda: storage.read_records(path, fast), repeat)
+            results.append({
+                'scenario': f"encoding.{encoding}.{backend}",
+                'size': size,
+                'file_bytes': os.path.getsize(path),
+                'save_ms': round(save_ms, 3),
+                'load_ms': round(load_ms, 3)
+            })
+
+    path = os.path.join(workdir, f"students_{size}{SNAPSHOT_EXTENSION}")
+
+    def load_snapshot():
+        with ColumnarSnapshot(path) as snapshot:
+            list(snapshot)
+    save_ms = _best_of(lambda: write_snapshot(path, records), repeat)
+    load_ms = _best_of(load_snapshot, repeat)
+    results.append({
+        'scenario': 'encoding.snapshot',
+        'size': size,
+        'file_bytes': os.path.getsize(path),
+        'save_ms': round(save_ms, 3),
+        'load_ms': round(load_ms, 3)
+    })
+
+    for result in results:
+        print(f"{result['scenario']:>28} n={size:<9} {result['file_bytes']:>12,} B  "
+              f"save {result['save_ms']:>9.2f} ms  load {result['load_ms']:>9.2f} ms",
+              file=sys.stderr)
+    return results
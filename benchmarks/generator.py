@@ -0,0 +1,93 @@
+"""
+Synthetic Roster Generator
+Deterministic generator of students that pass every Validator rule
+"""
+
+import json
+import random
+
+from models.schema import SCHEMA_VERSION, VERSION_FIELD
+
+FIRST_NAMES = ['Alice', 'Bob', 'Carol', 'David', 'Emma', 'Frank', 'Grace', 'Henry',
+               'Isabella', 'Jack', 'Karen', 'Liam', 'Mia', 'Noah', 'Olivia', 'Peter',
+               'Quinn', 'Ruby', 'Samuel', 'Tara', 'Uma', 'Victor', 'Wendy', 'Xavier',
+               'Yara', 'Zane']
+
+LAST_NAMES = ['Johnson', 'Smith', 'Williams', 'Brown', 'Davis', 'Miller', 'Wilson',
+              'Moore', 'Taylor', 'Anderson', 'Thomas', 'Jackson', 'White', 'Harris',
+              'Martin', 'Thompson', 'Garcia', 'Martinez', 'Robinson', 'Clark',
+              'Rodriguez', 'Lewis', 'Lee', 'Walker', 'Hall', 'Allen']
+
+GRADES = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12',
+          'KG', 'Nursery', 'Pre-K', 'Freshman', 'Sophomore', 'Junior', 'Senior']
+
+PERFORMANCE_LEVELS = ['Excellent', 'Good', 'Average', 'Below Average', 'Poor']
+
+EMAIL_DOMAINS = ['school.org', 'email.com', 'academy.edu', 'mail.net']
+
+
+def make_student(index, rng):
+    """
+    Build one valid student record
+
+    Args:
+        index (int): Sequence number, used to keep IDs and emails unique
+        rng (random.Random): Seeded random source
+
+    Returns:
+        dict: Student data in the data-file format
+    """
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    return {
+        'student_id': f"BEN{index:07d}",
+        'name': f"{first} {last}",
+        'age': rng.randint(5, 19),
+        'grade': rng.choice(GRADES),
+        'email': f"{first.lower()}{last.lower()}{index}@{rng.choice(EMAIL_DOMAINS)}",
+        'phone': f"+1{rng.randint(2000000000, 9999999999)}",
+        'performance': rng.choice(PERFORMANCE_LEVELS)
+    }
+
+
+def generate_students(count, seed=42, start=0):
+    """
+    Yield ``count`` valid student records
+
+    The same seed and start always produce the same roster.
+
+    Args:
+        count (int): Number of students
+        seed (int): Random seed
+        start (int): First sequence number
+
+    Yields:
+        dict: Student data
+    """
+    rng = random.Random(seed + start)
+    for index in range(start, start + count):
+        yield make_student(index, rng)
+
+
+def write_roster(path, count, seed=42):
+    """
+    Write a generated roster in the same format as data/students.json
+
+    Records are written one at a time so large rosters do not need to be
+    held in memory as a single list. They are stamped with the current
+    schema version, as save_data would, so loading the roster does not
+    start a schema write-back in the middle of a measurement.
+
+    Args:
+        path (str): Output file
+        count (int): Number of students
+        seed (int): Random seed
+    """
+    with open(path, 'w') as f:
+        f.write('[\n')
+        for i, record in enumerate(generate_students(count, seed)):
+            if i:
+                f.write(',\n')
+            record[VERSION_FIELD] = SCHEMA_VERSION
+            f.write(json.dumps(record, indent=2))
+        f.write('\n]')
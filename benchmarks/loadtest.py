@@ -0,0 +1,240 @@
+"""
+Load Test Harness
+Drives app.py through Streamlit's AppTest with concurrent simulated sessions
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.generator import generate_students, write_roster
+from benchmarks.runner import collect_metadata
+from services.instrumentation import percentile
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+PAGES = {
+    'dashboard': "📊 Dashboard",
+    'search': "🔍 Search & Filter",
+    'add': "➕ Add Student",
+    'update': "✏️ Update Student",
+}
+
+
+def _widget(widgets, label):
+    """Find a widget by label in an AppTest element list"""
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"No widget labelled {label!r}")
+
+
+class SimulatedSession:
+    """
+    One browser session clicking through the app
+
+    Each rerun is timed; think time between actions is not counted.
+    """
+
+    def __init__(self, session_id, think_time, timeout, seed):
+        """
+        Initialize the session
+
+        Args:
+            session_id (int): Session number, used for unique student IDs
+            think_time (tuple): (min, max) seconds between actions
+            timeout (float): Per-rerun timeout in seconds
+            seed (int): Random seed for the click path
+        """
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.session_id = session_id
+        self.think_time = think_time
+        self.rng = random.Random(seed + session_id)
+        self.latencies = []
+        self.errors = 0
+        self._added = 0
+
+    def _timed(self, action):
+        """Run one rerun-triggering action and record its latency"""
+        started = time.perf_counter()
+        try:
+            action()
+            if self.at.exception:
+                self.errors += 1
+        except Exception as e:
+            print(f"session {self.session_id}: {e}", file=sys.stderr)
+            self.errors += 1
+        self.latencies.append((time.perf_counter() - started) * 1000)
+
+    def _goto(self, page):
+        """Switch page through the sidebar radio"""
+        self._timed(lambda: self.at.sidebar.radio[0].set_value(PAGES[page]).run())
+
+    def visit_dashboard(self):
+        """Open the dashboard"""
+        self._goto('dashboard')
+
+    def visit_search(self):
+        """Open Search & Filter and run a quick search"""
+        self._goto('search')
+        query = self.rng.choice(['smith', 'emma', 'ben00', 'williams'])
+        self._timed(lambda: self.at.text_input[0].input(query).run())
+
+    def visit_add(self):
+        """Fill in and submit the enrollment form"""
+        self._goto('add')
+        record = next(generate_students(
+            1, start=10_000_000 + self.session_id * 100_000 + self._added))
+        self._added += 1
+
+        def submit():
+            _widget(self.at.text_input, "Student ID").input(record['student_id'])
+            _widget(self.at.text_input, "Full Name").input(record['name'])
+            _widget(self.at.number_input, "Age").set_value(record['age'])
+            _widget(self.at.selectbox, "Grade Level").set_value(record['grade'])
+            _widget(self.at.text_input, "Email Address").input(record['email'])
+            _widget(self.at.text_input, "Phone Number").input(record['phone'])
+            _widget(self.at.selectbox, "Academic Performance").set_value(record['performance'])
+            _widget(self.at.button, "➕ Enroll Student").click().run()
+        self._timed(submit)
+
+    def visit_update(self):
+        """Open Update Student and type into the picker"""
+        self._goto('update')
+        prefix = self.rng.choice(['a', 'c', 'm', 'ben0'])
+        self._timed(lambda: _widget(self.at.text_input, "Find Student").input(prefix).run())
+
+    def run(self, actions, stop_at):
+        """
+        Click through random pages until the action budget or deadline
+
+        Args:
+            actions (int): Maximum page visits
+            stop_at (float): perf_counter deadline
+        """
+        self._timed(self.at.run)
+        visits = [self.visit_dashboard, self.visit_search, self.visit_add, self.visit_update]
+        weights = [4, 3, 1, 2]
+        for _ in range(actions):
+            if time.perf_counter() >= stop_at:
+                break
+            time.sleep(self.rng.uniform(*self.think_time))
+            self.rng.choices(visits, weights)[0]()
+
+
+def run_level(concurrency, actions, think_time, timeout, duration, seed):
+    """
+    Run ``concurrency`` sessions in parallel threads
+
+    Args:
+        concurrency (int): Number of simultaneous sessions
+        actions (int): Page visits per session
+        think_time (tuple): (min, max) seconds between actions
+        timeout (float): Per-rerun timeout in seconds
+        duration (float): Seconds before sessions stop early
+        seed (int): Random seed
+
+    Returns:
+        dict: Throughput and latency summary for this level
+    """
+    sessions = [SimulatedSession(i, think_time, timeout, seed) for i in range(concurrency)]
+    stop_at = time.perf_counter() + duration
+    threads = [threading.Thread(target=s.run, args=(actions, stop_at)) for s in sessions]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(ms for s in sessions for ms in s.latencies)
+    return {
+        'concurrency': concurrency,
+        'reruns': len(latencies),
+        'errors': sum(s.errors for s in sessions),
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else 0,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'mean_ms': round(statistics.fmean(latencies), 2) if latencies else 0
+    }
+
+
+def find_knee(levels, factor):
+    """
+    First concurrency whose p99 exceeds ``factor`` times the first level's p99
+
+    Args:
+        levels (list): Level summaries in increasing concurrency
+        factor (float): Allowed p99 growth
+
+    Returns:
+        int or None: Concurrency where latency degrades
+    """
+    if not levels:
+        return None
+    baseline = levels[0]['p99_ms'] or 1e-9
+    for level in levels[1:]:
+        if level['p99_ms'] > baseline * factor:
+            return level['concurrency']
+    return None
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for app.py")
+    parser.add_argument('--roster', type=int, default=10_000, help="Generated students")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--actions', type=int, default=20, help="Page visits per session")
+    parser.add_argument('--duration', type=float, default=60.0, help="Seconds per level")
+    parser.add_argument('--think-min', type=float, default=0.2)
+    parser.add_argument('--think-max', type=float, default=1.0)
+    parser.add_argument('--timeout', type=float, default=60.0, help="Per-rerun timeout")
+    parser.add_argument('--degrade-factor', type=float, default=2.0,
+                        help="p99 growth over one session that counts as degraded")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    try:
+        import streamlit.testing.v1  # noqa: F401
+    except ImportError as e:
+        print(f"Load test needs Streamlit's AppTest: {e}", file=sys.stderr)
+        return 2
+
+    report = {'meta': collect_metadata(), 'roster': args.roster, 'levels': []}
+    with tempfile.TemporaryDirectory(prefix='sms-load-') as workdir:
+        data_file = os.path.join(workdir, 'students.json')
+        write_roster(data_file, args.roster, args.seed)
+        os.environ['SMS_DATA_FILE'] = data_file
+
+        for concurrency in args.concurrency:
+            level = run_level(concurrency, args.actions, (args.think_min, args.think_max),
+                              args.timeout, args.duration, args.seed)
+            report['levels'].append(level)
+            print(f"c={concurrency:<4} {level['throughput_rps']:>8} rerun/s  "
+                  f"p50 {level['p50_ms']:.1f} ms  p99 {level['p99_ms']:.1f} ms  "
+                  f"errors {level['errors']}", file=sys.stderr)
+
+    report['degrades_at'] = find_knee(report['levels'], args.degrade_factor)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
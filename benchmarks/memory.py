@@ -0,0 +1,151 @@
+"""
+Memory Benchmarks
+Measures what the in-memory model holds per student with tracemalloc
+"""
+
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+from benchmarks.generator import write_roster
+from models.student import Student
+from services.student_manager import StudentManager
+
+
+def current_rss():
+    """
+    Resident set size of this process in bytes
+
+    Returns:
+        int or None: RSS, or None when /proc is unavailable
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _top_allocators(before, after, limit):
+    """Largest allocation growth between two snapshots, grouped by line"""
+    top = []
+    for stat in after.compare_to(before, 'lineno')[:limit]:
+        frame = stat.traceback[0]
+        top.append({
+            'location': f"{os.path.relpath(frame.filename)}:{frame.lineno}",
+            'bytes': stat.size_diff,
+            'blocks': stat.count_diff
+        })
+    return top
+
+
+def measure(stage, size, build, top=10):
+    """
+    Measure memory retained and peaked while building an object
+
+    Args:
+        stage (str): Stage name for the report
+        size (int): Number of students
+        build (callable): Returns the object to keep alive
+        top (int): Number of top allocators to report
+
+    Returns:
+        tuple: (result dict, built object)
+    """
+    gc.collect()
+    before = tracemalloc.take_snapshot()
+    base_current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    rss_before = current_rss()
+
+    obj = build()
+
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    rss_after = current_rss()
+
+    retained = current - base_current
+    result = {
+        'scenario': f"memory.{stage}",
+        'size': size,
+        'retained_bytes': retained,
+        'peak_bytes': peak - base_current,
+        'bytes_per_student': round(retained / size, 1) if size else 0,
+        'rss_delta_bytes': (rss_after - rss_before) if rss_before is not None else None,
+        'top_allocators': _top_allocators(before, after, top)
+    }
+    print(f"{stage:>28} n={size:<9} {result['bytes_per_student']:>10.1f} B/student",
+          file=sys.stderr)
+    return result, obj
+
+
+def run_memory_size(size, workdir, seed=42, top=10):
+    """
+    Run the memory stages against a freshly generated roster
+
+    Stages are measured independently so each number is what that
+    representation costs on its own.
+
+    Args:
+        size (int): Number of students
+        workdir (str): Directory for the generated data file
+        seed (int): Generator seed
+        top (int): Number of top allocators per stage
+
+    Returns:
+        list: One result dict per stage
+    """
+    data_file = os.path.join(workdir, f"students_{size}.json")
+    write_roster(data_file, size, seed)
+
+    def parse():
+        with open(data_file) as f:
+            return json.load(f)
+
+    results = []
+    tracemalloc.start()
+    try:
+        result, data = measure('json_parse', size, parse, top)
+        results.append(result)
+
+        del data
+
+        # Parse inside the stage so the field strings count towards the objects
+        result, students = measure(
+            'student_objects', size, lambda: [Student.from_dict(item) for item in parse()], top)
+        results.append(result)
+        del students
+
+        result, manager = measure(
+            'manager_total', size, lambda: StudentManager(data_file=data_file), top)
+        results.append(result)
+        # Index cost is what the manager holds beyond the Student objects
+        indexes = {
+            'scenario': 'memory.indexes',
+            'size': size,
+            'retained_bytes': result['retained_bytes'] - results[1]['retained_bytes'],
+        }
+        indexes['bytes_per_student'] = round(indexes['retained_bytes'] / size, 1) if size else 0
+        results.append(indexes)
+
+        try:
+            from ui.components import build_student_table
+        except ImportError as e:
+            print(f"Skipping student_table: {e}", file=sys.stderr)
+        else:
+            result, table = measure(
+                'student_table', size,
+                lambda: build_student_table(manager.get_all_students()), top)
+            result['dataframe_deep_bytes'] = int(table.memory_usage(deep=True).sum())
+            results.append(result)
+            del table
+        del manager
+    finally:
+        tracemalloc.stop()
+    return results
@@ -0,0 +1,124 @@
+"""
+Benchmark Runner
+Runs the scenarios at several roster sizes and emits JSON results
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.generator import write_roster
+from benchmarks.encodings import run_encodings_size
+from benchmarks.memory import run_memory_size
+from benchmarks.scenarios import BenchContext, SCENARIOS
+from services.student_manager import StudentManager
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def time_call(func, repeat):
+    """
+    Time a callable several times
+
+    Args:
+        func (callable): Operation to time
+        repeat (int): Number of timed calls
+
+    Returns:
+        dict: min/median/mean in milliseconds
+    """
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        'repeat': repeat,
+        'min_ms': round(min(samples), 4),
+        'median_ms': round(statistics.median(samples), 4),
+        'mean_ms': round(statistics.fmean(samples), 4)
+    }
+
+
+def run_size(size, scenario_names, repeat, workdir, seed=42):
+    """
+    Run the selected scenarios against a freshly generated roster
+
+    Args:
+        size (int): Number of students
+        scenario_names (list): Scenario keys from SCENARIOS
+        repeat (int): Timed calls per scenario
+        workdir (str): Directory for the generated data file
+        seed (int): Generator seed
+
+    Returns:
+        list: One result dict per scenario
+    """
+    data_file = os.path.join(workdir, f"students_{size}.json")
+    write_roster(data_file, size, seed)
+    ctx = BenchContext(StudentManager(data_file=data_file), data_file, size)
+
+    results = []
+    for name in scenario_names:
+        try:
+            op = SCENARIOS[name](ctx)
+        except ImportError as e:
+            print(f"Skipping {name}: {e}", file=sys.stderr)
+            continue
+        result = {'scenario': name, 'size': size}
+        result.update(time_call(op, repeat))
+        results.append(result)
+        print(f"{name:>28} n={size:<9} median {result['median_ms']:.3f} ms", file=sys.stderr)
+    return results
+
+
+def collect_metadata():
+    """Environment details stored alongside results"""
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor()
+    }
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark StudentManager at scale")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--mode', choices=['time', 'memory', 'encodings'], default='time',
+                        help="Time the scenarios, measure memory per student, "
+                             "or compare data-file encodings")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10,
+                        help="Top allocators reported per memory stage")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = {'meta': collect_metadata(), 'results': []}
+    report['meta']['mode'] = args.mode
+    with tempfile.TemporaryDirectory(prefix='sms-bench-') as workdir:
+        for size in args.sizes:
+            if args.mode == 'memory':
+                results = run_memory_size(size, workdir, args.seed, args.top)
+            elif args.mode == 'encodings':
+                results = run_encodings_size(size, workdir, args.repeat, args.seed)
+            else:
+                results = run_size(size, args.scenarios, args.repeat, workdir, args.seed)
+            report['results'].extend(results)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
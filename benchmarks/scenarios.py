@@ -0,0 +1,190 @@
+"""
+Benchmark Scenarios
+Timed StudentManager and UI-render workloads
+"""
+
+from benchmarks.generator import generate_students
+
+
+class BenchContext:
+    """
+    State shared by the scenarios of one roster size
+
+    Attributes:
+        manager (StudentManager): Manager loaded with the generated roster
+        data_file (str): Path of the roster file
+        size (int): Number of generated students
+    """
+
+    def __init__(self, manager, data_file, size):
+        self.manager = manager
+        self.data_file = data_file
+        self.size = size
+        self._next_index = size
+
+    def sample_ids(self, count):
+        """Evenly spaced IDs from the generated roster"""
+        step = max(1, self.size // count)
+        return [f"BEN{i:07d}" for i in range(0, self.size, step)][:count]
+
+    def new_student(self):
+        """A fresh valid student whose ID is not in the roster"""
+        record = next(generate_students(1, start=self._next_index))
+        self._next_index += 1
+        return record
+
+
+def scenario_load_data(ctx):
+    """Re-read and hydrate the data file"""
+    return ctx.manager.load_data
+
+
+def scenario_save_data(ctx):
+    """Rewrite the full data file"""
+    return ctx.manager.save_data
+
+
+def scenario_get_student_by_id(ctx):
+    """1000 ID lookups spread across the roster"""
+    ids = ctx.sample_ids(1000)
+
+    def run():
+        for student_id in ids:
+            ctx.manager.get_student_by_id(student_id)
+    return run
+
+
+def scenario_search_students(ctx):
+    """Substring search on a common surname"""
+    return lambda: ctx.manager.search_students('williams')
+
+
+def scenario_fuzzy_search(ctx):
+    """Typo-tolerant search for a misspelled surname (index built in setup)"""
+    ctx.manager.fuzzy_search('williams')
+    return lambda: ctx.manager.fuzzy_search('wiliams')
+
+
+def scenario_sorted_view_top_k(ctx):
+    """Top performers plus a deep name-ordered page (orderings built in setup)"""
+    ctx.manager.sorted_view('performance', limit=1)
+    ctx.manager.sorted_view('name', limit=1)
+
+    def run():
+        ctx.manager.sorted_view('performance', limit=5)
+        ctx.manager.sorted_view('name', limit=100, offset=len(ctx.manager.students) // 2)
+    return run
+
+
+def scenario_query(ctx):
+    """Compiled multi-field query (orderings built and query cached in setup)"""
+    text = 'grade in (10, 11) and performance >= Good and age between 15 and 17'
+    ctx.manager.query(text)
+    return lambda: ctx.manager.query(text)
+
+
+def scenario_filter_by_grade(ctx):
+    """Single-grade filter"""
+    return lambda: ctx.manager.filter_by_grade('10')
+
+
+def scenario_filter_by_age_range(ctx):
+    """Age band filter"""
+    return lambda: ctx.manager.filter_by_age_range(15, 17)
+
+
+def scenario_filter_by_performance(ctx):
+    """Single performance-level filter"""
+    return lambda: ctx.manager.filter_by_performance('Good')
+
+
+def scenario_get_statistics(ctx):
+    """Dashboard aggregates"""
+    return ctx.manager.get_statistics
+
+
+def scenario_build_student_table(ctx):
+    """DataFrame construction used by render_student_table"""
+    # Imported lazily: pulls in Streamlit, pandas and Plotly
+    from ui.components import build_student_table
+    return lambda: build_student_table(ctx.manager.get_all_students())
+
+
+def scenario_render_statistics_overview(ctx):
+    """Full dashboard render, run outside a server (Streamlit bare mode)"""
+    from ui.components import render_statistics_overview
+    return lambda: render_statistics_overview(ctx.manager)
+
+
+def scenario_render_search_filters(ctx):
+    """Search page render with default filters (Streamlit bare mode)"""
+    from ui.components import render_search_filters
+    return lambda: render_search_filters(ctx.manager)
+
+
+def scenario_snapshot_open_find(ctx):
+    """Map a columnar snapshot of the roster and look up one student"""
+    from services.columnar import ColumnarSnapshot, write_snapshot
+    snapshot_file = ctx.data_file + '.smsc'
+    write_snapshot(snapshot_file, ctx.manager.get_all_students())
+    student_id = ctx.sample_ids(1)[0]
+
+    def run():
+        with ColumnarSnapshot(snapshot_file) as snapshot:
+            assert snapshot.get_student_by_id(student_id)
+    return run
+
+
+def scenario_add_student(ctx):
+    """Enroll one new student per call"""
+    def run():
+        record = ctx.new_student()
+        success, message = ctx.manager.add_student(**record)
+        assert success, message
+    return run
+
+
+def scenario_update_student(ctx):
+    """Toggle one student's performance per call"""
+    student_id = ctx.sample_ids(1)[0]
+    levels = ['Good', 'Average']
+    state = {'calls': 0}
+
+    def run():
+        state['calls'] += 1
+        success, message = ctx.manager.update_student(
+            student_id, performance=levels[state['calls'] % 2])
+        assert success, message
+    return run
+
+
+def scenario_delete_student(ctx):
+    """Remove one student per call, from the end of the roster"""
+    ids = iter(reversed(ctx.sample_ids(ctx.size)))
+
+    def run():
+        assert ctx.manager.delete_student(next(ids))
+    return run
+
+
+# Read-only scenarios run first so mutations do not skew them
+SCENARIOS = {
+    'load_data': scenario_load_data,
+    'get_student_by_id_x1000': scenario_get_student_by_id,
+    'search_students': scenario_search_students,
+    'fuzzy_search': scenario_fuzzy_search,
+    'sorted_view_top_k': scenario_sorted_view_top_k,
+    'query': scenario_query,
+    'filter_by_grade': scenario_filter_by_grade,
+    'filter_by_age_range': scenario_filter_by_age_range,
+    'filter_by_performance': scenario_filter_by_performance,
+    'get_statistics': scenario_get_statistics,
+    'build_student_table': scenario_build_student_table,
+    'render_statistics_overview': scenario_render_statistics_overview,
+    'render_search_filters': scenario_render_search_filters,
+    'snapshot_open_find': scenario_snapshot_open_find,
+    'save_data': scenario_save_data,
+    'add_student': scenario_add_student,
+    'update_student': scenario_update_student,
+    'delete_student': scenario_delete_student,
+}
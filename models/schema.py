@@ -0,0 +1,104 @@
+"""
+Record Schema
+Versioned layouts of a stored student record and the upgrades between them
+
+Every record written by this code carries ``schema_version``; records
+without one are version 1, the original seven-field layout. To change the
+layout, bump SCHEMA_VERSION and register one upgrade from the previous
+version:
+
+    SCHEMA_VERSION = 3
+
+    @register_upgrade(2)
+    def add_enrollment_date(record):
+        record.setdefault('enrollment_date', None)
+        return record
+
+Records are upgraded one version at a time as they are read, so files of
+any age (or a file half way through migration) load the same way.
+"""
+
+VERSION_FIELD = 'schema_version'
+
+# Current layout; records of every older version are upgraded on read
+SCHEMA_VERSION = 2
+
+# The fields Student holds as attributes; any others are kept in Student.extra
+STUDENT_FIELDS = ('student_id', 'name', 'age', 'grade', 'email', 'phone', 'performance')
+
+_UPGRADES = {}   # version -> function turning a record of that version into the next
+
+
+def register_upgrade(from_version):
+    """
+    Register the function that upgrades records of one version to the next
+
+    The function receives a copy of the record and returns it changed;
+    the version stamp is updated for it.
+
+    Args:
+        from_version (int): Version the function reads
+    """
+    def decorator(func):
+        _UPGRADES[from_version] = func
+        return func
+    return decorator
+
+
+def record_version(record):
+    """
+    Schema version of a stored record
+
+    Args:
+        record (dict): Record as read from storage
+
+    Returns:
+        int: Its version (1 if unstamped)
+    """
+    return record.get(VERSION_FIELD, 1)
+
+
+def is_current(record):
+    """Whether a record is already in the current layout"""
+    return record.get(VERSION_FIELD, 1) == SCHEMA_VERSION
+
+
+def upgrade_record(record):
+    """
+    Bring a record up to SCHEMA_VERSION
+
+    Args:
+        record (dict): Record of any supported version (not modified)
+
+    Returns:
+        dict: The record in the current layout (the same object if it
+            already was)
+
+    Raises:
+        ValueError: If the record is newer than this code, or an upgrade
+            step is missing
+    """
+    version = record_version(record)
+    if version == SCHEMA_VERSION:
+        return record
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"Record {record.get('student_id')} has schema version {version}; "
+                         f"this version of the application reads up to {SCHEMA_VERSION}")
+    record = dict(record)
+    while version < SCHEMA_VERSION:
+        upgrade = _UPGRADES.get(version)
+        if upgrade is None:
+            raise ValueError(f"No upgrade registered from schema version {version}")
+        record = upgrade(record)
+        version += 1
+        record[VERSION_FIELD] = version
+    return record
+
+
+@register_upgrade(1)
+def _stamp_and_type_age(record):
+    """Version 2: records are stamped, and hand-edited "12" ages become 12"""
+    age = record.get('age')
+    if isinstance(age, str) and age.strip().isdigit():
+        record['age'] = int(age)
+    return record
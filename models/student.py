@@ -3,12 +3,18 @@ Student Model
 Defines the Student class with validation
 """
 
+from models.schema import SCHEMA_VERSION, STUDENT_FIELDS, VERSION_FIELD, upgrade_record
+
+# Keys of a current record with no extra fields
+_CURRENT_LENGTH = len(STUDENT_FIELDS) + 1
+
+
 class Student:
     """
     Represents a student with personal and academic information
     """
     
-    def __init__(self, student_id, name, age, grade, email, phone, performance):
+    def __init__(self, student_id, name, age, grade, email, phone, performance, extra=None):
         """
         Initialize a Student object
         
@@ -20,6 +26,8 @@ class Student:
             email (str): Email address
             phone (str): Phone number
             performance (str): Academic performance level
+            extra (dict, optional): Stored fields beyond these seven, kept
+                as read and written back unchanged
         """
         self.student_id = student_id
         self.name = name
@@ -28,15 +36,16 @@ class Student:
         self.email = email
         self.phone = phone
         self.performance = performance
+        self.extra = extra
     
     def to_dict(self):
         """
         Convert student object to dictionary
         
         Returns:
-            dict: Student data as dictionary
+            dict: Student data as dictionary, in the current schema version
         """
-        return {
+        data = {
             'student_id': self.student_id,
             'name': self.name,
             'age': self.age,
@@ -45,27 +54,33 @@ class Student:
             'phone': self.phone,
             'performance': self.performance
         }
+        if self.extra:
+            data.update(self.extra)
+        data[VERSION_FIELD] = SCHEMA_VERSION
+        return data
     
     @staticmethod
     def from_dict(data):
         """
         Create a Student object from dictionary
         
+        Records of older schema versions are upgraded first.
+        
         Args:
             data (dict): Dictionary containing student data
             
         Returns:
             Student: Student object
         """
-        return Student(
-            student_id=data['student_id'],
-            name=data['name'],
-            age=data['age'],
-            grade=data['grade'],
-            email=data['email'],
-            phone=data['phone'],
-            performance=data['performance']
-        )
+        extra = None
+        # Fast path: a current record with no extra fields (one check per load)
+        if len(data) != _CURRENT_LENGTH or data.get(VERSION_FIELD) != SCHEMA_VERSION:
+            data = upgrade_record(data)
+            if len(data) > _CURRENT_LENGTH:
+                extra = {key: value for key, value in data.items()
+                         if key not in STUDENT_FIELDS and key != VERSION_FIELD}
+        return Student(data['student_id'], data['name'], data['age'], data['grade'],
+                       data['email'], data['phone'], data['performance'], extra)
     
     def update(self, name=None, age=None, grade=None, email=None, phone=None, performance=None):
         """
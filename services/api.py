@@ -0,0 +1,533 @@
+"""
+HTTP API
+Headless JSON service over one shared StudentManager
+
+Single records and aggregates are JSON documents; lists of students are
+streamed as JSON lines (one student per line) with chunked encoding, so a
+client can start reading before the last match is serialized.
+
+    GET    /health                    status and roster size
+    GET    /students                  all students (?sort=name&desc=1&limit=&offset=)
+    POST   /students                  add a student (JSON body)
+    POST   /students/import           add many (JSON array or JSON lines body)
+    GET    /students/{id}             one student
+    PATCH  /students/{id}             update fields (JSON body; PUT also accepted)
+    DELETE /students/{id}             delete
+    GET    /search?q=&fuzzy=1&limit=  text or typo-tolerant name search (&archived=1 adds the archive)
+    GET    /filter?grade=&performance=&min_age=&max_age=
+    GET    /query?q=                  query-language expression
+    GET    /query/explain?q=          the plan query would use
+    GET    /stats                     get_statistics() (?archived=1 counts archived students)
+
+Run with ``python -m services.api data/students.json --port 8765``.
+"""
+
+import argparse
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from services.query import QueryError
+from services.storage import ENCODINGS, dumps
+from services.student_manager import StudentManager
+
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 16
+
+# Request bodies above this are rejected rather than read into memory
+MAX_BODY = 64 * 1024 * 1024
+
+# Student lines are written to the socket in chunks of about this size
+STREAM_CHUNK = 64 * 1024
+
+FIELDS = ('name', 'age', 'grade', 'email', 'phone', 'performance')
+
+# Fields the validators handle only as strings
+TEXT_FIELDS = ('student_id', 'name', 'grade', 'email', 'phone', 'performance')
+
+
+class ApiError(Exception):
+    """An error answered with a JSON body and an HTTP status"""
+
+    def __init__(self, status, message, errors=None):
+        super().__init__(message)
+        self.status = status
+        self.errors = errors
+
+
+class ReadWriteLock:
+    """
+    Many concurrent readers or one writer
+
+    StudentManager is not thread-safe for mutations; reads only need to
+    not overlap a write.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writing = False
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writing:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._writing = True
+
+    def release_write(self):
+        with self._cond:
+            self._writing = False
+            self._cond.notify_all()
+
+
+def _int_param(params, name, default=None):
+    """Integer query-string parameter"""
+    value = params.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ApiError(400, f"{name} must be an integer")
+
+
+def _type_errors(record):
+    """
+    Field errors for JSON values of the wrong type
+
+    The validators expect the form's types (text, and a number or digits
+    for age); checked first so {"name": 123} is a 400, not a crash.
+
+    Args:
+        record (dict): Fields from a request body; None means not given
+
+    Returns:
+        list: Error messages, empty if every value has a usable type
+    """
+    errors = [f"{field} must be a string" for field in TEXT_FIELDS
+              if record.get(field) is not None and not isinstance(record[field], str)]
+    age = record.get('age')
+    if age is not None and (isinstance(age, bool) or not isinstance(age, (int, str))):
+        errors.append("age must be an integer")
+    return errors
+
+
+def _flag(params, name):
+    """Boolean query-string parameter (1/true/yes)"""
+    return params.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+class StudentApiHandler(BaseHTTPRequestHandler):
+    """Routes one connection's requests to the server's manager"""
+
+    protocol_version = 'HTTP/1.1'   # keep-alive by default
+    server_version = 'StudentAPI/1.0'
+    timeout = 15                    # idle keep-alive connections free their worker
+    # Buffer each response into as few segments as possible and send them
+    # at once; otherwise Nagle plus delayed ACKs add ~40 ms per request
+    wbufsize = STREAM_CHUNK
+    disable_nagle_algorithm = True
+
+    # Responses
+
+    def _send_json(self, status, payload):
+        body = dumps(payload)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_empty(self, status):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def _stream_students(self, students):
+        """Send students as JSON lines with chunked transfer encoding"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        buffer = []
+        size = 0
+        for student in students:
+            line = dumps(student.to_dict()) + b'\n'
+            buffer.append(line)
+            size += len(line)
+            if size >= STREAM_CHUNK:
+                self._write_chunk(b''.join(buffer))
+                buffer, size = [], 0
+        if buffer:
+            self._write_chunk(b''.join(buffer))
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _write_chunk(self, data):
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+
+    def log_message(self, format, *args):
+        """Only log when the server was started with --verbose"""
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # Request parsing
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY:
+            raise ApiError(413, "Request body too large")
+        self._body_read = True
+        return self.rfile.read(length) if length else b''
+
+    def _read_json(self):
+        try:
+            payload = json.loads(self._read_body() or b'null')
+        except ValueError as e:
+            raise ApiError(400, f"Invalid JSON: {e}")
+        if not isinstance(payload, dict):
+            raise ApiError(400, "Request body must be a JSON object")
+        return payload
+
+    def _read_records(self):
+        """A JSON array, or one JSON object per line"""
+        body = self._read_body().strip()
+        try:
+            if body.startswith(b'['):
+                records = json.loads(body)
+            else:
+                records = [json.loads(line) for line in body.splitlines() if line.strip()]
+        except ValueError as e:
+            raise ApiError(400, f"Invalid JSON: {e}")
+        if not all(isinstance(record, dict) for record in records):
+            raise ApiError(400, "Each record must be a JSON object")
+        return records
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if part]
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self._body_read = False
+        try:
+            route = self.server.route(method, parts)
+            route(self, parts, params)
+        except ApiError as e:
+            # An unread body would be parsed as the next request
+            if not self._body_read and int(self.headers.get('Content-Length') or 0):
+                self.close_connection = True
+            payload = {'error': str(e)}
+            if e.errors:
+                payload['errors'] = e.errors
+            self._send_json(e.status, payload)
+        except QueryError as e:
+            self._send_json(400, {'error': str(e)})
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+        except Exception as e:
+            print(f"Error handling {method} {self.path}: {e}", file=sys.stderr)
+            self._send_json(500, {'error': "Internal server error"})
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PATCH')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    # Endpoints
+
+    def health(self, parts, params):
+        with self.server.reading():
+            total = len(self.server.manager.get_all_students())
+        self._send_json(200, {'status': 'ok', 'students': total})
+
+    def list_students(self, parts, params):
+        manager = self.server.manager
+        limit = _int_param(params, 'limit')
+        offset = _int_param(params, 'offset', 0)
+        sort = params.get('sort')
+        with self.server.reading():
+            if sort:
+                try:
+                    students = manager.sorted_view(sort, _flag(params, 'desc'), limit, offset)
+                except ValueError as e:
+                    raise ApiError(400, str(e))
+            else:
+                students = manager.get_all_students()
+                stop = None if limit is None else offset + limit
+                students = students[offset:stop]
+        self._stream_students(students)
+
+    def get_student(self, parts, params):
+        with self.server.reading():
+            student = self.server.manager.get_student_by_id(parts[1])
+        if student is None:
+            raise ApiError(404, "Student not found")
+        self._send_json(200, student.to_dict())
+
+    def add_student(self, parts, params):
+        record = self._read_json()
+        errors = _type_errors(record)
+        if errors:
+            raise ApiError(400, "Student not added", errors)
+        with self.server.writing():
+            success, result = self.server.manager.add_student(
+                record.get('student_id'), record.get('name'), record.get('age'),
+                record.get('grade'), record.get('email'), record.get('phone'),
+                record.get('performance'))
+            student = self.server.manager.get_student_by_id(record.get('student_id'))
+        if not success:
+            raise ApiError(400, "Student not added", result)
+        self._send_json(201, student.to_dict())
+
+    def import_students(self, parts, params):
+        records = self._read_records()
+        mistyped = [(record, _type_errors(record)) for record in records]
+        records = [record for record, errors in mistyped if not errors]
+        with self.server.writing():
+            added, rejected = self.server.manager.import_students(records)
+        rejected = [(record, errors) for record, errors in mistyped if errors] + rejected
+        self._send_json(200, {'added': added, 'rejected': [
+            {'record': record, 'errors': errors} for record, errors in rejected]})
+
+    def update_student(self, parts, params):
+        changes = self._read_json()
+        unknown = set(changes) - set(FIELDS)
+        if unknown:
+            raise ApiError(400, f"Unknown fields: {', '.join(sorted(unknown))}")
+        errors = _type_errors(changes)
+        if errors:
+            raise ApiError(400, "Student not updated", errors)
+        with self.server.writing():
+            success, result = self.server.manager.update_student(parts[1], **changes)
+            student = self.server.manager.get_student_by_id(parts[1])
+        if not success:
+            status = 404 if result == ["Student not found"] else 400
+            raise ApiError(status, "Student not updated", result)
+        self._send_json(200, student.to_dict())
+
+    def delete_student(self, parts, params):
+        with self.server.writing():
+            deleted = self.server.manager.delete_student(parts[1])
+        if not deleted:
+            raise ApiError(404, "Student not found")
+        self._send_empty(204)
+
+    def search(self, parts, params):
+        query = params.get('q', '')
+        manager = self.server.manager
+        with self.server.reading():
+            if _flag(params, 'fuzzy'):
+                students = manager.fuzzy_search(query, limit=_int_param(params, 'limit', 25))
+            else:
+                students = manager.search_students(query, include_archived=_flag(params, 'archived'))
+                limit = _int_param(params, 'limit')
+                if limit is not None:
+                    students = students[:limit]
+        self._stream_students(students)
+
+    def filter(self, parts, params):
+        manager = self.server.manager
+        grade = params.get('grade')
+        performance = params.get('performance')
+        min_age = _int_param(params, 'min_age')
+        max_age = _int_param(params, 'max_age')
+        with self.server.reading():
+            students = manager.filter_by_grade(grade) if grade else manager.get_all_students()
+            students = [s for s in students
+                        if (performance is None or s.performance == performance)
+                        and (min_age is None or s.age >= min_age)
+                        and (max_age is None or s.age <= max_age)]
+        self._stream_students(students)
+
+    def query(self, parts, params):
+        if not params.get('q'):
+            raise ApiError(400, "Missing q parameter")
+        with self.server.reading():
+            students = self.server.manager.query(params['q'])
+        self._stream_students(students)
+
+    def explain(self, parts, params):
+        if not params.get('q'):
+            raise ApiError(400, "Missing q parameter")
+        with self.server.reading():
+            plan = self.server.manager.explain_query(params['q'])
+        self._send_json(200, {'plan': plan})
+
+    def stats(self, parts, params):
+        with self.server.reading():
+            stats = self.server.manager.get_statistics(include_archived=_flag(params, 'archived'))
+        self._send_json(200, stats)
+
+
+# (method, path pattern, handler); '*' matches one path segment and the
+# first matching route wins, so literal paths come before wildcards
+ROUTES = [
+    ('GET', ('health',), StudentApiHandler.health),
+    ('GET', ('students',), StudentApiHandler.list_students),
+    ('POST', ('students',), StudentApiHandler.add_student),
+    ('POST', ('students', 'import'), StudentApiHandler.import_students),
+    ('GET', ('students', '*'), StudentApiHandler.get_student),
+    ('PATCH', ('students', '*'), StudentApiHandler.update_student),
+    ('DELETE', ('students', '*'), StudentApiHandler.delete_student),
+    ('GET', ('search',), StudentApiHandler.search),
+    ('GET', ('filter',), StudentApiHandler.filter),
+    ('GET', ('query',), StudentApiHandler.query),
+    ('GET', ('query', 'explain'), StudentApiHandler.explain),
+    ('GET', ('stats',), StudentApiHandler.stats),
+]
+
+
+class StudentApiServer(HTTPServer):
+    """
+    HTTP server handing each connection to a fixed pool of worker threads
+
+    A pool rather than a thread per connection bounds memory and context
+    switching under load; keep-alive connections hold a worker while open.
+    """
+
+    request_queue_size = 128
+
+    def __init__(self, manager, host='127.0.0.1', port=DEFAULT_PORT,
+                 workers=DEFAULT_WORKERS, verbose=False):
+        """
+        Args:
+            manager (StudentManager): Manager shared by every request
+            host (str): Interface to bind
+            port (int): Port to bind (0 picks a free one)
+            workers (int): Worker threads (and so concurrent connections)
+            verbose (bool): Log every request to stderr
+        """
+        self.manager = manager
+        self.verbose = verbose
+        self._lock = ReadWriteLock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api-worker')
+        super().__init__((host, port), StudentApiHandler)
+
+    @contextmanager
+    def reading(self):
+        """Hold the manager for a read"""
+        self._lock.acquire_read()
+        try:
+            yield self.manager
+        finally:
+            self._lock.release_read()
+
+    @contextmanager
+    def writing(self):
+        """Hold the manager exclusively for a mutation"""
+        self._lock.acquire_write()
+        try:
+            yield self.manager
+        finally:
+            self._lock.release_write()
+
+    def route(self, method, parts):
+        """
+        Find the handler for a request
+
+        Raises:
+            ApiError: 404 for unknown paths, 405 for known paths with another method
+        """
+        path_matched = False
+        for route_method, pattern, handler in ROUTES:
+            if len(pattern) == len(parts) and all(p in ('*', part)
+                                                  for p, part in zip(pattern, parts)):
+                path_matched = True
+                if route_method == method:
+                    return handler
+        raise ApiError(405 if path_matched else 404,
+                       "Method not allowed" if path_matched else "Not found")
+
+    def process_request(self, request, client_address):
+        """Serve the connection on a pool thread"""
+        self._pool.submit(self._serve_connection, request, client_address)
+
+    def _serve_connection(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False)
+
+
+def serve(manager, host='127.0.0.1', port=DEFAULT_PORT, workers=DEFAULT_WORKERS,
+          verbose=False):
+    """
+    Start serving on a background thread
+
+    Args:
+        manager (StudentManager): Manager to expose
+        host (str): Interface to bind
+        port (int): Port to bind (0 picks a free one)
+        workers (int): Worker threads
+        verbose (bool): Log every request
+
+    Returns:
+        StudentApiServer: Running server; call shutdown() then server_close()
+    """
+    server = StudentApiServer(manager, host, port, workers, verbose)
+    threading.Thread(target=server.serve_forever, name='api-server', daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    """Serve a data file over HTTP until interrupted"""
+    parser = argparse.ArgumentParser(description="JSON HTTP API for a student data file")
+    parser.add_argument('data_file', nargs='?', default='data/students.json')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Worker threads, i.e. concurrent keep-alive connections")
+    parser.add_argument('--encoding', choices=ENCODINGS, default='pretty',
+                        help="Encoding used when saving the data file")
+    parser.add_argument('--change-feed', action='store_true',
+                        help="Publish committed changes next to the data file")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args(argv)
+
+    manager = StudentManager(data_file=args.data_file, encoding=args.encoding,
+                             change_feed=args.change_feed)
+    server = StudentApiServer(manager, args.host, args.port, args.workers, args.verbose)
+    print(f"Serving {args.data_file} on http://{args.host}:{server.server_port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Atomic File Writes
+Replace a file only once its new contents are complete and on disk
+"""
+
+import os
+import stat
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # no cross-process lock on Windows; one writer process only
+    fcntl = None
+
+LOCK_SUFFIX = '.lock'
+
+
+@contextmanager
+def atomic_write(path):
+    """
+    Binary file whose contents replace ``path`` when the block exits
+
+    The data goes to a temporary file in the same directory, is fsynced and
+    then renamed over ``path``, so readers (and a process killed mid-write)
+    see either the old file or the new one, never a truncated mix. If the
+    block raises, ``path`` is left untouched.
+
+    Args:
+        path (str): File to replace
+
+    Yields:
+        file: Binary stream to write the new contents to
+    """
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Exclusive cross-process lock for replacing ``path``
+
+    The ``flock`` is taken on a ``.lock`` file beside ``path``, since
+    ``path`` itself is swapped out by every atomic write. Writers that
+    check the file's state and then replace it (StudentManager.save_data,
+    migrate_file) hold this lock across both steps. Threads of one process
+    exclude each other too, as each call opens its own descriptor.
+
+    Args:
+        path (str): File about to be replaced
+    """
+    if fcntl is None:
+        yield
+        return
+    fd = os.open(path + LOCK_SUFFIX, os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)   # also releases the flock
@@ -0,0 +1,292 @@
+"""
+Change Feed
+Ordered log of student inserts, updates and deletes for incremental consumers
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_right
+
+try:
+    import fcntl
+except ImportError:  # no cross-process lock on Windows; one writer process only
+    fcntl = None
+
+CHANGES_SUFFIX = '.changes'
+
+# Every Nth event's byte offset is kept in memory so reads from a sequence
+# number seek close to it instead of scanning the whole log
+CHECKPOINT_EVERY = 1000
+
+
+def changes_path(data_file):
+    """Change log stored alongside a data file"""
+    return data_file + CHANGES_SUFFIX
+
+
+def _line_seq(line):
+    """Sequence number of an encoded event line, without a full JSON parse"""
+    # Lines are written as {"seq":N,...} so the number starts at byte 7
+    return int(line[7:line.index(b',')])
+
+
+def _encode(event):
+    """One JSON line per event, seq first"""
+    return (json.dumps(event, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+class ChangeFeed:
+    """
+    Append-only change log with in-process subscribers
+
+    Each event is a dict ``{'seq', 'ts', 'op', 'student_id', 'fields'}``
+    where ``op`` is 'insert', 'update', 'delete' or 'archive'. Inserts carry
+    the full record, updates only the fields that changed (new values) and
+    deletes and archives no fields; a restored student is a new insert.
+    Sequence numbers increase by one per event and survive restarts.
+
+    Several processes may publish to one log (the app and the CLI, or many
+    app sessions): each append holds an exclusive ``flock`` on the file and
+    first catches up on lines other writers added, so numbering stays
+    gapless. Events from other processes reach this process's subscribers
+    the next time it publishes or reads.
+    """
+
+    def __init__(self, path):
+        """
+        Open or create a change log
+
+        Args:
+            path (str): JSON-lines log file
+        """
+        self.path = path
+        self.last_seq = 0
+        self._checkpoints = []     # (seq, byte offset) of every CHECKPOINT_EVERY-th event
+        self._size = 0
+        self._subscribers = []
+        self._lock = threading.RLock()
+        self._scan()
+
+    def _scan(self):
+        """Find the last sequence number and build seek checkpoints"""
+        self._catch_up()
+
+    def _catch_up(self):
+        """
+        Index complete lines appended since the last look, by any process
+
+        Returns:
+            list: Lines found, as bytes
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if size < self._size:
+            # Rewritten underneath us; index it again from the start
+            self.last_seq, self._checkpoints, self._size = 0, [], 0
+        if size == self._size:
+            return []
+        lines = []
+        offset = self._size
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # another writer is mid-append, or a crash tore it
+                seq = _line_seq(line)
+                if seq % CHECKPOINT_EVERY == 1:
+                    self._checkpoints.append((seq, offset))
+                self.last_seq = seq
+                offset += len(line)
+                lines.append(line)
+        self._size = offset
+        return lines
+
+    def _deliver_foreign(self, lines):
+        """Pass events other processes appended to this process's subscribers"""
+        if lines and self._subscribers:
+            events = [json.loads(line) for line in lines]
+            for callback in list(self._subscribers):
+                self._deliver(callback, events)
+
+    def publish(self, changes):
+        """
+        Number, persist and broadcast a batch of changes
+
+        Args:
+            changes (list): Dicts with 'op', 'student_id' and 'fields'
+
+        Returns:
+            list: The events as published, with 'seq' and 'ts'
+        """
+        if not changes:
+            return []
+        with self._lock:
+            try:
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+            except OSError as e:
+                print(f"Error writing change feed: {e}")
+                return []
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                # Number after whatever other processes appended meanwhile
+                foreign = self._catch_up()
+                end = os.fstat(fd).st_size
+                if end > self._size:
+                    # Only a crash leaves a partial line while we hold the lock
+                    os.ftruncate(fd, self._size)
+                now = time.time()
+                events = []
+                lines = []
+                checkpoints = []
+                offset = self._size
+                seq = self.last_seq
+                for change in changes:
+                    seq += 1
+                    event = {'seq': seq, 'ts': now, **change}
+                    line = _encode(event)
+                    if seq % CHECKPOINT_EVERY == 1:
+                        checkpoints.append((seq, offset))
+                    offset += len(line)
+                    events.append(event)
+                    lines.append(line)
+                payload = b''.join(lines)
+                written = 0
+                while written < len(payload):
+                    written += os.write(fd, payload[written:])
+                self.last_seq = seq
+                self._size = offset
+                self._checkpoints.extend(checkpoints)
+            except OSError as e:
+                print(f"Error writing change feed: {e}")
+                return []
+            finally:
+                os.close(fd)   # also releases the flock
+            self._deliver_foreign(foreign)
+            for callback in list(self._subscribers):
+                self._deliver(callback, events)
+        return events
+
+    @staticmethod
+    def _deliver(callback, events):
+        """Call a subscriber, keeping one faulty consumer from breaking writes"""
+        for event in events:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Error in change feed subscriber: {e}")
+
+    def read(self, since=0, limit=None):
+        """
+        Events after a sequence number, oldest first
+
+        Seeks to the nearest checkpoint, so the cost grows with the number
+        of events returned rather than with the size of the log.
+
+        Args:
+            since (int): Last sequence number the consumer has seen
+            limit (int, optional): Maximum number of events
+
+        Returns:
+            list: Events with seq > since
+        """
+        with self._lock:
+            self._deliver_foreign(self._catch_up())
+            if since >= self.last_seq or not os.path.exists(self.path):
+                return []
+            pos = bisect_right(self._checkpoints, (since + 1, float('inf'))) - 1
+            offset = self._checkpoints[pos][1] if pos >= 0 else 0
+            end = self._size
+            events = []
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                while offset < end and (limit is None or len(events) < limit):
+                    line = f.readline()
+                    offset += len(line)
+                    if _line_seq(line) > since:
+                        events.append(json.loads(line))
+            return events
+
+    def subscribe(self, callback, since=None):
+        """
+        Call ``callback(event)`` for every future change
+
+        Args:
+            callback (callable): Receives one event dict at a time
+            since (int, optional): Replay events after this sequence number
+                first, with no gap before live delivery starts
+
+        Returns:
+            callable: Call it to unsubscribe
+        """
+        with self._lock:
+            if since is not None:
+                self._deliver(callback, self.read(since))
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+
+def tail(path, since=0, follow=False, poll_interval=0.5):
+    """
+    Read a change log from another process
+
+    Args:
+        path (str): Change log file
+        since (int): Last sequence number already processed
+        follow (bool): Keep polling for new events instead of stopping at the end
+        poll_interval (float): Seconds between polls when following
+
+    Yields:
+        dict: Events with seq > since, in order
+    """
+    while not os.path.exists(path):
+        if not follow:
+            return
+        time.sleep(poll_interval)
+
+    with open(path, 'rb') as f:
+        pending = b''
+        while True:
+            line = f.readline()
+            if not line:
+                if not follow:
+                    return
+                time.sleep(poll_interval)
+                continue
+            line = pending + line
+            if not line.endswith(b'\n'):
+                pending = line  # the writer is mid-append
+                continue
+            pending = b''
+            if _line_seq(line) > since:
+                yield json.loads(line)
+
+
+def main(argv=None):
+    """Print change events as JSON lines"""
+    parser = argparse.ArgumentParser(description="Print student change events")
+    parser.add_argument('data_file', help="Data file whose change log to read")
+    parser.add_argument('--since', type=int, default=0, help="Last sequence number already seen")
+    parser.add_argument('--follow', action='store_true', help="Wait for new events")
+    args = parser.parse_args(argv)
+    try:
+        for event in tail(changes_path(args.data_file), args.since, args.follow):
+            print(json.dumps(event), flush=True)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
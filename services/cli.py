@@ -0,0 +1,297 @@
+"""
+Command-Line Interface
+Batch operations on a data file without starting Streamlit
+
+Every command writes JSON lines to stdout, one object per line, so output
+can be piped into jq, another script or a file:
+
+    python -m services.cli stats
+    python -m services.cli search smith --fuzzy --limit 10
+    python -m services.cli export --where "grade = 10 and performance >= Good" --sort name
+    python -m services.cli import new_students.jsonl
+    python -m services.cli update --where "grade = 12" --set grade=Senior
+    python -m services.cli compact --encoding gzip
+    python -m services.cli archive --where "grade = Senior"
+    python -m services.cli restore STU104 STU230
+
+The data file defaults to SMS_DATA_FILE (or data/students.json); pass
+--shard-dir (or set SMS_SHARD_DIR) to work on grade-sharded storage.
+Errors are written to stderr as a JSON line. Exit status is 0 on success,
+1 when some records were rejected or nothing matched, and 2 for usage
+errors.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from services.sharded_manager import ShardedStudentManager
+from services.sorted_index import SORT_KEYS
+from services.storage import ENCODINGS, detect_format, dumps, read_records
+from services.student_manager import StudentManager, TransactionError
+
+UPDATABLE_FIELDS = ('name', 'age', 'grade', 'email', 'phone', 'performance')
+
+
+def _emit(payload, out):
+    """Write one JSON line"""
+    out.write(dumps(payload) + b'\n')
+
+
+def _open_manager(args):
+    """Manager for the selected data file or shard directory"""
+    # Publish changes wherever the app would, so feed consumers see CLI edits
+    change_feed = (os.environ.get('SMS_HISTORY') == '1'
+                   or os.environ.get('SMS_CHANGE_FEED') == '1')
+    if args.shard_dir:
+        return ShardedStudentManager(data_dir=args.shard_dir, encoding=args.encoding or 'compact',
+                                     change_feed=change_feed)
+    return StudentManager(data_file=args.data_file, encoding=args.encoding or 'pretty',
+                          change_feed=change_feed)
+
+
+def _read_input(path):
+    """
+    Records from a JSON array, JSON lines, or a gzip/lzma data file
+
+    Args:
+        path (str): File path, or '-' for stdin
+
+    Returns:
+        list: Record dicts
+    """
+    if path != '-' and detect_format(path) != 'json':
+        return read_records(path)
+    if path == '-':
+        text = sys.stdin.read()
+    else:
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+# Commands. Each returns an exit status.
+
+def cmd_stats(manager, args, out):
+    """Roster statistics as one JSON object"""
+    _emit(manager.get_statistics(include_archived=args.archived), out)
+    return 0
+
+
+def cmd_search(manager, args, out):
+    """Students matching a text (or fuzzy name) search"""
+    if args.fuzzy:
+        students = manager.fuzzy_search(args.text, limit=args.limit or 25)
+    else:
+        students = manager.search_students(args.text, include_archived=args.archived)[:args.limit]
+    for student in students:
+        _emit(student.to_dict(), out)
+    return 0 if students else 1
+
+
+def cmd_export(manager, args, out):
+    """Students as JSON lines, optionally filtered, sorted and limited"""
+    if args.explain:
+        _emit({'plan': manager.explain_query(args.where)}, out)
+        return 0
+    if args.where:
+        students = manager.query(args.where)
+        if args.sort:
+            key = SORT_KEYS[args.sort]
+            students.sort(key=lambda s: (key(s), s.student_id), reverse=args.desc)
+        students = students[:args.limit]
+    elif args.sort:
+        students = manager.sorted_view(args.sort, args.desc, args.limit)
+    else:
+        students = manager.get_all_students()[:args.limit]
+    for student in students:
+        _emit(student.to_dict(), out)
+    return 0
+
+
+def cmd_import(manager, args, out):
+    """Add records with one save; rejected records are reported line by line"""
+    records = _read_input(args.input)
+    added, rejected = manager.import_students(records)
+    for record, errors in rejected:
+        _emit({'rejected': record, 'errors': errors}, out)
+    _emit({'added': added, 'rejected': len(rejected)}, out)
+    return 1 if rejected else 0
+
+
+def _parse_assignments(assignments):
+    """field=value pairs from --set"""
+    changes = {}
+    for assignment in assignments:
+        field, sep, value = assignment.partition('=')
+        if not sep or field not in UPDATABLE_FIELDS:
+            raise ValueError(f"--set expects FIELD=VALUE with FIELD one of "
+                             f"{', '.join(UPDATABLE_FIELDS)}, got {assignment!r}")
+        changes[field] = value
+    return changes
+
+
+def cmd_update(manager, args, out):
+    """
+    Update many students with one save
+
+    Either --where selects students and --set gives the new values, or
+    --input supplies JSON lines of {"student_id": ..., field: value, ...}.
+    """
+    if args.input:
+        updates = []
+        for record in _read_input(args.input):
+            changes = {field: value for field, value in record.items() if field != 'student_id'}
+            updates.append((record.get('student_id'), changes))
+    else:
+        changes = _parse_assignments(args.set)
+        updates = [(student.student_id, changes) for student in manager.query(args.where)]
+
+    failed = []
+    updated = 0
+    with manager.transaction():
+        for student_id, changes in updates:
+            unknown = set(changes) - set(UPDATABLE_FIELDS)
+            if unknown:
+                failed.append((student_id, [f"Unknown fields: {', '.join(sorted(unknown))}"]))
+                continue
+            success, result = manager.update_student(student_id, **changes)
+            if success:
+                updated += 1
+            else:
+                failed.append((student_id, result))
+    for student_id, errors in failed:
+        _emit({'student_id': student_id, 'errors': errors}, out)
+    _emit({'updated': updated, 'failed': len(failed)}, out)
+    return 1 if failed or not updates else 0
+
+
+def cmd_compact(manager, args, out):
+    """
+    Rewrite storage in place: the data file in the chosen encoding (and its
+    persisted indexes), or a shard directory's ID log down to one line per student
+    """
+    path = manager.data_file
+    before = os.path.getsize(path)
+    ok = manager.save_data()
+    if (ok and not isinstance(manager, ShardedStudentManager)
+            and len(manager.students) >= manager.INDEX_PERSIST_THRESHOLD):
+        manager.persist_indexes()
+    _emit({'compacted': ok, 'path': path, 'students': len(manager.get_all_students()),
+           'bytes_before': before, 'bytes_after': os.path.getsize(path)}, out)
+    return 0 if ok else 1
+
+
+def cmd_archive(manager, args, out):
+    """Move students matching a retention policy to the cold store"""
+    archived = manager.archive_students(args.where, args.inactive_days)
+    _emit({'archived': archived, 'remaining': len(manager.get_all_students()),
+           'cold_total': len(manager.cold_store)}, out)
+    return 0 if archived else 1
+
+
+def cmd_restore(manager, args, out):
+    """Move archived students back into the roster"""
+    restored, failed = manager.restore_students(args.student_ids)
+    for student_id, errors in failed:
+        _emit({'student_id': student_id, 'errors': errors}, out)
+    _emit({'restored': restored, 'failed': len(failed)}, out)
+    return 1 if failed else 0
+
+
+COMMANDS = {
+    'stats': cmd_stats,
+    'search': cmd_search,
+    'export': cmd_export,
+    'import': cmd_import,
+    'update': cmd_update,
+    'compact': cmd_compact,
+    'archive': cmd_archive,
+    'restore': cmd_restore,
+}
+
+
+def build_parser():
+    """Argument parser for every command"""
+    parser = argparse.ArgumentParser(prog='python -m services.cli',
+                                     description="Batch operations on the student data file")
+    parser.add_argument('--data-file', default=os.environ.get('SMS_DATA_FILE', 'data/students.json'))
+    parser.add_argument('--shard-dir', default=os.environ.get('SMS_SHARD_DIR'),
+                        help="Use grade-sharded storage in this directory instead")
+    parser.add_argument('--encoding', choices=ENCODINGS,
+                        default=os.environ.get('SMS_DATA_ENCODING'),
+                        help="Encoding for files this command writes")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    stats = commands.add_parser('stats', help="Roster statistics")
+    stats.add_argument('--archived', action='store_true', help="Count archived students too")
+
+    search = commands.add_parser('search', help="Search by name, ID or email")
+    search.add_argument('text')
+    search.add_argument('--fuzzy', action='store_true', help="Typo-tolerant name search")
+    search.add_argument('--limit', type=int)
+    search.add_argument('--archived', action='store_true',
+                        help="Also search archived students (ignored with --fuzzy)")
+
+    export = commands.add_parser('export', help="Write students as JSON lines")
+    export.add_argument('--where', help="Query-language filter")
+    export.add_argument('--sort', choices=list(SORT_KEYS))
+    export.add_argument('--desc', action='store_true')
+    export.add_argument('--limit', type=int)
+    export.add_argument('--explain', action='store_true',
+                        help="Print the plan for --where instead of the students")
+
+    add = commands.add_parser('import', help="Add students from a JSON array or JSON lines")
+    add.add_argument('input', help="File to read, or - for stdin")
+
+    update = commands.add_parser('update', help="Update many students in one save")
+    source = update.add_mutually_exclusive_group(required=True)
+    source.add_argument('--where', help="Query selecting the students to change")
+    source.add_argument('--input', help="JSON lines of student_id plus new values (- for stdin)")
+    update.add_argument('--set', action='append', default=[], metavar='FIELD=VALUE',
+                        help="New value for every student matched by --where")
+
+    commands.add_parser('compact', help="Rewrite the data file or shard directory log")
+
+    archive = commands.add_parser('archive', help="Move students to the compressed cold store")
+    archive.add_argument('--where', help="Query selecting the students to archive")
+    archive.add_argument('--inactive-days', type=int,
+                         help="Only students with no change in this many days (needs SMS_CHANGE_FEED=1)")
+
+    restore = commands.add_parser('restore', help="Move archived students back into the roster")
+    restore.add_argument('student_ids', nargs='+')
+    return parser
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'update' and args.where and not args.set:
+        parser.error("update --where needs at least one --set FIELD=VALUE")
+    if args.command == 'export' and args.explain and not args.where:
+        parser.error("export --explain needs --where")
+    if args.command == 'archive' and args.where is None and args.inactive_days is None:
+        parser.error("archive needs --where, --inactive-days or both")
+
+    out = sys.stdout.buffer
+    try:
+        manager = _open_manager(args)
+        status = COMMANDS[args.command](manager, args, out)
+        out.flush()
+        return status
+    except BrokenPipeError:
+        # Reader went away (e.g. piped into head); stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except (ValueError, OSError, TransactionError) as e:
+        # QueryError and bad JSON input are ValueErrors: a usage problem
+        _emit({'error': str(e)}, sys.stderr.buffer)
+        return 2 if isinstance(e, ValueError) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
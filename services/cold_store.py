@@ -0,0 +1,206 @@
+"""
+Cold Store
+Compressed archive tier for students kept out of the in-memory roster
+
+Archived students live in a directory next to the data file:
+
+    students.json.cold/
+        students.json.gz    every archived record
+        summary.json        IDs plus counts for statistics
+
+Only the summary is read to answer "is this ID archived?" and to add the
+archive to statistics. The records themselves are decompressed on the
+first lookup or search that needs them.
+"""
+
+import json
+import os
+import threading
+
+from models.student import Student
+from services.atomic_file import atomic_write
+from services.storage import read_records, write_records
+
+COLD_SUFFIX = '.cold'
+RECORDS_FILE = 'students.json.gz'
+SUMMARY_FILE = 'summary.json'
+
+
+def cold_dir(data_file):
+    """Cold store directory stored alongside a data file"""
+    return data_file + COLD_SUFFIX
+
+
+def _summarize(records):
+    """IDs, count, age total and distributions of archived records"""
+    performance_dist = {}
+    grade_dist = {}
+    for record in records:
+        performance_dist[record['performance']] = performance_dist.get(record['performance'], 0) + 1
+        grade_dist[record['grade']] = grade_dist.get(record['grade'], 0) + 1
+    return {
+        'count': len(records),
+        'age_total': sum(record['age'] for record in records),
+        'performance_distribution': performance_dist,
+        'grade_distribution': grade_dist,
+        'ids': sorted(record['student_id'] for record in records),
+    }
+
+
+class ColdStore:
+    """
+    Archived students of one data file, loaded on demand
+    """
+
+    def __init__(self, data_file):
+        """
+        Args:
+            data_file (str): The hot data file this archive belongs to
+        """
+        self.directory = cold_dir(data_file)
+        self.records_path = os.path.join(self.directory, RECORDS_FILE)
+        self.summary_path = os.path.join(self.directory, SUMMARY_FILE)
+        self._summary = None    # read on first use
+        self._ids = None
+        self._students = None   # student_id -> Student, decompressed on first lookup
+        self._lock = threading.RLock()
+
+    def _load_summary(self):
+        """Read the summary, rebuilding it from the records if it is missing"""
+        with self._lock:
+            if self._summary is not None:
+                return self._summary
+            if os.path.exists(self.summary_path):
+                with open(self.summary_path, encoding='utf-8') as f:
+                    summary = json.load(f)
+            elif os.path.exists(self.records_path):
+                summary = _summarize(read_records(self.records_path))
+            else:
+                summary = _summarize([])
+            self._ids = set(summary['ids'])
+            self._summary = summary
+            return summary
+
+    def _load_students(self):
+        """Decompress every archived record"""
+        with self._lock:
+            if self._students is None:
+                records = read_records(self.records_path) if os.path.exists(self.records_path) else []
+                self._students = {r['student_id']: Student.from_dict(r) for r in records}
+            return self._students
+
+    def __len__(self):
+        """Number of archived students"""
+        return self._load_summary()['count']
+
+    def __contains__(self, student_id):
+        """Whether a student ID is archived, without reading the records"""
+        self._load_summary()
+        return student_id in self._ids
+
+    def get(self, student_id):
+        """
+        Get an archived student
+
+        Args:
+            student_id (str): Student ID
+
+        Returns:
+            Student or None: Student object if archived
+        """
+        if student_id not in self:
+            return None
+        return self._load_students().get(student_id)
+
+    def students(self):
+        """
+        Every archived student
+
+        Returns:
+            list: Student objects
+        """
+        if not len(self):
+            return []
+        return list(self._load_students().values())
+
+    def search(self, query):
+        """
+        Archived students whose name, ID or email contains the query
+
+        Args:
+            query (str): Lowercase search text
+
+        Returns:
+            list: Matching Student objects
+        """
+        return [s for s in self.students()
+                if query in s.name.lower() or query in s.student_id.lower()
+                or query in s.email.lower()]
+
+    def summary(self):
+        """
+        Counts for statistics
+
+        Returns:
+            dict: 'count', 'age_total', 'performance_distribution' and
+                'grade_distribution'
+        """
+        return {key: value for key, value in self._load_summary().items() if key != 'ids'}
+
+    def _write(self, students):
+        """Persist the full archive: records first, then the summary that indexes them"""
+        os.makedirs(self.directory, exist_ok=True)
+        records = [s.to_dict() for s in students.values()]
+        summary = _summarize(records)
+        write_records(self.records_path, records, 'gzip')
+        with atomic_write(self.summary_path) as f:
+            f.write(json.dumps(summary).encode('utf-8'))
+        self._students = students
+        self._summary = summary
+        self._ids = set(summary['ids'])
+
+    def add(self, students):
+        """
+        Archive students, replacing any archived copy with the same ID
+
+        Args:
+            students (list): Student objects
+
+        Returns:
+            bool: True if written
+        """
+        with self._lock:
+            archived = dict(self._load_students())
+            archived.update((s.student_id, s) for s in students)
+            try:
+                self._write(archived)
+                return True
+            except Exception as e:
+                print(f"Error writing cold store: {e}")
+                return False
+
+    def remove(self, student_ids):
+        """
+        Drop students from the archive
+
+        Args:
+            student_ids (iterable): Student IDs
+
+        Returns:
+            bool: True if written
+        """
+        with self._lock:
+            archived = dict(self._load_students())
+            for student_id in student_ids:
+                archived.pop(student_id, None)
+            try:
+                self._write(archived)
+                return True
+            except Exception as e:
+                print(f"Error writing cold store: {e}")
+                return False
+
+    def release(self):
+        """Drop decompressed records from memory; the summary stays loaded"""
+        with self._lock:
+            self._students = None
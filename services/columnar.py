@@ -0,0 +1,396 @@
+"""
+Columnar Snapshot
+Binary, memory-mapped roster format with lazily decoded rows
+
+Layout (native byte order, recorded in the metadata):
+    header      magic, version, row count, metadata length
+    metadata    JSON: category tables and section offsets
+    age         uint8 per row
+    grade       uint8 category code per row
+    performance uint8 category code per row
+    <text>      uint32 offsets (rows + 1) and a UTF-8 blob, for each text field
+    id_order    uint32 row numbers sorted by student_id
+"""
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+
+from models.student import Student
+from services.atomic_file import atomic_write
+
+MAGIC = b'SMSCOL01'
+VERSION = 1
+SNAPSHOT_EXTENSION = '.smsc'
+
+HEADER = struct.Struct('<8sHHII')   # magic, version, reserved, rows, metadata length
+TEXT_FIELDS = ('student_id', 'name', 'email', 'phone')
+CATEGORY_FIELDS = ('grade', 'performance')
+
+
+def is_snapshot(path):
+    """
+    Check whether a file is a columnar snapshot
+
+    Args:
+        path (str): File to inspect
+
+    Returns:
+        bool: True when the file starts with the snapshot magic
+    """
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _align(offset, to=8):
+    """Round an offset up to a multiple of ``to``"""
+    return (offset + to - 1) // to * to
+
+
+def write_snapshot(path, students):
+    """
+    Write students to a columnar snapshot
+
+    Args:
+        path (str): Output file
+        students (iterable): Student objects or student dicts
+    """
+    rows = [s.to_dict() if isinstance(s, Student) else s for s in students]
+    count = len(rows)
+    payloads = []
+
+    def add_section(name, data):
+        payloads.append((name, data))
+
+    add_section('age', array('B', (int(r['age']) for r in rows)).tobytes())
+
+    categories = {}
+    for field in CATEGORY_FIELDS:
+        values = sorted({r[field] for r in rows})
+        if len(values) > 255:
+            raise ValueError(f"Too many distinct {field} values for a uint8 column")
+        codes = {value: code for code, value in enumerate(values)}
+        categories[field] = values
+        add_section(field, array('B', (codes[r[field]] for r in rows)).tobytes())
+
+    for field in TEXT_FIELDS:
+        encoded = [r[field].encode('utf-8') for r in rows]
+        offsets = array('I', [0])
+        total = 0
+        for value in encoded:
+            total += len(value)
+            offsets.append(total)
+        add_section(f"{field}.offsets", offsets.tobytes())
+        add_section(f"{field}.blob", b''.join(encoded))
+
+    id_order = sorted(range(count), key=lambda i: rows[i]['student_id'])
+    add_section('id_order', array('I', id_order).tobytes())
+
+    # Metadata size depends on offsets, so lay out sections after a
+    # generously sized metadata estimate and pad the remainder
+    meta = {'byteorder': sys.byteorder, 'categories': categories, 'sections': {}}
+    reserve = len(json.dumps(meta)) + 64 * len(payloads) + 256
+    offset = _align(HEADER.size + reserve)
+    for name, data in payloads:
+        meta['sections'][name] = [offset, len(data)]
+        offset = _align(offset + len(data))
+    meta_bytes = json.dumps(meta).encode('utf-8')
+    if len(meta_bytes) > reserve:
+        raise ValueError("Snapshot metadata exceeded its reserved space")
+
+    # Readers mmap the file, so never rewrite it under them: a snapshot
+    # truncated in place faults any process still mapping the old one
+    with atomic_write(path) as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, count, len(meta_bytes)))
+        f.write(meta_bytes)
+        for name, data in payloads:
+            f.seek(meta['sections'][name][0])
+            f.write(data)
+        f.truncate(offset)
+
+
+class ColumnarSnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file
+
+    Opening costs only a header read; rows are decoded into Student objects
+    on access, and statistics, filters and search run over the raw columns.
+    """
+
+    def __init__(self, path):
+        """
+        Open and map a snapshot
+
+        Args:
+            path (str): Snapshot file
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self._file.close()
+            raise ValueError(f"{path} is not a columnar snapshot")
+        magic, version, _, self.count, meta_len = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} columnar snapshot")
+        meta = json.loads(self._mm[HEADER.size:HEADER.size + meta_len])
+        if meta['byteorder'] != sys.byteorder:
+            self.close()
+            raise ValueError(f"{path} was written with {meta['byteorder']}-endian byte order")
+
+        self.categories = meta['categories']
+        view = memoryview(self._mm)
+        self._sections = {
+            name: view[start:start + length]
+            for name, (start, length) in meta['sections'].items()
+        }
+        self.ages = self._sections['age']
+        self._offsets = {f: self._sections[f"{f}.offsets"].cast('I') for f in TEXT_FIELDS}
+        self._id_order = self._sections['id_order'].cast('I')
+
+    def close(self):
+        """Release the memory map and file handle"""
+        views = list(self.__dict__.pop('_offsets', {}).values())
+        views += list(self.__dict__.pop('_sections', {}).values())
+        views += [self.__dict__.pop('_id_order', None), self.__dict__.pop('ages', None)]
+        for view in views:
+            if view is not None:
+                view.release()
+        if getattr(self, '_mm', None) is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass  # a caller still holds a view; the map closes when it is released
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def _text(self, field, row):
+        """Decode one text value"""
+        offsets = self._offsets[field]
+        return bytes(self._sections[f"{field}.blob"][offsets[row]:offsets[row + 1]]).decode('utf-8')
+
+    def _category(self, field, row):
+        """Decode one categorical value"""
+        return self.categories[field][self._sections[field][row]]
+
+    def row(self, index):
+        """
+        Decode a single row
+
+        Args:
+            index (int): Row number
+
+        Returns:
+            Student: Hydrated student
+        """
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return Student(
+            student_id=self._text('student_id', index),
+            name=self._text('name', index),
+            age=self.ages[index],
+            grade=self._category('grade', index),
+            email=self._text('email', index),
+            phone=self._text('phone', index),
+            performance=self._category('performance', index)
+        )
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        return self.row(index)
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.row(index)
+
+    def find(self, student_id):
+        """
+        Binary-search the ID order for a student
+
+        Args:
+            student_id (str): Student ID
+
+        Returns:
+            int or None: Row number if found
+        """
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = self._text('student_id', self._id_order[mid])
+            if value < student_id:
+                lo = mid + 1
+            elif value > student_id:
+                hi = mid
+            else:
+                return self._id_order[mid]
+        return None
+
+    def get_student_by_id(self, student_id):
+        """
+        Look up a student by ID
+
+        Args:
+            student_id (str): Student ID
+
+        Returns:
+            Student or None: Student if found
+        """
+        index = self.find(student_id)
+        return None if index is None else self.row(index)
+
+    def _rows_with_byte(self, column, code):
+        """Row numbers whose uint8 column equals ``code``"""
+        data = bytes(column)
+        needle = bytes([code])
+        rows = []
+        pos = data.find(needle)
+        while pos != -1:
+            rows.append(pos)
+            pos = data.find(needle, pos + 1)
+        return rows
+
+    def _filter_category(self, field, value):
+        """Students whose categorical field equals ``value``"""
+        try:
+            code = self.categories[field].index(value)
+        except ValueError:
+            return []
+        return [self.row(i) for i in self._rows_with_byte(self._sections[field], code)]
+
+    def filter_by_grade(self, grade):
+        """Students in a grade"""
+        return self._filter_category('grade', grade)
+
+    def filter_by_performance(self, performance):
+        """Students at a performance level"""
+        return self._filter_category('performance', performance)
+
+    def filter_by_age_range(self, min_age, max_age):
+        """Students whose age is within [min_age, max_age]"""
+        table = bytes(1 if min_age <= age <= max_age else 0 for age in range(256))
+        mask = bytes(self.ages).translate(table)
+        return [self.row(i) for i in self._rows_with_byte(mask, 1)]
+
+    def search_students(self, query):
+        """
+        Case-insensitive substring search over name, ID and email
+
+        Args:
+            query (str): Search query
+
+        Returns:
+            list: Matching students in row order
+        """
+        needle = query.lower().encode('utf-8')
+        rows = set()
+        for field in ('name', 'student_id', 'email'):
+            blob = bytes(self._sections[f"{field}.blob"]).lower()
+            offsets = self._offsets[field]
+            pos = blob.find(needle)
+            while pos != -1:
+                row = bisect_right(offsets, pos) - 1
+                if pos + len(needle) <= offsets[row + 1]:
+                    rows.add(row)
+                    pos = blob.find(needle, offsets[row + 1])
+                else:
+                    pos = blob.find(needle, pos + 1)
+        return [self.row(i) for i in sorted(rows)]
+
+    def get_statistics(self):
+        """
+        Aggregates computed from the raw columns
+
+        Returns:
+            dict: Same shape as StudentManager.get_statistics
+        """
+        if not self.count:
+            return {'total': 0, 'avg_age': 0, 'performance_distribution': {},
+                    'grade_distribution': {}}
+
+        def distribution(field):
+            data = bytes(self._sections[field])
+            counts = {value: data.count(bytes([code]))
+                      for code, value in enumerate(self.categories[field])}
+            return {value: n for value, n in counts.items() if n}
+
+        return {
+            'total': self.count,
+            'avg_age': round(sum(self.ages) / self.count, 1),
+            'performance_distribution': distribution('performance'),
+            'grade_distribution': distribution('grade')
+        }
+
+
+def convert_json_to_snapshot(json_path, snapshot_path):
+    """
+    Convert a JSON data file to a columnar snapshot
+
+    Args:
+        json_path (str): Source JSON file
+        snapshot_path (str): Destination snapshot
+
+    Returns:
+        int: Number of students written
+    """
+    with open(json_path) as f:
+        data = json.load(f)
+    write_snapshot(snapshot_path, data)
+    return len(data)
+
+
+def convert_snapshot_to_json(snapshot_path, json_path):
+    """
+    Convert a columnar snapshot back to the JSON data file format
+
+    Args:
+        snapshot_path (str): Source snapshot
+        json_path (str): Destination JSON file
+
+    Returns:
+        int: Number of students written
+    """
+    with ColumnarSnapshot(snapshot_path) as snapshot:
+        data = [student.to_dict() for student in snapshot]
+    with open(json_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    return len(data)
+
+
+def main(argv=None):
+    """Command-line converter between JSON and snapshot files"""
+    parser = argparse.ArgumentParser(description="Convert between JSON and columnar snapshots")
+    parser.add_argument('direction', choices=['to-snapshot', 'to-json'])
+    parser.add_argument('source')
+    parser.add_argument('destination')
+    args = parser.parse_args(argv)
+
+    if args.direction == 'to-snapshot':
+        count = convert_json_to_snapshot(args.source, args.destination)
+    else:
+        count = convert_snapshot_to_json(args.source, args.destination)
+    print(f"Converted {count} students to {args.destination}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
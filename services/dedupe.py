@@ -0,0 +1,285 @@
+"""
+Near-Duplicate Detection
+Finds students that are probably the same person enrolled twice
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import zlib
+from collections import defaultdict
+from itertools import combinations
+
+from services.storage import ENCODINGS
+from services.student_manager import StudentManager
+from services.validation import Validator
+
+# MinHash over trigrams, split into LSH bands. Two names with Jaccard
+# similarity s share a band of r rows with probability s**r, so with 10
+# bands of 3 rows a one-letter typo (s ~ 0.65) meets ~95% of the time.
+NUM_PERM = 30
+BANDS = 10
+
+# Shingled _features() fields with their own LSH bands; a pair sharing a
+# band on either is a candidate
+LSH_FIELDS = ('name', 'email_key')
+
+# Blocks bigger than this are too unspecific to compare pairwise (e.g. a
+# very common name within one grade); the other blocking keys still apply
+MAX_BUCKET = 50
+
+DEFAULT_THRESHOLD = 0.75
+
+# Field weights for the pair score
+WEIGHTS = {'name': 0.45, 'email': 0.2, 'phone': 0.2, 'age': 0.075, 'grade': 0.075}
+
+_PRIME = (1 << 61) - 1
+
+_EMAIL_NOISE = re.compile(r'[\d._+-]')
+
+
+def shingles(text, size=3):
+    """
+    Character n-grams of a lowercased, space-normalized string
+
+    Args:
+        text (str): Text to split
+        size (int): n-gram length
+
+    Returns:
+        set: n-gram strings (the padded text itself when shorter than ``size``)
+    """
+    text = f" {' '.join(text.lower().split())} "
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def jaccard(a, b):
+    """Jaccard similarity of two sets"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """Fixed family of hash permutations producing MinHash signatures"""
+
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        """
+        Args:
+            num_perm (int): Signature length
+            seed (int): Seed for the permutation coefficients
+        """
+        rng = random.Random(seed)
+        self.coefficients = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME))
+                             for _ in range(num_perm)]
+        self._rows = {}     # shingle -> its value under every permutation
+
+    def _row(self, gram):
+        """Permuted hashes of one shingle, computed once per distinct shingle"""
+        row = self._rows.get(gram)
+        if row is None:
+            h = zlib.crc32(gram.encode('utf-8'))
+            row = self._rows[gram] = tuple((a * h + b) % _PRIME for a, b in self.coefficients)
+        return row
+
+    def signature(self, grams):
+        """
+        MinHash signature of a set of strings
+
+        Args:
+            grams (set): Shingles
+
+        Returns:
+            tuple: One minimum per permutation
+        """
+        return tuple(map(min, zip(*[self._row(gram) for gram in grams])))
+
+
+def _features(student):
+    """Normalized values a pair score is computed from"""
+    email = Validator.normalize_email(student.email)
+    local, _, domain = email.rpartition('@')
+    return {
+        'name': shingles(student.name),
+        'email': email,
+        'email_local': shingles(local),
+        # Blocking key: digits and separators dropped, so "jsmith2" and
+        # "j.smith" land with "jsmith" and reused addresses group together
+        'email_key': shingles(_EMAIL_NOISE.sub('', local)),
+        'domain': domain,
+        'phone': Validator.normalize_phone(student.phone),
+        'age': student.age,
+        'grade': student.grade,
+    }
+
+
+def _score_features(a, b, threshold=0.0):
+    """
+    Weighted similarity of two _features() dicts
+
+    Cheap fields are scored first; once even a perfect match on the rest
+    could not reach ``threshold`` the pair is abandoned.
+
+    Returns:
+        tuple or None: (score, per-field similarities), or None below threshold
+    """
+    if a['phone'] == b['phone']:
+        phone = 1.0
+    else:
+        phone = 0.5 if a['phone'][-4:] == b['phone'][-4:] else 0.0
+    age = 1.0 if abs(a['age'] - b['age']) <= 1 else 0.0
+    grade = 1.0 if a['grade'] == b['grade'] else 0.0
+    partial = WEIGHTS['phone'] * phone + WEIGHTS['age'] * age + WEIGHTS['grade'] * grade
+    if partial + WEIGHTS['email'] + WEIGHTS['name'] < threshold:
+        return None
+
+    if a['email'] == b['email']:
+        email = 1.0
+    else:
+        email = jaccard(a['email_local'], b['email_local'])
+    partial += WEIGHTS['email'] * email
+    if partial + WEIGHTS['name'] < threshold:
+        return None
+
+    name = jaccard(a['name'], b['name'])
+    score = partial + WEIGHTS['name'] * name
+    if score < threshold:
+        return None
+    parts = {'name': name, 'email': email, 'phone': phone, 'age': age, 'grade': grade}
+    return round(score, 3), {field: round(value, 3) for field, value in parts.items()}
+
+
+def score_pair(a, b):
+    """
+    How alike two students' records are
+
+    Args:
+        a (Student): First student
+        b (Student): Second student
+
+    Returns:
+        tuple: (score between 0 and 1, dict of per-field similarities)
+    """
+    return _score_features(_features(a), _features(b))
+
+
+def _lsh_candidates(features, field, hasher, rows, bands, max_bucket):
+    """
+    Positions of students sharing a block and an LSH band of one shingled field
+
+    Returns:
+        set: Pairs encoded as left * len(features) + right, left < right
+    """
+    # Students with the same shingles in the same block form one group,
+    # so LSH buckets grow with distinct values rather than with students
+    group_ids = {}
+    groups = []         # group id -> (block, shingles, member positions)
+    for position, feature in enumerate(features):
+        key = frozenset(feature[field])
+        for block in (('grade', feature['grade']), ('phone', feature['phone'][-4:]),
+                      ('domain', feature['domain'])):
+            group_id = group_ids.setdefault((block, key), len(groups))
+            if group_id == len(groups):
+                groups.append((block, key, []))
+            groups[group_id][2].append(position)
+
+    band_cache = {}     # shingles -> band hashes
+    buckets = defaultdict(list)
+    for group_id, (block, key, _) in enumerate(groups):
+        band_hashes = band_cache.get(key)
+        if band_hashes is None:
+            signature = hasher.signature(key)
+            band_hashes = band_cache[key] = [
+                hash((band, signature[band * rows:(band + 1) * rows])) for band in range(bands)]
+        for band_hash in band_hashes:
+            buckets[(block, band_hash)].append(group_id)
+
+    group_pairs = set()
+    for group_list in buckets.values():
+        if len(group_list) > 1 and sum(len(groups[g][2]) for g in group_list) <= max_bucket:
+            group_pairs.update(combinations(group_list, 2))
+
+    # Pairs are encoded as left * count + right so the set holds plain ints
+    count = len(features)
+    candidates = set()
+    for _, _, members in groups:
+        if 1 < len(members) <= max_bucket:
+            candidates.update(left * count + right for left, right in combinations(members, 2))
+    for first, second in group_pairs:
+        for left in groups[first][2]:
+            for right in groups[second][2]:
+                candidates.add(min(left, right) * count + max(left, right))
+    return candidates
+
+
+def find_near_duplicates(students, threshold=DEFAULT_THRESHOLD, num_perm=NUM_PERM,
+                         bands=BANDS, max_bucket=MAX_BUCKET):
+    """
+    Find pairs of students that are probably the same person
+
+    Candidates must share a blocking key (grade, last four phone digits or
+    email domain) and an LSH band of the MinHash signature of their name or
+    of their email's local part, so only a small fraction of all pairs is
+    ever scored. The email bands catch a re-enrollment whose name was
+    spelled differently but whose address was reused or barely changed.
+
+    Args:
+        students (list): Student objects
+        threshold (float): Minimum score to report
+        num_perm (int): MinHash signature length
+        bands (int): LSH bands (must divide num_perm)
+        max_bucket (int): Skip buckets with more students than this
+
+    Returns:
+        list: Dicts with 'score', 'left', 'right' (student IDs) and
+        'fields' (per-field similarity), highest score first
+    """
+    if num_perm % bands:
+        raise ValueError("bands must divide num_perm")
+    rows = num_perm // bands
+    hasher = MinHasher(num_perm)
+
+    features = [_features(student) for student in students]
+    candidates = set()
+    for field in LSH_FIELDS:
+        candidates |= _lsh_candidates(features, field, hasher, rows, bands, max_bucket)
+
+    count = len(features)
+    pairs = []
+    for pair in candidates:
+        left, right = divmod(pair, count)
+        scored = _score_features(features[left], features[right], threshold)
+        if scored is not None:
+            pairs.append({'score': scored[0], 'left': students[left].student_id,
+                          'right': students[right].student_id, 'fields': scored[1]})
+    pairs.sort(key=lambda pair: (-pair['score'], pair['left'], pair['right']))
+    return pairs
+
+
+def main(argv=None):
+    """Report near-duplicate students as JSON lines, or merge a pair"""
+    parser = argparse.ArgumentParser(description="Find students enrolled more than once")
+    parser.add_argument('data_file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--merge', nargs=2, metavar=('KEEP_ID', 'DROP_ID'),
+                        help="Delete DROP_ID, keeping KEEP_ID's record")
+    parser.add_argument('--encoding', choices=ENCODINGS, default='pretty',
+                        help="Encoding used when --merge saves the data file")
+    args = parser.parse_args(argv)
+
+    manager = StudentManager(data_file=args.data_file, encoding=args.encoding)
+    if args.merge:
+        success, result = manager.merge_students(*args.merge)
+        print(json.dumps({'merged': success, 'result': result}))
+        return 0 if success else 1
+    for pair in find_near_duplicates(manager.get_all_students(), args.threshold):
+        print(json.dumps(pair))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
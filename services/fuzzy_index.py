@@ -0,0 +1,235 @@
+"""
+Fuzzy Index
+Typo-tolerant name lookup with a BK-tree over name tokens
+"""
+
+import heapq
+import time
+
+
+def levenshtein(a, b):
+    """
+    Edit distance between two strings (insertions, deletions, substitutions)
+
+    Args:
+        a (str): First string
+        b (str): Second string
+
+    Returns:
+        int: Minimum number of single-character edits
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def default_max_distance(token):
+    """Edits tolerated for a query token: none for very short ones, more for long ones"""
+    if len(token) <= 2:
+        return 0
+    if len(token) <= 5:
+        return 1
+    return 2
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree of distinct words under Levenshtein distance
+
+    The triangle inequality lets a query skip every subtree whose edge
+    distance is outside ``[d - k, d + k]``, so only a small part of the
+    vocabulary is compared against.
+    """
+
+    def __init__(self):
+        """Initialize an empty tree"""
+        self._root = None   # [word, {distance: child node}]
+        self._size = 0
+
+    def add(self, word):
+        """
+        Insert a word if it is not already present
+
+        Args:
+            word (str): Word to add
+        """
+        if self._root is None:
+            self._root = [word, {}]
+            self._size = 1
+            return
+        node = self._root
+        while True:
+            distance = levenshtein(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [word, {}]
+                self._size += 1
+                return
+            node = child
+
+    def search(self, word, max_distance, deadline=None):
+        """
+        Find words within an edit distance
+
+        Args:
+            word (str): Query word
+            max_distance (int): Largest distance to accept
+            deadline (float, optional): time.perf_counter() value after
+                which the search stops and returns what it has found
+
+        Returns:
+            list: (distance, word) pairs, unordered
+        """
+        if self._root is None:
+            return []
+        matches = []
+        stack = [self._root]
+        visited = 0
+        while stack:
+            visited += 1
+            if deadline is not None and visited % 64 == 0 and time.perf_counter() > deadline:
+                break
+            node_word, children = stack.pop()
+            distance = levenshtein(word, node_word)
+            if distance <= max_distance:
+                matches.append((distance, node_word))
+            low, high = distance - max_distance, distance + max_distance
+            stack.extend(child for edge, child in children.items() if low <= edge <= high)
+        return matches
+
+    def __len__(self):
+        """Number of distinct words"""
+        return self._size
+
+
+class FuzzyNameIndex:
+    """
+    Name tokens in a BK-tree, plus the students holding each token
+
+    Removed tokens stay in the tree (BK-trees do not support deletion);
+    they simply map to no students until they are used again.
+    """
+
+    def __init__(self):
+        """Initialize an empty index"""
+        self._tree = BKTree()
+        self._postings = {}     # token -> set of student IDs
+        self._tokens = {}       # student_id -> tuple of name tokens
+
+    @staticmethod
+    def _tokenize(name):
+        """Lowercase name parts"""
+        return tuple(name.lower().split())
+
+    def build(self, students):
+        """
+        Rebuild the index from scratch
+
+        Args:
+            students (list): List of Student objects
+        """
+        self.__init__()
+        for student in students:
+            self.add(student)
+
+    def add(self, student):
+        """
+        Index a student's name, replacing any previous entry for its ID
+
+        Args:
+            student (Student): Student to add
+        """
+        self.remove(student.student_id)
+        tokens = self._tokenize(student.name)
+        self._tokens[student.student_id] = tokens
+        for token in tokens:
+            holders = self._postings.get(token)
+            if holders is None:
+                holders = self._postings[token] = set()
+                self._tree.add(token)
+            holders.add(student.student_id)
+
+    def remove(self, student_id):
+        """
+        Drop a student from the index
+
+        Args:
+            student_id (str): Student ID to remove
+        """
+        for token in self._tokens.pop(student_id, ()):
+            self._postings[token].discard(student_id)
+
+    def search(self, query, limit=25, max_distance=None, budget_ms=50):
+        """
+        Rank students by how closely their name matches the query
+
+        Every query word must match some word of the name within its
+        tolerance; the score is the sum of those edit distances.
+
+        Args:
+            query (str): Name or partial name, typos allowed
+            limit (int): Maximum number of results
+            max_distance (int, optional): Edits tolerated per word
+                (default depends on word length)
+            budget_ms (float): Time budget; when it runs out the best
+                matches found so far are returned
+
+        Returns:
+            list: (score, student_id) pairs, best first
+        """
+        query_tokens = self._tokenize(query or "")
+        if not query_tokens:
+            return []
+        deadline = time.perf_counter() + budget_ms / 1000
+
+        # Closest distance from each query word to every vocabulary word it matches
+        token_distances = []
+        for token in query_tokens:
+            tolerance = default_max_distance(token) if max_distance is None else max_distance
+            token_distances.append({word: distance for distance, word
+                                    in self._tree.search(token, tolerance, deadline)})
+
+        # Candidates hold a word matching the first query word. Words are
+        # visited closest first and a name never scores below its first-word
+        # distance, so scanning stops once the top ``limit`` cannot improve.
+        scored = []
+        seen = set()
+        single = len(token_distances) == 1
+        for word, distance in sorted(token_distances[0].items(), key=lambda item: item[1]):
+            if len(scored) >= limit and heapq.nsmallest(limit, scored)[-1][0] <= distance:
+                break
+            for student_id in self._postings.get(word, ()):
+                if student_id in seen:
+                    continue
+                seen.add(student_id)
+                if single:
+                    scored.append((distance, student_id))
+                    if len(scored) >= limit:
+                        break
+                    continue
+                name_tokens = self._tokens[student_id]
+                score = 0
+                for distances in token_distances:
+                    best = min((distances[t] for t in name_tokens if t in distances), default=None)
+                    if best is None:
+                        break
+                    score += best
+                else:
+                    scored.append((score, student_id))
+                if len(seen) % 256 == 0 and len(scored) >= limit and time.perf_counter() > deadline:
+                    return heapq.nsmallest(limit, scored)
+        return heapq.nsmallest(limit, scored)
+
+    def __len__(self):
+        """Number of indexed students"""
+        return len(self._tokens)
@@ -0,0 +1,246 @@
+"""
+Roster History
+Point-in-time views rebuilt from periodic base snapshots plus change-feed deltas
+"""
+
+import os
+import re
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime
+
+from models.student import Student
+from services.storage import read_records, write_records
+from services.student_manager import StudentManager
+
+HISTORY_SUFFIX = '.history'
+
+_BASE_NAME = re.compile(r'^base-(\d+)-(\d+)\.json\.gz$')
+
+
+def history_dir(data_file):
+    """History directory stored alongside a data file"""
+    return data_file + HISTORY_SUFFIX
+
+
+class HistoricalView(StudentManager):
+    """
+    Read-only manager over the roster as it was at one point in time
+
+    Supports every query a StudentManager does (get_statistics, filters,
+    search, typeahead) over the active roster; archived students are not
+    part of a view. Mutations raise TypeError.
+    """
+
+    # Views live in memory only, so always build indexes synchronously
+    INDEX_PERSIST_THRESHOLD = float('inf')
+
+    def __init__(self, students, seq, timestamp):
+        """
+        Args:
+            students (list): Student objects as of ``timestamp``
+            seq (int): Last change-feed sequence number included
+            timestamp (float): Requested point in time (epoch seconds)
+        """
+        self.seq = seq
+        self.timestamp = timestamp
+        self._snapshot = students
+        super().__init__(data_file=f"history@{seq}")
+
+    def _ensure_data_directory(self):
+        """Views have no data file"""
+        pass
+
+    def _open_cold_store(self):
+        """Views have no archive on disk"""
+        return _EmptyArchive()
+
+    def load_data(self, background=False):
+        """Adopt the reconstructed students"""
+        self.students = self._snapshot
+        self._rebuild_indexes()
+
+    def _read_only(self, *args, **kwargs):
+        """Reject any mutation"""
+        raise TypeError("Historical views are read-only")
+
+    add_student = update_student = delete_student = _read_only
+    save_data = persist_indexes = transaction = _read_only
+    archive_students = restore_students = _read_only
+
+
+class _EmptyArchive:
+    """Stand-in cold store for views: nothing archived, nothing on disk"""
+
+    def __len__(self):
+        return 0
+
+    def __contains__(self, student_id):
+        return False
+
+    def get(self, student_id):
+        return None
+
+    def search(self, query):
+        return []
+
+    def summary(self):
+        return {'count': 0, 'age_total': 0, 'performance_distribution': {},
+                'grade_distribution': {}}
+
+
+class History:
+    """
+    Versioned roster history for a manager with a change feed
+
+    A full base snapshot is written every ``base_every`` changes; the
+    change feed supplies the per-mutation deltas between them. ``as_of``
+    loads the nearest earlier base and replays at most ``base_every``
+    deltas. Recently requested points are kept materialized in an LRU cache.
+    """
+
+    def __init__(self, manager, base_every=10_000, cache_size=8):
+        """
+        Start recording history for a manager
+
+        Args:
+            manager (StudentManager): Manager created with change_feed=True
+            base_every (int): Changes between base snapshots
+            cache_size (int): Materialized views kept in memory
+
+        Raises:
+            ValueError: If the manager has no change feed
+        """
+        if manager.change_feed is None:
+            raise ValueError("History needs a manager created with change_feed=True")
+        self.manager = manager
+        self.feed = manager.change_feed
+        self.directory = history_dir(manager.data_file)
+        self.base_every = base_every
+        self.cache_size = cache_size
+        self._bases = []             # sorted (seq, ts, path)
+        self._last_base_seq = 0      # includes bases still being written
+        self._views = OrderedDict()  # seq -> HistoricalView, LRU order
+        self._lock = threading.Lock()
+        self._unsubscribe = None
+
+        os.makedirs(self.directory, exist_ok=True)
+        for name in os.listdir(self.directory):
+            match = _BASE_NAME.match(name)
+            if match:
+                self._bases.append((int(match.group(1)), int(match.group(2)) / 1000,
+                                    os.path.join(self.directory, name)))
+        self._bases.sort()
+        if self._bases:
+            self._last_base_seq = self._bases[-1][0]
+
+        manager.wait_until_loaded()
+        if not self._bases or self._bases[-1][0] < self.feed.last_seq - base_every:
+            self._write_base(self.feed.last_seq, self._last_event_time(), background=False)
+        self._unsubscribe = self.feed.subscribe(self._on_change)
+
+    def close(self):
+        """Stop recording: unsubscribe from the change feed and drop cached views"""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        with self._lock:
+            self._views.clear()
+
+    def _last_event_time(self):
+        """Timestamp of the newest change, or now if there is none"""
+        last = self.feed.read(self.feed.last_seq - 1)
+        return last[0]['ts'] if last else time.time()
+
+    def _on_change(self, event):
+        """Feed subscriber: write a new base once enough changes accumulate"""
+        # Only at the end of a published batch does the roster match event['seq']
+        if event['seq'] != self.feed.last_seq:
+            return
+        if event['seq'] - self._last_base_seq >= self.base_every:
+            self._write_base(event['seq'], event['ts'])
+
+    def _write_base(self, seq, ts, background=True):
+        """
+        Snapshot the current roster as the state after change ``seq``
+
+        Records are copied immediately; compressing and writing them can
+        happen on a worker thread.
+        """
+        self._last_base_seq = seq
+        records = [s.to_dict() for s in self.manager.get_all_students()]
+        path = os.path.join(self.directory, f"base-{seq:012d}-{int(ts * 1000)}.json.gz")
+
+        def write():
+            try:
+                write_records(path, records, 'gzip')
+            except Exception as e:
+                print(f"Error writing history base: {e}")
+                return
+            with self._lock:
+                self._bases.append((seq, ts, path))
+                self._bases.sort()
+
+        if background:
+            threading.Thread(target=write, name='history-base', daemon=True).start()
+        else:
+            write()
+
+    def as_of(self, timestamp):
+        """
+        The roster as it was at a point in time
+
+        Args:
+            timestamp (float or datetime): Epoch seconds or a datetime
+
+        Returns:
+            HistoricalView: Read-only manager for that moment
+
+        Raises:
+            ValueError: If the time is before the first recorded base
+        """
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        with self._lock:
+            bases = list(self._bases)
+        pos = bisect_right([ts for _, ts, _ in bases], timestamp) - 1
+        if pos < 0:
+            raise ValueError("No history recorded before that time")
+        base_seq, _, base_path = bases[pos]
+        limit = bases[pos + 1][0] - base_seq if pos + 1 < len(bases) else None
+
+        deltas = []
+        for event in self.feed.read(base_seq, limit):
+            if event['ts'] > timestamp:
+                break
+            deltas.append(event)
+        seq = deltas[-1]['seq'] if deltas else base_seq
+
+        # Every timestamp between two changes maps to the same view
+        with self._lock:
+            view = self._views.get(seq)
+            if view is not None:
+                self._views.move_to_end(seq)
+                return view
+
+        view = HistoricalView(self._replay(base_path, deltas), seq, timestamp)
+        with self._lock:
+            self._views[seq] = view
+            while len(self._views) > self.cache_size:
+                self._views.popitem(last=False)
+        return view
+
+    @staticmethod
+    def _replay(base_path, deltas):
+        """Apply change events to a base snapshot"""
+        records = {r['student_id']: r for r in read_records(base_path)}
+        for event in deltas:
+            if event['op'] == 'insert':
+                records[event['student_id']] = dict(event['fields'])
+            elif event['op'] == 'update':
+                records[event['student_id']].update(event['fields'])
+            else:
+                records.pop(event['student_id'], None)
+        return [Student.from_dict(r) for r in records.values()]
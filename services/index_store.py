@@ -0,0 +1,99 @@
+"""
+Index Store
+Persists manager indexes next to the data file for warm starts
+"""
+
+import gc
+import os
+
+from services import storage
+from services.search_index import PrefixIndex
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = '.idx'
+
+
+def index_path(data_file):
+    """Index file stored alongside a data file"""
+    return data_file + INDEX_SUFFIX
+
+
+def data_fingerprint(data_file):
+    """
+    Generation stamp tying an index to one version of the data file
+
+    Args:
+        data_file (str): Data file
+
+    Returns:
+        list or None: [size, mtime_ns], or None if the file is missing
+    """
+    try:
+        stat = os.stat(data_file)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def save_indexes(data_file, fingerprint, count, picker_index):
+    """
+    Write the indexes built from a given data-file version
+
+    Args:
+        data_file (str): Data file the indexes describe
+        fingerprint (list): data_fingerprint() taken before the indexes were built
+        count (int): Number of students indexed
+        picker_index (PrefixIndex): Typeahead index
+
+    Returns:
+        bool: True if written
+    """
+    path = index_path(data_file)
+    tmp_path = path + '.tmp'
+    payload = {
+        'version': INDEX_VERSION,
+        'fingerprint': fingerprint,
+        'count': count,
+        'picker': picker_index.to_dict()
+    }
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(storage.dumps(payload))
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        print(f"Error saving indexes: {e}")
+        return False
+
+
+def load_indexes(data_file, count):
+    """
+    Load persisted indexes if they match the current data file
+
+    Args:
+        data_file (str): Data file the indexes should describe
+        count (int): Number of students currently loaded
+
+    Returns:
+        PrefixIndex or None: Typeahead index, or None when missing or stale
+    """
+    path = index_path(data_file)
+    if not os.path.exists(path):
+        return None
+    # Millions of small objects: skip GC passes while they are created
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(path, 'rb') as f:
+            payload = storage.loads(f.read())
+        if (payload.get('version') != INDEX_VERSION or
+                payload.get('fingerprint') != data_fingerprint(data_file) or
+                payload.get('count') != count):
+            return None
+        return PrefixIndex.from_dict(payload['picker'])
+    except Exception as e:
+        print(f"Ignoring unreadable index {path}: {e}")
+        return None
+    finally:
+        if gc_was_enabled:
+            gc.enable()
@@ -0,0 +1,167 @@
+"""
+Instrumentation
+Lightweight timing spans for per-rerun performance breakdowns
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+
+class Profiler:
+    """
+    Collects timing spans for the current rerun and rolling latency windows
+
+    Each Streamlit session runs its script on its own thread, so the
+    in-progress rerun is kept thread-local while the rolling windows are
+    shared across sessions.
+    """
+
+    def __init__(self, window=200):
+        """
+        Initialize the profiler
+
+        Args:
+            window (int): Number of samples kept per span for percentiles
+        """
+        self.window = window
+        self.enabled = True
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._history = {}
+
+    def start_rerun(self):
+        """Begin a new rerun, discarding spans from the previous one"""
+        self._local.spans = []
+        self._local.started = time.perf_counter()
+
+    def elapsed(self):
+        """
+        Time spent in the current rerun so far
+
+        Returns:
+            float: Milliseconds since start_rerun (0 if none is open)
+        """
+        started = getattr(self._local, 'started', None)
+        if started is None:
+            return 0.0
+        return (time.perf_counter() - started) * 1000
+
+    def finish_rerun(self):
+        """
+        Close the current rerun and record its total duration
+
+        Called once at the end of every script run; later calls until the
+        next start_rerun record nothing.
+
+        Returns:
+            float: Rerun duration in milliseconds (0 if none was open)
+        """
+        if getattr(self._local, 'started', None) is None:
+            return 0.0
+        elapsed = self.elapsed()
+        self._local.started = None
+        self._record('rerun.total', elapsed)
+        return elapsed
+
+    def _record(self, name, elapsed_ms):
+        """Store a sample in the rolling window for a span name"""
+        with self._lock:
+            samples = self._history.get(name)
+            if samples is None:
+                samples = self._history[name] = deque(maxlen=self.window)
+            samples.append(elapsed_ms)
+
+    @contextmanager
+    def span(self, name):
+        """
+        Time a block of code
+
+        Args:
+            name (str): Span name, e.g. ``manager.load_data``
+        """
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            spans = getattr(self._local, 'spans', None)
+            if spans is not None:
+                spans.append((name, elapsed))
+            self._record(name, elapsed)
+
+    def timed(self, name):
+        """
+        Decorator that wraps a function call in a span
+
+        Args:
+            name (str): Span name
+
+        Returns:
+            callable: Decorator
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def current_breakdown(self):
+        """
+        Get the per-span totals for the current rerun
+
+        Returns:
+            list: (name, calls, total_ms) tuples, slowest first
+        """
+        totals = {}
+        for name, elapsed in getattr(self._local, 'spans', None) or []:
+            calls, total = totals.get(name, (0, 0.0))
+            totals[name] = (calls + 1, total + elapsed)
+        rows = [(name, calls, total) for name, (calls, total) in totals.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def percentiles(self):
+        """
+        Get rolling p50/p95 per span
+
+        Returns:
+            dict: name -> {'count', 'p50', 'p95'} in milliseconds
+        """
+        with self._lock:
+            snapshot = {name: sorted(samples) for name, samples in self._history.items()}
+        return {
+            name: {
+                'count': len(samples),
+                'p50': percentile(samples, 50),
+                'p95': percentile(samples, 95)
+            }
+            for name, samples in snapshot.items() if samples
+        }
+
+    def reset(self):
+        """Clear all rolling windows"""
+        with self._lock:
+            self._history.clear()
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_samples)) - 1
+    return sorted_samples[max(0, min(rank, len(sorted_samples) - 1))]
+
+
+# Shared process-wide profiler
+profiler = Profiler()
+timed = profiler.timed
@@ -0,0 +1,324 @@
+"""
+Metrics
+Opt-in counters, gauges and histograms exported in Prometheus text format
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_labels(names, values, extra=None):
+    """Render a Prometheus label set such as {op="add_student"}"""
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"'))
+        for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+class Counter:
+    """Monotonically increasing counter, optionally labelled"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        """Increment the series for the given label values"""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        """Return (series, value) pairs for rendering"""
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name + _format_labels(self.labels, key), value)
+                for key, value in sorted(items)]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    kind = 'gauge'
+
+    def set(self, value, *label_values):
+        """Set the series for the given label values"""
+        with self._lock:
+            self._values[label_values] = value
+
+    def remove(self, *label_values):
+        """Drop the series for the given label values"""
+        with self._lock:
+            self._values.pop(label_values, None)
+
+
+class Histogram:
+    """Histogram with fixed upper bounds (seconds)"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        """Record an observation"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        """Return cumulative bucket, sum and count series for rendering"""
+        with self._lock:
+            items = [(key, (list(counts), total, count))
+                     for key, (counts, total, count) in self._series.items()]
+        lines = []
+        for key, (counts, total, count) in sorted(items):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append((self.name + '_bucket' + _format_labels(self.labels, key, ('le', le)),
+                              cumulative))
+            lines.append((self.name + '_sum' + _format_labels(self.labels, key), total))
+            lines.append((self.name + '_count' + _format_labels(self.labels, key), count))
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds metric families and renders them in Prometheus text format
+
+    When disabled, instrumented code only pays for a single attribute check.
+    """
+
+    def __init__(self, enabled=False):
+        """
+        Initialize the registry
+
+        Args:
+            enabled (bool): Whether instrumented code records samples
+        """
+        self.enabled = enabled
+        self._metrics = []
+
+    def register(self, metric):
+        """Add a metric family and return it"""
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        """Create and register a Counter"""
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        """Create and register a Gauge"""
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        """Create and register a Histogram"""
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self):
+        """
+        Render every metric family
+
+        Returns:
+            str: Prometheus text exposition format
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for series, value in metric.samples():
+                lines.append(f"{series} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry(enabled=os.environ.get('SMS_METRICS') == '1')
+
+OPERATIONS = registry.counter(
+    'sms_operations_total', 'StudentManager operations by outcome', ('op', 'outcome'))
+OPERATION_SECONDS = registry.histogram(
+    'sms_operation_duration_seconds', 'StudentManager operation latency', ('op',))
+STUDENT_RECORDS = registry.gauge(
+    'sms_students', 'Students held in memory', ('data_file',))
+DATA_FILE_BYTES = registry.gauge(
+    'sms_data_file_bytes', 'Size of the student data file', ('data_file',))
+
+
+def _outcome(result):
+    """Map a StudentManager return value to a success/failure label"""
+    if isinstance(result, tuple) and result and isinstance(result[0], bool):
+        result = result[0]
+    if result is False:
+        return 'failure'
+    return 'success'
+
+
+def instrument(op):
+    """
+    Decorator recording call count, outcome and latency for an operation
+
+    Args:
+        op (str): Operation label, e.g. ``add_student``
+
+    Returns:
+        callable: Decorator
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                OPERATIONS.inc(op, 'error')
+                raise
+            OPERATION_SECONDS.observe(time.perf_counter() - started, op)
+            OPERATIONS.inc(op, _outcome(result))
+            return result
+        return wrapper
+    return decorator
+
+
+def record_dataset(record_count, data_file):
+    """
+    Update the record-count and file-size gauges
+
+    Both are labelled by data file, so managers for several files (one per
+    tenant) report separate series instead of overwriting one.
+
+    Args:
+        record_count (int): Number of students in memory
+        data_file (str): Path to the data file
+    """
+    if not registry.enabled:
+        return
+    STUDENT_RECORDS.set(record_count, data_file)
+    try:
+        DATA_FILE_BYTES.set(os.path.getsize(data_file), data_file)
+    except OSError:
+        pass
+
+
+def forget_dataset(data_file):
+    """
+    Drop a data file's gauges once its manager is released
+
+    Args:
+        data_file (str): Path to the data file
+    """
+    STUDENT_RECORDS.remove(data_file)
+    DATA_FILE_BYTES.remove(data_file)
+
+
+def write_textfile(path):
+    """
+    Atomically write the registry to a textfile-collector file
+
+    Args:
+        path (str): Target ``.prom`` file
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+def _serve_http(port):
+    """
+    Serve the registry on /metrics from a background thread
+
+    http.server is imported here so command-line tools that never export
+    metrics do not pay for it at startup.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """Serves the registry on /metrics"""
+
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', int(port)), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+
+
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+def start_exporters(textfile=None, port=None, interval=15.0):
+    """
+    Start the background exporters once per process
+
+    Falls back to the SMS_METRICS_TEXTFILE and SMS_METRICS_PORT environment
+    variables. Does nothing unless the registry is enabled.
+
+    Args:
+        textfile (str, optional): Path of the textfile-collector file
+        port (int, optional): Port for a local /metrics HTTP endpoint
+        interval (float): Seconds between textfile writes
+    """
+    global _exporters_started
+    if not registry.enabled:
+        return
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+
+    textfile = textfile or os.environ.get('SMS_METRICS_TEXTFILE')
+    port = port or os.environ.get('SMS_METRICS_PORT')
+
+    if textfile:
+        def write_loop():
+            while True:
+                try:
+                    write_textfile(textfile)
+                except OSError as e:
+                    print(f"Error writing metrics: {e}")
+                time.sleep(interval)
+        threading.Thread(target=write_loop, name='metrics-textfile', daemon=True).start()
+
+    if port:
+        _serve_http(port)
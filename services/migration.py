@@ -0,0 +1,169 @@
+"""
+Schema Migration
+Streams a data file through the registered record upgrades
+
+Reads one record at a time and writes the upgraded records to a temporary
+file beside the original, then swaps it in with an atomic rename. Memory
+stays constant whatever the file size. The application keeps serving from
+memory meanwhile; if it saves during the run, the migration starts over
+from the new file rather than overwriting that save. The final check and
+rename happen under the data file's lock, which StudentManager.save_data
+also holds, so no save can slip in between them. A manager that loaded
+the file before the swap reloads it before its next change.
+
+    python -m services.migration data/students.json
+    python -m services.migration data/students.json --check
+    python -m services.migration data/students.json --output data/students.v2.json.gz --encoding gzip
+"""
+
+import argparse
+import gzip
+import lzma
+import os
+import sys
+
+from models.schema import SCHEMA_VERSION, is_current, upgrade_record
+from services.atomic_file import file_lock
+from services.index_store import data_fingerprint
+from services.storage import ENCODINGS, detect_format, dumps
+from services.streaming import iter_records
+
+MAX_ATTEMPTS = 3
+
+
+class MigrationConflict(Exception):
+    """Raised when the data file keeps changing while it is migrated"""
+    pass
+
+
+def guess_encoding(path):
+    """
+    Encoding a data file was written with, so migration keeps it
+
+    Returns:
+        str: One of ENCODINGS
+    """
+    file_format = detect_format(path)
+    if file_format in ('gzip', 'lzma'):
+        return file_format
+    if file_format == 'snapshot':
+        raise ValueError(f"{path} is a columnar snapshot; it has no record schema to migrate")
+    with open(path, 'rb') as f:
+        head = f.read(2)
+    return 'pretty' if head == b'[\n' else 'compact'
+
+
+def _open_output(path, encoding):
+    """Binary stream for the chosen encoding"""
+    if encoding == 'gzip':
+        return gzip.open(path, 'wb', compresslevel=6)
+    if encoding == 'lzma':
+        return lzma.open(path, 'wb', preset=1)
+    return open(path, 'wb')
+
+
+def count_outdated(path):
+    """
+    Records not yet in the current schema version
+
+    Returns:
+        tuple: (records, outdated)
+    """
+    records = outdated = 0
+    for record in iter_records(path):
+        records += 1
+        if not is_current(record):
+            outdated += 1
+    return records, outdated
+
+
+def _write_upgraded(source, target, encoding):
+    """Stream every record of ``source`` into ``target`` in the current layout"""
+    pretty = encoding == 'pretty'
+    records = upgraded = 0
+    with _open_output(target, encoding) as out:
+        out.write(b'[')
+        for record in iter_records(source):
+            if not is_current(record):
+                record = upgrade_record(record)
+                upgraded += 1
+            payload = dumps(record, pretty=pretty)
+            if pretty:
+                # Same layout as write_records: one indented object per element
+                payload = b'\n  ' + payload.replace(b'\n', b'\n  ')
+            out.write((b',' if records else b'') + payload)
+            records += 1
+        out.write(b'\n]' if pretty and records else b']')
+    return records, upgraded
+
+
+def migrate_file(path, output=None, encoding=None):
+    """
+    Upgrade every record of a data file to SCHEMA_VERSION in constant memory
+
+    Args:
+        path (str): JSON, gzip or lzma data file
+        output (str, optional): Write here instead of replacing ``path``
+        encoding (str, optional): Output encoding (defaults to the input's)
+
+    Returns:
+        dict: 'records', 'upgraded' and 'path' written
+
+    Raises:
+        MigrationConflict: If the file changed during every attempt
+    """
+    encoding = encoding or guess_encoding(path)
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Encoding must be one of: {', '.join(ENCODINGS)}")
+    target = output or path
+    tmp_path = target + '.migrating'
+    for _ in range(MAX_ATTEMPTS):
+        before = data_fingerprint(path)
+        try:
+            records, upgraded = _write_upgraded(path, tmp_path, encoding)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if output is not None:
+            os.replace(tmp_path, target)
+            return {'records': records, 'upgraded': upgraded, 'path': target}
+        with file_lock(path):
+            if data_fingerprint(path) == before:
+                os.replace(tmp_path, target)
+                return {'records': records, 'upgraded': upgraded, 'path': target}
+        # Saved by the running application meanwhile: start again from its version
+        os.remove(tmp_path)
+    raise MigrationConflict(f"{path} changed during {MAX_ATTEMPTS} migration attempts; "
+                            "try again when it is quieter")
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(
+        prog='python -m services.migration',
+        description=f"Upgrade a data file to record schema version {SCHEMA_VERSION}")
+    parser.add_argument('data_file')
+    parser.add_argument('--output', help="Write the migrated file here instead of in place")
+    parser.add_argument('--encoding', choices=ENCODINGS,
+                        help="Output encoding (default: same as the input)")
+    parser.add_argument('--check', action='store_true',
+                        help="Only count outdated records; exit 1 if there are any")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.check:
+            records, outdated = count_outdated(args.data_file)
+            print(f"{outdated:,} of {records:,} records need upgrading to version {SCHEMA_VERSION}")
+            return 1 if outdated else 0
+        result = migrate_file(args.data_file, args.output, args.encoding)
+    except (ValueError, OSError, MigrationConflict) as e:
+        print(f"Error migrating {args.data_file}: {e}")
+        return 2
+    print(f"Upgraded {result['upgraded']:,} of {result['records']:,} records "
+          f"to version {SCHEMA_VERSION} in {result['path']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
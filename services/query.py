@@ -0,0 +1,555 @@
+"""
+Query Language
+Compiles filter expressions such as
+``grade in (10, 11) and performance >= Good and age between 15 and 17``
+into index lookups plus a residual predicate
+"""
+
+import re
+from functools import lru_cache
+
+from services.sorted_index import (GRADE_ORDER, GRADE_RANK, PERFORMANCE_ORDER,
+                                   PERFORMANCE_RANK, SORT_KEYS)
+from services.validation import Validator
+
+# An index path is skipped when it would fetch more than this share of the
+# roster; a straight scan is cheaper than materializing that many IDs
+SCAN_RATIO = 0.2
+
+# Two index paths of an 'and' are intersected when the larger one fetches at
+# most this many times the rows of the smaller
+INTERSECT_RATIO = 4
+
+QUERY_CACHE_SIZE = 256
+
+KEYWORDS = {'and', 'or', 'not', 'in', 'between', 'contains', 'startswith', 'endswith'}
+TEXT_OPERATORS = {'contains', 'startswith', 'endswith'}
+
+_TOKEN = re.compile(r'''
+    (?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<number>\d+(?![\w-]))
+      | (?P<op><=|>=|!=|==|=|<|>)
+      | (?P<punct>[(),])
+      | (?P<word>[^\s()<>=!,"']+)
+    )''', re.VERBOSE)
+
+_CANONICAL_GRADES = {grade.lower(): grade for grade in GRADE_ORDER}
+_CANONICAL_LEVELS = {level.lower(): level for level in PERFORMANCE_ORDER}
+
+_FLIPPED = {'<': '>', '<=': '>=', '>': '<', '>=': '<='}
+
+
+class QueryError(ValueError):
+    """Raised when a query cannot be parsed or names an unknown field or value"""
+    pass
+
+
+# Fields: how a student's value is read, how an operand is converted to the
+# same form, which operators apply, and which index (if any) can answer them
+
+def _grade_key(value):
+    """Grade operand -> its position in GRADE_ORDER"""
+    grade = _CANONICAL_GRADES.get(str(value).lower())
+    if grade is None:
+        raise QueryError(f"Unknown grade {value!r}")
+    return GRADE_RANK[grade]
+
+
+def _performance_key(value):
+    """Performance operand -> its rank, best first"""
+    level = _CANONICAL_LEVELS.get(str(value).lower())
+    if level is None:
+        raise QueryError(f"Unknown performance level {value!r}")
+    return PERFORMANCE_RANK[level]
+
+
+def _age_key(value):
+    """Age operand -> int"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise QueryError(f"Age must be a whole number, got {value!r}")
+
+
+FIELDS = {
+    'student_id': {'read': lambda s: s.student_id, 'convert': str, 'ordered': True,
+                   'sorted': 'student_id', 'lookup': 'id'},
+    'name': {'read': SORT_KEYS['name'], 'convert': lambda v: str(v).lower(), 'ordered': True,
+             'sorted': 'name'},
+    'age': {'read': SORT_KEYS['age'], 'convert': _age_key, 'ordered': True, 'sorted': 'age'},
+    'grade': {'read': SORT_KEYS['grade'], 'convert': _grade_key, 'ordered': True,
+              'sorted': 'grade'},
+    # Ranks are best first, so "performance >= Good" is "rank <= rank(Good)"
+    'performance': {'read': SORT_KEYS['performance'], 'convert': _performance_key,
+                    'ordered': True, 'sorted': 'performance', 'reversed': True},
+    'email': {'read': lambda s: Validator.normalize_email(s.email),
+              'convert': lambda v: Validator.normalize_email(str(v)), 'lookup': 'email'},
+    'phone': {'read': lambda s: Validator.normalize_phone(s.phone),
+              'convert': lambda v: Validator.normalize_phone(str(v)), 'lookup': 'phone'},
+}
+
+# Text operators always match case-insensitively on the displayed value
+_TEXT = {
+    'student_id': lambda s: s.student_id.lower(),
+    'name': lambda s: s.name.lower(),
+    'email': lambda s: s.email.lower(),
+    'phone': lambda s: Validator.normalize_phone(s.phone),
+}
+
+
+def _quote(value):
+    """Operand as it appears in explain output"""
+    return value if value.isdigit() else repr(value)
+
+
+# Access paths: where candidate students come from before filtering
+
+class _Access:
+    """Candidate student IDs from one index, with an exact or upper-bound count"""
+
+    def __init__(self, label, estimate, fetch, children=()):
+        self.label = label
+        self.estimate = estimate
+        self.fetch = fetch
+        self.children = children
+
+    def lines(self, depth=1):
+        """Explain output for this path and any unioned sub-paths"""
+        lines = [f"{'  ' * depth}{self.label} (~{self.estimate:,} rows)"]
+        for child in self.children:
+            lines.extend(child.lines(depth + 1))
+        return lines
+
+
+# Expression tree
+
+class _Compare:
+    """``field op operand`` (operand is a tuple for in/between)"""
+
+    def __init__(self, field, op, operand, shown):
+        self.field = field
+        self.op = op
+        self.operand = operand
+        self.shown = shown
+
+    def describe(self):
+        return self.shown
+
+    def predicate(self):
+        field, op, operand = self.field, self.op, self.operand
+        if op in TEXT_OPERATORS:
+            text = _TEXT[field]
+            if op == 'contains':
+                return lambda s: operand in text(s)
+            if op == 'startswith':
+                return lambda s: text(s).startswith(operand)
+            return lambda s: text(s).endswith(operand)
+
+        read = FIELDS[field]['read']
+        if op == 'in':
+            values = frozenset(operand)
+            return lambda s: read(s) in values
+        if op == 'between':
+            low, high = operand
+            return lambda s: low <= read(s) <= high
+        if op == '=':
+            return lambda s: read(s) == operand
+        if op == '!=':
+            return lambda s: read(s) != operand
+        if op == '<':
+            return lambda s: read(s) < operand
+        if op == '<=':
+            return lambda s: read(s) <= operand
+        if op == '>':
+            return lambda s: read(s) > operand
+        return lambda s: read(s) >= operand
+
+    def _ranges(self):
+        """Key ranges answering this comparison on a sorted index, if any"""
+        op, operand = self.op, self.operand
+        if op == '=':
+            return [(operand, operand, True, True)]
+        if op == 'in':
+            return [(value, value, True, True) for value in sorted(set(operand))]
+        if op == 'between':
+            return [(operand[0], operand[1], True, True)]
+        if op in ('<', '<='):
+            return [(None, operand, True, op == '<=')]
+        if op in ('>', '>='):
+            return [(operand, None, op == '>=', True)]
+        if op == 'startswith' and self.field == 'name':
+            return [(operand, operand + '\U0010ffff', True, True)]
+        return None
+
+    def access(self, manager):
+        spec = FIELDS[self.field]
+        lookup = spec.get('lookup')
+        if lookup and self.op in ('=', 'in'):
+            values = [self.operand] if self.op == '=' else list(dict.fromkeys(self.operand))
+            if lookup == 'id':
+                fetch = lambda: [v for v in values if manager.get_student_by_id(v) is not None]
+                return _Access(f"ID lookup: {self.shown}", len(values), fetch)
+            index = manager._email_index if lookup == 'email' else manager._phone_index
+            fetch = lambda: [holder for value in values for holder in index.holders(value)]
+            return _Access(f"Unique {lookup} index: {self.shown}", len(values), fetch)
+
+        ranges = self._ranges() if spec.get('sorted') else None
+        if ranges is None:
+            return None
+        if self.op == 'between' and ranges[0][0] > ranges[0][1]:
+            return _Access(f"Empty range: {self.shown}", 0, lambda: [])
+        index = manager._sorted_index(spec['sorted'])
+        estimate = sum(index.count_range(*bounds) for bounds in ranges)
+
+        def fetch():
+            ids = []
+            for bounds in ranges:
+                ids.extend(index.range(*bounds))
+            return ids
+        return _Access(f"Sorted {spec['sorted']} index range: {self.shown}", estimate, fetch)
+
+
+class _And:
+    """All children match"""
+
+    def __init__(self, children):
+        self.children = children
+
+    def describe(self):
+        return ' and '.join(_wrap(child, _Or) for child in self.children)
+
+    def predicate(self):
+        checks = [child.predicate() for child in self.children]
+        if len(checks) == 2:
+            first, second = checks
+            return lambda s: first(s) and second(s)
+        return lambda s: all(check(s) for check in checks)
+
+    def access(self, manager):
+        # Any one child's matches are a superset of the conjunction's. When
+        # the runner-up is of similar size, intersecting the two cuts the
+        # rows the residual filter has to check.
+        paths = sorted((path for path in (child.access(manager) for child in self.children)
+                        if path is not None), key=lambda path: path.estimate)
+        if len(paths) < 2 or paths[1].estimate > paths[0].estimate * INTERSECT_RATIO:
+            return paths[0] if paths else None
+        first, second = paths[0], paths[1]
+
+        def fetch():
+            allowed = set(second.fetch())
+            return [student_id for student_id in first.fetch() if student_id in allowed]
+        return _Access("Intersection of 2 index paths", first.estimate, fetch, (first, second))
+
+
+class _Or:
+    """Any child matches"""
+
+    def __init__(self, children):
+        self.children = children
+
+    def describe(self):
+        return ' or '.join(child.describe() for child in self.children)
+
+    def predicate(self):
+        checks = [child.predicate() for child in self.children]
+        return lambda s: any(check(s) for check in checks)
+
+    def access(self, manager):
+        # Only indexable if every branch is
+        paths = []
+        for child in self.children:
+            path = child.access(manager)
+            if path is None:
+                return None
+            paths.append(path)
+
+        def fetch():
+            ids = {}
+            for path in paths:
+                ids.update(dict.fromkeys(path.fetch()))
+            return list(ids)
+        return _Access(f"Union of {len(paths)} index paths", sum(p.estimate for p in paths),
+                       fetch, paths)
+
+
+class _Not:
+    """Child does not match"""
+
+    def __init__(self, child):
+        self.child = child
+
+    def describe(self):
+        return f"not {_wrap(self.child, (_And, _Or))}"
+
+    def predicate(self):
+        check = self.child.predicate()
+        return lambda s: not check(s)
+
+    def access(self, manager):
+        return None
+
+
+def _wrap(node, kinds):
+    """Parenthesize a child whose operator binds more loosely than its parent"""
+    text = node.describe()
+    return f"({text})" if isinstance(node, kinds) else text
+
+
+# Parser
+
+def _tokenize(text):
+    """Split a query into (kind, value, position) tokens"""
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        while text[position].isspace():
+            position += 1
+        match = _TOKEN.match(text, position)
+        if match is None:
+            if text[position] in '"\'':
+                raise QueryError(f"Unterminated string starting at position {position + 1}")
+            raise QueryError(f"Unexpected character at position {position + 1}: {text[position]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        start = match.start(kind)
+        if kind == 'string':
+            value = re.sub(r'\\(.)', r'\1', value[1:-1])
+        elif kind == 'word' and value.lower() in KEYWORDS:
+            kind, value = 'keyword', value.lower()
+        tokens.append((kind, value, start))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive-descent parser for:
+
+        expr       := and_expr ("or" and_expr)*
+        and_expr   := not_expr ("and" not_expr)*
+        not_expr   := "not" not_expr | "(" expr ")" | comparison
+        comparison := FIELD (OP value | ["not"] "in" "(" value ("," value)* ")"
+                      | "between" value "and" value | TEXT_OP value)
+        value      := NUMBER | STRING | WORD+
+    """
+
+    def __init__(self, text):
+        self.tokens = _tokenize(text)
+        self.position = 0
+
+    def parse(self):
+        if not self.tokens:
+            raise QueryError("Query is empty")
+        node = self._or()
+        if self.position < len(self.tokens):
+            _, value, offset = self.tokens[self.position]
+            raise QueryError(f"Unexpected {value!r} at position {offset + 1}")
+        return node
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None, None)
+
+    def _accept(self, kind, value=None):
+        token_kind, token_value, _ = self._peek()
+        if token_kind == kind and (value is None or token_value == value):
+            self.position += 1
+            return True
+        return False
+
+    def _expect(self, kind, value=None, what=None):
+        if not self._accept(kind, value):
+            _, found, offset = self._peek()
+            where = f"{found!r} at position {offset + 1}" if found is not None else "end of query"
+            raise QueryError(f"Expected {what or value or kind}, found {where}")
+
+    def _or(self):
+        children = [self._and()]
+        while self._accept('keyword', 'or'):
+            children.append(self._and())
+        return children[0] if len(children) == 1 else _Or(children)
+
+    def _and(self):
+        children = [self._not()]
+        while self._accept('keyword', 'and'):
+            children.append(self._not())
+        return children[0] if len(children) == 1 else _And(children)
+
+    def _not(self):
+        if self._accept('keyword', 'not'):
+            return _Not(self._not())
+        if self._accept('punct', '('):
+            node = self._or()
+            self._expect('punct', ')', "')'")
+            return node
+        return self._comparison()
+
+    def _value(self):
+        """
+        A number, a quoted string, or consecutive bare words (e.g. Below Average)
+
+        Numbers stay as their text: the field converts them, so an ID or
+        phone keeps its leading zeros and only age becomes an int.
+        """
+        kind, value, _ = self._peek()
+        if kind in ('number', 'string'):
+            self.position += 1
+            return value
+        words = []
+        while self._peek()[0] == 'word':
+            words.append(self._peek()[1])
+            self.position += 1
+        if not words:
+            self._expect('value', what="a value")
+        return ' '.join(words)
+
+    def _comparison(self):
+        kind, field, offset = self._peek()
+        if kind != 'word' or field.lower() not in FIELDS:
+            found = f"{field!r} at position {offset + 1}" if field is not None else "end of query"
+            raise QueryError(f"Expected a field ({', '.join(FIELDS)}), found {found}")
+        self.position += 1
+        field = field.lower()
+        spec = FIELDS[field]
+        convert = spec['convert']
+
+        negate = self._accept('keyword', 'not')
+        if negate or self._accept('keyword', 'in'):
+            if negate:
+                self._expect('keyword', 'in', "'in'")
+            self._expect('punct', '(', "'('")
+            raw = [self._value()]
+            while self._accept('punct', ','):
+                raw.append(self._value())
+            self._expect('punct', ')', "')'")
+            node = _Compare(field, 'in', tuple(convert(v) for v in raw),
+                            f"{field} in ({', '.join(_quote(v) for v in raw)})")
+            return _Not(node) if negate else node
+
+        if self._accept('keyword', 'between'):
+            self._require_ordered(field)
+            low_raw = self._value()
+            self._expect('keyword', 'and', "'and'")
+            high_raw = self._value()
+            low, high = convert(low_raw), convert(high_raw)
+            if spec.get('reversed'):
+                low, high = high, low
+            return _Compare(field, 'between', (low, high),
+                            f"{field} between {_quote(low_raw)} and {_quote(high_raw)}")
+
+        kind, op, _ = self._peek()
+        if kind == 'keyword' and op in TEXT_OPERATORS:
+            if field not in _TEXT:
+                raise QueryError(f"'{op}' does not apply to {field}")
+            self.position += 1
+            raw = self._value()
+            operand = str(raw).lower()
+            if field == 'phone':
+                operand = Validator.normalize_phone(operand)
+            return _Compare(field, op, operand, f"{field} {op} {_quote(raw)}")
+
+        self._expect('op', what="an operator")
+        op = '=' if op == '==' else op
+        if op not in ('=', '!='):
+            self._require_ordered(field)
+        raw = self._value()
+        shown = f"{field} {op} {_quote(raw)}"
+        if spec.get('reversed'):
+            op = _FLIPPED.get(op, op)
+        return _Compare(field, op, convert(raw), shown)
+
+    @staticmethod
+    def _require_ordered(field):
+        if not FIELDS[field].get('ordered'):
+            raise QueryError(f"{field} can only be compared with =, !=, in or text operators")
+
+
+class Query:
+    """
+    A parsed, compiled query
+
+    The expression tree and its predicate closure are built once per query
+    text (see compile_query). The access path is chosen per execution,
+    because index counts change as the roster does.
+    """
+
+    def __init__(self, text):
+        """
+        Args:
+            text (str): Query expression
+
+        Raises:
+            QueryError: If the expression is invalid
+        """
+        self.text = text
+        self.tree = _Parser(text).parse()
+        self.predicate = self.tree.predicate()
+
+    def plan(self, manager):
+        """
+        Pick the cheapest index access path for a manager's current roster
+
+        Returns:
+            _Access or None: Access path, or None for a full scan
+        """
+        manager.wait_until_loaded()
+        manager._ensure_contact_indexes()
+        path = self.tree.access(manager)
+        if path is not None and path.estimate > len(manager.students) * SCAN_RATIO:
+            return None
+        return path
+
+    def execute(self, manager):
+        """
+        Run the query against a manager
+
+        Returns:
+            list: Matching Student objects (index order when an index is
+            used, roster order for a scan)
+        """
+        path = self.plan(manager)
+        predicate = self.predicate
+        if path is None:
+            return [s for s in manager.students if predicate(s)]
+        students = (manager.get_student_by_id(student_id) for student_id in path.fetch())
+        return [s for s in students if s is not None and predicate(s)]
+
+    def explain(self, manager):
+        """
+        Describe the plan chosen for a manager's current roster
+
+        Returns:
+            str: One step per line
+        """
+        path = self.plan(manager)
+        total = len(manager.students)
+        lines = [f"Query: {self.tree.describe()}"]
+        if path is None:
+            lines.append(f"  Full scan ({total:,} rows)")
+            considered = self.tree.access(manager)
+            if considered is not None:
+                lines.append(f"  Index path skipped, would fetch ~{considered.estimate:,} "
+                             f"of {total:,} rows:")
+                lines.extend(considered.lines(2))
+        else:
+            lines.extend(path.lines())
+        lines.append(f"  Filter: {self.tree.describe()}")
+        return '\n'.join(lines)
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def compile_query(text):
+    """
+    Parse and compile a query, reusing earlier compilations of the same text
+
+    Args:
+        text (str): Query expression
+
+    Returns:
+        Query: Compiled query
+
+    Raises:
+        QueryError: If the expression is invalid
+    """
+    return Query(text.strip())
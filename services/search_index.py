@@ -0,0 +1,154 @@
+"""
+Search Index
+Sorted-key prefix index used for typeahead student lookups
+"""
+
+from bisect import bisect_left, insort
+
+# Separates the search key from the student ID inside an entry. It sorts
+# before every printable character, so entries order by key, then by ID.
+_SEP = '\0'
+
+
+class PrefixIndex:
+    """
+    Sorted index of lowercase keys (student ID, full name and each name part)
+    that answers prefix queries in O(log N + K) instead of scanning every student
+
+    Entries are flat ``key\\0student_id`` strings so the index stays compact
+    and can be persisted and reloaded without rebuilding.
+    """
+
+    def __init__(self):
+        """Initialize an empty index"""
+        self._entries = []      # sorted "key\0student_id" strings
+        self._ids = []          # sorted student IDs for empty-prefix browsing
+        self._names = {}        # student_id -> indexed name, to find its keys on removal
+
+    @staticmethod
+    def _keys_for(student_id, name):
+        """
+        Build the set of searchable keys for a student
+
+        Args:
+            student_id (str): Student ID
+            name (str): Student name
+
+        Returns:
+            set: Lowercase keys
+        """
+        name = name.lower()
+        keys = {student_id.lower(), name}
+        keys.update(name.split())
+        return keys
+
+    def build(self, students):
+        """
+        Rebuild the index from scratch
+
+        Args:
+            students (list): List of Student objects
+        """
+        self._names = {s.student_id: s.name for s in students}
+        self._entries = sorted(
+            key + _SEP + student_id
+            for student_id, name in self._names.items()
+            for key in self._keys_for(student_id, name)
+        )
+        self._ids = sorted(self._names)
+
+    def add(self, student):
+        """
+        Index a single student, replacing any previous entries for its ID
+
+        Args:
+            student (Student): Student to add
+        """
+        if student.student_id in self._names:
+            self.remove(student.student_id)
+        self._names[student.student_id] = student.name
+        for key in self._keys_for(student.student_id, student.name):
+            insort(self._entries, key + _SEP + student.student_id)
+        insort(self._ids, student.student_id)
+
+    def remove(self, student_id):
+        """
+        Remove a student from the index
+
+        Args:
+            student_id (str): Student ID to remove
+        """
+        name = self._names.pop(student_id, None)
+        if name is None:
+            return
+        for key in self._keys_for(student_id, name):
+            entry = key + _SEP + student_id
+            pos = bisect_left(self._entries, entry)
+            if pos < len(self._entries) and self._entries[pos] == entry:
+                del self._entries[pos]
+        pos = bisect_left(self._ids, student_id)
+        if pos < len(self._ids) and self._ids[pos] == student_id:
+            del self._ids[pos]
+
+    def search(self, prefix, limit=25):
+        """
+        Find student IDs with a key starting with the prefix
+
+        Args:
+            prefix (str): Typed prefix (case-insensitive)
+            limit (int): Maximum number of IDs to return
+
+        Returns:
+            list: Matching student IDs, at most ``limit`` long
+        """
+        prefix = (prefix or "").strip().lower()
+        if not prefix:
+            return self._ids[:limit]
+
+        results = []
+        seen = set()
+        pos = bisect_left(self._entries, prefix)
+        while pos < len(self._entries) and len(results) < limit:
+            entry = self._entries[pos]
+            if not entry.startswith(prefix):
+                break
+            student_id = entry.rpartition(_SEP)[2]
+            if student_id not in seen:
+                seen.add(student_id)
+                results.append(student_id)
+            pos += 1
+        return results
+
+    def to_dict(self):
+        """
+        Convert the index to plain lists for persistence
+
+        Returns:
+            dict: Serializable index state
+        """
+        return {
+            'entries': self._entries,
+            'ids': self._ids,
+            'names': [self._names[student_id] for student_id in self._ids]
+        }
+
+    @staticmethod
+    def from_dict(data):
+        """
+        Restore an index saved with to_dict, without re-sorting
+
+        Args:
+            data (dict): Index state
+
+        Returns:
+            PrefixIndex: Restored index
+        """
+        index = PrefixIndex()
+        index._entries = data['entries']
+        index._ids = data['ids']
+        index._names = dict(zip(data['ids'], data['names']))
+        return index
+
+    def __len__(self):
+        """Number of indexed students"""
+        return len(self._names)
@@ -0,0 +1,472 @@
+"""
+Sharded Student Manager
+Stores one data file per grade and loads shards lazily with LRU eviction
+"""
+
+import argparse
+import os
+import re
+import sys
+import threading
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+
+from models.schema import is_current
+from models.student import Student
+from services.instrumentation import timed
+from services.metrics import instrument
+from services.storage import ENCODINGS, write_records
+from services.streaming import iter_records
+from services.student_manager import StudentManager
+
+
+class ShardedStudentManager(StudentManager):
+    """
+    StudentManager whose data is partitioned into per-grade shard files
+
+    A global student_id -> grade directory is kept in memory and persisted
+    as an append-only log, so any student can be found without loading every
+    shard. Shards are loaded on first use and evicted least-recently-used
+    beyond ``max_loaded_shards``. Writes rewrite only the affected shards.
+
+    Mutations go through the same undo-logged primitives as StudentManager,
+    so transactions, merges, imports, archiving and restoring behave the
+    same. A shard with unsaved changes is pinned in memory until it is
+    written, even beyond ``max_loaded_shards``. Shards and the directory
+    are separate files, so a failed save rewrites whatever was already
+    written back to its previous contents. Unlike a single data file, a
+    shard directory is not checked for writes from other processes: use
+    one writing process per directory.
+    """
+
+    DIRECTORY_FILE = 'directory.log'
+
+    # Approximate bytes per directory entry (ID string, grade reference, dict slot)
+    DIRECTORY_ENTRY_BYTES = 160
+
+    def __init__(self, data_dir='data/shards', max_loaded_shards=4, encoding='compact',
+                 change_feed=False):
+        """
+        Initialize the sharded manager
+
+        Args:
+            data_dir (str): Directory holding shard files and the directory log
+            max_loaded_shards (int): Shards kept in memory at once
+            encoding (str): Encoding used for shard files
+            change_feed (bool): Publish changes to a feed next to the directory log
+        """
+        self.data_dir = data_dir
+        self.max_loaded_shards = max_loaded_shards
+        self._shards = OrderedDict()   # grade -> {student_id: Student}, LRU order
+        self._dirty = {}               # grade -> shard changed since it was last written
+        self._written = []             # grades rewritten by the save in progress
+        self._directory = {}           # student_id -> grade
+        self._grade_counts = Counter()
+        self._id_order = None          # sorted IDs for typeahead, rebuilt lazily
+        self._contacts_built = False   # email/phone indexes need every shard
+        self._log_entries = 0
+        super().__init__(data_file=os.path.join(data_dir, self.DIRECTORY_FILE),
+                         encoding=encoding, streaming=True, change_feed=change_feed)
+
+    # Shard and directory persistence
+
+    def _shard_path(self, grade):
+        """Shard file for a grade, e.g. grade-pre-k.json"""
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', grade).strip('-').lower()
+        return os.path.join(self.data_dir, f"grade-{slug}.json")
+
+    def _load_shard(self, grade):
+        """
+        Get a shard, loading it from disk and evicting the LRU shard if needed
+
+        Args:
+            grade (str): Grade of the shard
+
+        Returns:
+            dict: student_id -> Student
+        """
+        shard = self._shards.get(grade)
+        if shard is not None:
+            self._shards.move_to_end(grade)
+            return shard
+        shard = self._dirty.get(grade)
+        if shard is not None:
+            # Evicted with unsaved changes: the pinned dict is the current one
+            self._shards[grade] = shard
+            while len(self._shards) > self.max_loaded_shards:
+                self._shards.popitem(last=False)
+            return shard
+
+        path = self._shard_path(grade)
+        shard = {}
+        outdated = 0
+        if os.path.exists(path):
+            for item in iter_records(path):
+                if not is_current(item):
+                    outdated += 1
+                shard[item['student_id']] = Student.from_dict(item)
+        self._shards[grade] = shard
+        while len(self._shards) > self.max_loaded_shards:
+            self._shards.popitem(last=False)
+        if outdated:
+            threading.Thread(target=self._write_back_shard, args=(grade,),
+                             name='schema-write-back').start()
+        return shard
+
+    def _write_back_shard(self, grade):
+        """Worker: rewrite a shard read in an older schema version, if still loaded"""
+        with self._save_lock:
+            shard = self._shards.get(grade)
+            if shard is None:
+                return  # evicted; it is upgraded again on its next load
+            try:
+                write_records(self._shard_path(grade), [s.to_dict() for s in list(shard.values())],
+                              self.encoding)
+            except Exception as e:
+                print(f"Error upgrading shard {grade}: {e}")
+
+    def _write_shard(self, grade, shard=None):
+        """Rewrite one shard file (the cached or pinned one by default); returns success"""
+        if shard is None:
+            shard = self._load_shard(grade)
+        path = self._shard_path(grade)
+        with self._save_lock:
+            try:
+                if shard:
+                    write_records(path, [s.to_dict() for s in shard.values()], self.encoding)
+                elif os.path.exists(path):
+                    os.remove(path)
+                return True
+            except Exception as e:
+                print(f"Error saving shard {grade}: {e}")
+                return False
+
+    def _append_directory(self, entries):
+        """
+        Append (student_id, grade or None) changes to the directory log
+
+        The log is compacted once it holds twice as many lines as live entries.
+        """
+        try:
+            with open(self.data_file, 'a') as f:
+                for student_id, grade in entries:
+                    f.write(f"{student_id}\t{grade or ''}\n")
+            self._log_entries += len(entries)
+        except OSError as e:
+            print(f"Error writing directory: {e}")
+            return False
+        if self._log_entries > 2 * len(self._directory) + 1000:
+            self._compact_directory()
+        return True
+
+    def _compact_directory(self):
+        """Rewrite the directory log with one line per live student"""
+        tmp_path = self.data_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            for student_id, grade in self._directory.items():
+                f.write(f"{student_id}\t{grade}\n")
+        os.replace(tmp_path, self.data_file)
+        self._log_entries = len(self._directory)
+
+    def _rebuild_indexes(self):
+        """Recount grades from the directory (shards are indexed on load)"""
+        self._grade_counts = Counter(self._directory.values())
+        self._id_order = None
+        self._fuzzy_index = None
+        self._sorted_indexes = {}
+        self._contacts_built = False
+
+    def estimated_memory(self):
+        """Approximate memory held by loaded shards, the directory and indexes"""
+        loaded = sum(len(shard) for shard in self._shards.values())
+        return (loaded * self.BYTES_PER_STUDENT
+                + len(self._directory) * (self.DIRECTORY_ENTRY_BYTES + self._lazy_index_bytes()))
+
+    def _ensure_contact_indexes(self):
+        """Build the email and phone indexes on first use by reading every shard"""
+        if not self._contacts_built:
+            self._build_contact_indexes(self._iter_students())
+            self._contacts_built = True
+
+    @timed('manager.load_data')
+    @instrument('load_data')
+    def load_data(self, background=False):
+        """
+        Load the ID directory; shards are loaded on demand
+
+        Args:
+            background (bool): Ignored, the directory is small
+        """
+        self._shards.clear()
+        self._dirty.clear()
+        self._directory = {}
+        self._log_entries = 0
+        try:
+            if os.path.exists(self.data_file):
+                with open(self.data_file) as f:
+                    for line in f:
+                        student_id, _, grade = line.rstrip('\n').partition('\t')
+                        if grade:
+                            self._directory[student_id] = grade
+                        else:
+                            self._directory.pop(student_id, None)
+                        self._log_entries += 1
+            else:
+                open(self.data_file, 'a').close()
+        except Exception as e:
+            print(f"Error loading directory: {e}")
+            self._directory = {}
+        self._rebuild_indexes()
+
+    def _changed_on_disk(self):
+        """Never: shard directories have a single writing process"""
+        return False
+
+    @timed('manager.save_data')
+    @instrument('save_data')
+    def save_data(self):
+        """Rewrite every loaded shard and compact the directory"""
+        try:
+            grades = list(self._shards) + [g for g in self._dirty if g not in self._shards]
+            ok = all(self._write_shard(grade) for grade in grades)
+            self._compact_directory()
+            if ok:
+                self._dirty.clear()
+            return ok
+        except Exception as e:
+            print(f"Error saving data: {e}")
+            return False
+
+    # Undo-logged mutations, applied to the shards and the directory
+
+    def _index_add(self, student):
+        """Index a student's contacts; the lazily built indexes start over"""
+        self._email_index.add(student)
+        self._phone_index.add(student)
+        self._id_order = None
+        self._fuzzy_index = None
+        self._sorted_indexes = {}
+
+    def _index_remove(self, student):
+        """Drop a student's contacts; the lazily built indexes start over"""
+        self._email_index.remove(student)
+        self._phone_index.remove(student)
+        self._id_order = None
+        self._fuzzy_index = None
+        self._sorted_indexes = {}
+
+    def _pin(self, grade):
+        """Shard about to change, kept in memory until it is written"""
+        self._dirty[grade] = shard = self._load_shard(grade)
+        return shard
+
+    def _current(self, student):
+        """
+        The cached object for a student
+
+        A shard evicted and reloaded since the caller looked the student up
+        holds a new object; changing the old one would be lost.
+        """
+        return self._pin(self._directory[student.student_id]).get(student.student_id, student)
+
+    def _attach(self, student):
+        """Put a student into its grade's shard and the directory"""
+        self._pin(student.grade)[student.student_id] = student
+        self._directory[student.student_id] = student.grade
+        self._grade_counts[student.grade] += 1
+        self._index_add(student)
+
+    def _detach(self, student):
+        """Take a student out of its grade's shard and the directory"""
+        self._pin(student.grade).pop(student.student_id, None)
+        self._directory.pop(student.student_id, None)
+        self._grade_counts[student.grade] -= 1
+        self._index_remove(student)
+
+    def _regrade(self, student, old_grade):
+        """Move a student whose grade changed to the new grade's shard"""
+        if student.grade == old_grade:
+            return
+        self._pin(old_grade).pop(student.student_id, None)
+        self._pin(student.grade)[student.student_id] = student
+        self._directory[student.student_id] = student.grade
+        self._grade_counts[old_grade] -= 1
+        self._grade_counts[student.grade] += 1
+
+    def _apply_insert(self, student, log):
+        """Add a student to its shard; undo removes it"""
+        self._attach(student)
+        log.append(('insert', student))
+
+    def _apply_delete(self, student, log):
+        """Remove a student from its shard; undo puts it back"""
+        student = self._current(student)
+        self._detach(student)
+        log.append(('delete', student, None))
+
+    def _apply_bulk_delete(self, students, log):
+        """Remove many students, shard by shard"""
+        for student in students:
+            self._apply_delete(student, log)
+
+    def _apply_update(self, student, changes, log):
+        """Set changed fields, moving the student if its grade changes"""
+        student = self._current(student)
+        changes = {field: value for field, value in changes.items()
+                   if getattr(student, field) != value}
+        if not changes:
+            return
+        old_values = {field: getattr(student, field) for field in changes}
+        old_grade = student.grade
+        self._index_remove(student)
+        student.update(**changes)
+        self._index_add(student)
+        self._regrade(student, old_grade)
+        log.append(('update', student, old_values, changes))
+
+    def _undo(self, log):
+        """Reverse logged mutations, then restore any shard a failed save already wrote"""
+        student_ids = {entry[1].student_id for entry in log}
+        for entry in reversed(log):
+            action, student = entry[0], entry[1]
+            if action == 'insert':
+                self._detach(student)
+            elif action == 'delete':
+                self._attach(student)
+            else:
+                grade = student.grade
+                self._index_remove(student)
+                student.update(**entry[2])
+                self._index_add(student)
+                self._regrade(student, grade)
+        log.clear()
+        if self._written:
+            for grade in self._written:
+                self._write_shard(grade, self._dirty[grade])
+            self._append_directory([(student_id, self._directory.get(student_id))
+                                    for student_id in student_ids])
+        self._written = []
+        self._dirty.clear()
+
+    def _persist(self, log):
+        """
+        Write the shards the log changed, then its directory entries
+
+        A failure in either is a failed save: the caller undoes the log,
+        which also rewrites the shards written so far.
+        """
+        self._written = []
+        for grade, shard in list(self._dirty.items()):
+            if not self._write_shard(grade, shard):
+                return False
+            self._written.append(grade)
+        entries = {}
+        for entry in log:
+            student_id = entry[1].student_id
+            entries[student_id] = self._directory.get(student_id)
+        if entries and not self._append_directory(list(entries.items())):
+            return False
+        self._written = []
+        self._dirty.clear()
+        return True
+
+    # Queries
+
+    def get_student_by_id(self, student_id):
+        """Look up a student through the directory (loading one shard at most), then the archive"""
+        grade = self._directory.get(student_id)
+        if grade is None:
+            return self.cold_store.get(student_id) if student_id in self.cold_store else None
+        return self._load_shard(grade).get(student_id)
+
+    def is_archived(self, student_id):
+        """Whether a student lives in the cold store rather than a shard"""
+        return student_id not in self._directory and student_id in self.cold_store
+
+    def _iter_students(self):
+        """Yield every student, one shard at a time"""
+        for grade in sorted(g for g, n in self._grade_counts.items() if n):
+            yield from list(self._load_shard(grade).values())
+
+    def get_all_students(self):
+        """All students, loading every shard in turn"""
+        return list(self._iter_students())
+
+    @property
+    def students(self):
+        """All students (loads every shard; prefer grade-scoped queries)"""
+        return self.get_all_students()
+
+    @students.setter
+    def students(self, value):
+        # StudentManager.__init__ assigns an empty list; shards own the data
+        pass
+
+    @timed('manager.filter_by_grade')
+    def filter_by_grade(self, grade):
+        """Students in one grade, loading only that shard"""
+        if not self._grade_counts.get(grade):
+            return []
+        return list(self._load_shard(grade).values())
+
+    def suggest_students(self, prefix, limit=25):
+        """
+        Typeahead by student ID prefix, using only the directory
+
+        Names live in the shards, so name prefixes are not matched here.
+        """
+        prefix = (prefix or '').strip().lower()
+        if self._id_order is None:
+            self._id_order = sorted((sid.lower(), sid) for sid in self._directory)
+        ids = self._id_order
+        pos = bisect_left(ids, (prefix, ''))
+        matches = []
+        while pos < len(ids) and len(matches) < limit and ids[pos][0].startswith(prefix):
+            student = self.get_student_by_id(ids[pos][1])
+            if student:
+                matches.append(student)
+            pos += 1
+        return matches
+
+
+def convert_to_shards(source, data_dir, encoding='compact'):
+    """
+    Split a JSON data file into per-grade shards
+
+    Args:
+        source (str): JSON, gzip or lzma data file
+        data_dir (str): Destination shard directory (created if missing)
+        encoding (str): Shard file encoding
+
+    Returns:
+        int: Number of students written
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    by_grade = {}
+    for item in iter_records(source):
+        by_grade.setdefault(item['grade'], []).append(item)
+
+    manager = ShardedStudentManager(data_dir=data_dir, encoding=encoding)
+    directory = []
+    for grade, records in by_grade.items():
+        write_records(manager._shard_path(grade), records, encoding)
+        directory.extend((r['student_id'], grade) for r in records)
+    manager._directory = dict(directory)
+    manager._compact_directory()
+    return len(directory)
+
+
+def main(argv=None):
+    """Command-line converter from a JSON data file to shards"""
+    parser = argparse.ArgumentParser(description="Split a data file into per-grade shards")
+    parser.add_argument('source')
+    parser.add_argument('data_dir')
+    parser.add_argument('--encoding', choices=ENCODINGS, default='compact')
+    args = parser.parse_args(argv)
+    count = convert_to_shards(args.source, args.data_dir, args.encoding)
+    print(f"Wrote {count} students to {args.data_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Sorted Index
+Cached orderings of the roster for paged and top-K sorted access
+"""
+
+from bisect import bisect_left, bisect_right, insort
+
+GRADE_ORDER = ['Nursery', 'Pre-K', 'KG', '1', '2', '3', '4', '5', '6', '7', '8', '9',
+               '10', '11', '12', 'Freshman', 'Sophomore', 'Junior', 'Senior']
+
+# Best first, so an ascending performance view starts with the top performers
+PERFORMANCE_ORDER = ['Excellent', 'Good', 'Average', 'Below Average', 'Poor']
+
+GRADE_RANK = {grade: rank for rank, grade in enumerate(GRADE_ORDER)}
+PERFORMANCE_RANK = {level: rank for rank, level in enumerate(PERFORMANCE_ORDER)}
+
+# Sort key name -> function of a student; unknown grades and levels sort last
+SORT_KEYS = {
+    'student_id': lambda s: s.student_id,
+    'name': lambda s: s.name.lower(),
+    'age': lambda s: s.age,
+    'grade': lambda s: GRADE_RANK.get(s.grade, len(GRADE_ORDER)),
+    'performance': lambda s: PERFORMANCE_RANK.get(s.performance, len(PERFORMANCE_ORDER)),
+}
+
+
+class _Highest:
+    """Sorts after every student ID, for inclusive upper bounds"""
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return True
+
+
+_HIGHEST = _Highest()
+
+
+class SortedIndex:
+    """
+    Student IDs kept sorted by one key, ties broken by student ID
+
+    Built once with a full sort, then kept current by add/remove (a binary
+    search plus a list insert), so reading a page costs O(offset + limit)
+    slicing instead of sorting the roster per request.
+    """
+
+    def __init__(self, key):
+        """
+        Args:
+            key (callable): Maps a student to a sortable value
+        """
+        self.key = key
+        self._entries = []      # sorted (key value, student_id)
+        self._keys = {}         # student_id -> key value it is filed under
+
+    def build(self, students):
+        """
+        Rebuild the ordering from scratch
+
+        Args:
+            students (iterable): Student objects
+        """
+        key = self.key
+        keys = {s.student_id: key(s) for s in students}
+        self._keys = keys
+        self._entries = sorted((value, student_id) for student_id, value in keys.items())
+
+    def add(self, student):
+        """
+        File a student under its current key value
+
+        Args:
+            student (Student): Student to add
+        """
+        self.remove(student.student_id)
+        value = self.key(student)
+        self._keys[student.student_id] = value
+        insort(self._entries, (value, student.student_id))
+
+    def remove(self, student_id):
+        """
+        Drop a student from the ordering
+
+        Args:
+            student_id (str): Student ID to remove
+        """
+        if student_id not in self._keys:
+            return
+        value = self._keys.pop(student_id)
+        position = bisect_left(self._entries, (value, student_id))
+        del self._entries[position]
+
+    def slice(self, offset=0, limit=None, descending=False):
+        """
+        Student IDs for one page of the ordering
+
+        Args:
+            offset (int): Entries to skip
+            limit (int, optional): Maximum entries (all remaining if None)
+            descending (bool): Read from the largest key down
+
+        Returns:
+            list: Student IDs in order
+        """
+        total = len(self._entries)
+        offset = max(offset, 0)
+        stop = total if limit is None else min(total, offset + max(limit, 0))
+        if offset >= stop:
+            return []
+        if descending:
+            entries = self._entries[total - stop:total - offset][::-1]
+        else:
+            entries = self._entries[offset:stop]
+        return [student_id for _, student_id in entries]
+
+    def _bounds(self, low=None, high=None, include_low=True, include_high=True):
+        """Entry positions [start, stop) whose key lies between low and high"""
+        entries = self._entries
+        if low is None:
+            start = 0
+        elif include_low:
+            start = bisect_left(entries, (low,))
+        else:
+            start = bisect_right(entries, (low, _HIGHEST))
+        if high is None:
+            stop = len(entries)
+        elif include_high:
+            stop = bisect_right(entries, (high, _HIGHEST))
+        else:
+            stop = bisect_left(entries, (high,))
+        return start, max(start, stop)
+
+    def count_range(self, low=None, high=None, include_low=True, include_high=True):
+        """
+        Number of students whose key lies in a range, in O(log N)
+
+        Args:
+            low: Lower bound, or None for unbounded
+            high: Upper bound, or None for unbounded
+            include_low (bool): Whether the lower bound itself matches
+            include_high (bool): Whether the upper bound itself matches
+
+        Returns:
+            int: Matching students
+        """
+        start, stop = self._bounds(low, high, include_low, include_high)
+        return stop - start
+
+    def range(self, low=None, high=None, include_low=True, include_high=True):
+        """
+        Student IDs whose key lies in a range, in key order
+
+        Args:
+            low: Lower bound, or None for unbounded
+            high: Upper bound, or None for unbounded
+            include_low (bool): Whether the lower bound itself matches
+            include_high (bool): Whether the upper bound itself matches
+
+        Returns:
+            list: Student IDs
+        """
+        start, stop = self._bounds(low, high, include_low, include_high)
+        return [student_id for _, student_id in self._entries[start:stop]]
+
+    def __len__(self):
+        """Number of indexed students"""
+        return len(self._entries)
@@ -0,0 +1,127 @@
+"""
+Storage Encodings
+Reads and writes the JSON data file as pretty, compact, gzip or lzma
+"""
+
+import gzip
+import json
+import lzma
+
+from services.atomic_file import atomic_write
+from services.columnar import MAGIC as SNAPSHOT_MAGIC
+
+try:
+    import orjson
+except ImportError:  # optional faster encoder
+    orjson = None
+
+ENCODINGS = ('pretty', 'compact', 'gzip', 'lzma')
+
+GZIP_MAGIC = b'\x1f\x8b'
+LZMA_MAGIC = b'\xfd7zXZ\x00'
+
+
+def detect_format(path):
+    """
+    Detect how a data file is encoded from its leading bytes
+
+    Args:
+        path (str): Data file
+
+    Returns:
+        str: 'snapshot', 'gzip', 'lzma' or 'json'
+    """
+    with open(path, 'rb') as f:
+        head = f.read(8)
+    if head.startswith(SNAPSHOT_MAGIC):
+        return 'snapshot'
+    if head.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if head.startswith(LZMA_MAGIC):
+        return 'lzma'
+    return 'json'
+
+
+def dumps(records, pretty=False, fast=True):
+    """
+    Serialize records to JSON bytes
+
+    Args:
+        records (list): JSON-compatible data
+        pretty (bool): Indent with two spaces
+        fast (bool): Use orjson when it is installed
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if fast and orjson is not None:
+        return orjson.dumps(records, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(records, indent=2).encode('utf-8')
+    return json.dumps(records, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data, fast=True):
+    """
+    Parse JSON bytes
+
+    Args:
+        data (bytes): UTF-8 encoded JSON
+        fast (bool): Use orjson when it is installed
+
+    Returns:
+        object: Parsed data
+    """
+    if fast and orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_records(path, records, encoding='pretty', fast=True):
+    """
+    Write records with the chosen encoding, replacing the file atomically
+
+    Args:
+        path (str): Output file
+        records (list): Student dicts
+        encoding (str): One of ENCODINGS
+        fast (bool): Use orjson when it is installed
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Encoding must be one of: {', '.join(ENCODINGS)}")
+    payload = dumps(records, pretty=encoding == 'pretty', fast=fast)
+    # Never truncate the live file: a crash mid-write would leave it empty
+    with atomic_write(path) as out:
+        if encoding == 'gzip':
+            # Level 6 trades a little size for much faster writes than level 9
+            with gzip.GzipFile(filename='', mode='wb', compresslevel=6, fileobj=out) as f:
+                f.write(payload)
+        elif encoding == 'lzma':
+            with lzma.LZMAFile(out, 'wb', preset=1) as f:
+                f.write(payload)
+        else:
+            out.write(payload)
+
+
+def read_records(path, fast=True):
+    """
+    Read records from a JSON, gzip or lzma data file
+
+    Args:
+        path (str): Data file
+        fast (bool): Use orjson when it is installed
+
+    Returns:
+        list: Student dicts
+    """
+    file_format = detect_format(path)
+    if file_format == 'gzip':
+        with gzip.open(path, 'rb') as f:
+            return loads(f.read(), fast)
+    if file_format == 'lzma':
+        with lzma.open(path, 'rb') as f:
+            return loads(f.read(), fast)
+    if file_format == 'snapshot':
+        raise ValueError(f"{path} is a columnar snapshot, not JSON")
+    with open(path, 'rb') as f:
+        return loads(f.read(), fast)
@@ -0,0 +1,110 @@
+"""
+Streaming Loader
+Incrementally parses a JSON array of student records
+"""
+
+import gzip
+import json
+import lzma
+import re
+
+from services.storage import detect_format
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+_SKIP_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_SKIP_SEPARATORS = re.compile(r'[ \t\n\r,]*')
+
+
+def iter_json_array(stream, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the objects of a top-level JSON array one at a time
+
+    Only ``chunk_size`` characters plus the record being parsed are held
+    in memory, instead of the whole file text and the full parsed list.
+
+    Args:
+        stream (file): Text-mode file positioned at the start of the array
+        chunk_size (int): Characters read per refill
+
+    Yields:
+        dict: One parsed array element
+
+    Raises:
+        ValueError: If the input is not an array of JSON objects
+    """
+    decoder = json.JSONDecoder()
+    raw_decode = decoder.raw_decode
+    buffer = ''
+    pos = 0
+    while True:
+        pos = _SKIP_WHITESPACE.match(buffer, pos).end()
+        if pos < len(buffer):
+            break
+        buffer, pos = stream.read(chunk_size), 0
+        if not buffer:
+            break
+    if buffer[pos:pos + 1] != '[':
+        raise ValueError("Data file must contain a JSON array")
+    pos += 1
+
+    while True:
+        pos = _SKIP_SEPARATORS.match(buffer, pos).end()
+        if pos == len(buffer):
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                raise ValueError("Unexpected end of data: unterminated JSON array")
+            buffer, pos = chunk, 0
+            continue
+
+        char = buffer[pos]
+        if char == ']':
+            return
+        if char != '{':
+            raise ValueError(f"Expected a JSON object, found {char!r}")
+
+        try:
+            record, pos = raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # The object straddles the chunk boundary: read more and retry
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                raise
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield record
+
+
+def open_text(path):
+    """
+    Open a JSON, gzip or lzma data file for reading as text
+
+    Args:
+        path (str): Data file
+
+    Returns:
+        file: Text-mode stream
+    """
+    file_format = detect_format(path)
+    if file_format == 'gzip':
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if file_format == 'lzma':
+        return lzma.open(path, 'rt', encoding='utf-8')
+    if file_format == 'snapshot':
+        raise ValueError(f"{path} is a columnar snapshot, not JSON")
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_records(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream student dicts from a data file
+
+    Args:
+        path (str): JSON, gzip or lzma data file
+        chunk_size (int): Characters read per refill
+
+    Yields:
+        dict: Student data
+    """
+    with open_text(path) as stream:
+        yield from iter_json_array(stream, chunk_size)
@@ -3,57 +3,594 @@ Student Manager Service
 Handles all CRUD operations and data persistence
 """
 
-import json
 import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from itertools import islice
+from models.schema import is_current
 from models.student import Student
 from services.validation import Validator
+from services.search_index import PrefixIndex
+from services.fuzzy_index import FuzzyNameIndex
+from services.sorted_index import SORT_KEYS, SortedIndex
+from services.query import compile_query
+from services.unique_index import UniqueIndex
+from services.instrumentation import timed
+from services.metrics import instrument, record_dataset
+from services.columnar import ColumnarSnapshot, SNAPSHOT_EXTENSION, write_snapshot
+from services.storage import ENCODINGS, detect_format, read_records, write_records
+from services.streaming import iter_records
+from services.index_store import data_fingerprint, load_indexes, save_indexes
+from services.change_feed import ChangeFeed, changes_path, tail
+from services.cold_store import ColdStore
+from services.atomic_file import file_lock
+
+
+class TransactionError(Exception):
+    """Raised when a transaction cannot be committed"""
+    pass
+
+
+class _Rollback(Exception):
+    """Aborts a transaction from inside, carrying the errors to report"""
+    pass
+
+
+def _mutation(method):
+    """
+    Run a mutation under the manager's mutation lock
+
+    The lock is re-entrant and an open transaction holds it until it
+    commits or rolls back, so one thread's transaction never absorbs (and
+    never undoes) another thread's change. A mutation outside a transaction
+    first picks up any write another process made to the data file.
+    """
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._mutation_lock:
+            if self._undo_log is None:
+                self._reload_if_changed()
+            return method(self, *args, **kwargs)
+    return locked
+
 
 class StudentManager:
     """
     Manages student data and operations
+    
+    One manager may be shared by many threads (Streamlit sessions, API
+    requests). Mutations and transactions are serialized by a mutation
+    lock; each transaction's undo log belongs to the thread that opened it.
+    Reads do not wait, so they can see a transaction's changes before it
+    commits.
+    
+    Other processes (the CLI, a second app) may write the same data file.
+    Each mutation reloads the file first if it changed on disk, and a save
+    that would overwrite a write made since then is refused and rolled back.
     """
     
-    def __init__(self, data_file='data/students.json'):
+    # Rosters at least this large persist their indexes and rebuild stale
+    # ones in the background; smaller ones just rebuild synchronously
+    INDEX_PERSIST_THRESHOLD = 50_000
+    
+    # Approximate resident bytes per student for estimated_memory(), measured
+    # with tracemalloc: records, ID map and eager indexes, then each lazy index
+    BYTES_PER_STUDENT = 1024
+    SORTED_VIEW_BYTES = 120
+    FUZZY_INDEX_BYTES = 280
+    
+    def __init__(self, data_file='data/students.json', encoding='pretty',
+                 background_load=False, streaming=True, change_feed=False):
         """
         Initialize the student manager
         
         Args:
             data_file (str): Path to the JSON data file
+            encoding (str): How save_data writes JSON: 'pretty', 'compact',
+                'gzip' or 'lzma'. load_data detects the format on its own.
+            background_load (bool): Load JSON on a worker thread so early
+                records are readable before the whole file is parsed
+            streaming (bool): Parse JSON record by record, keeping peak memory
+                close to the final store. False parses the whole file at once,
+                which is faster with orjson but needs about twice the memory.
+            change_feed (bool): Publish every committed change to a
+                ChangeFeed stored next to the data file
         """
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Encoding must be one of: {', '.join(ENCODINGS)}")
         self.data_file = data_file
+        self.encoding = encoding
+        self._loaded_fingerprint = None   # data file version this roster came from
+        self.streaming = streaming
         self.students = []
+        self._students_by_id = {}
+        self.picker_index = PrefixIndex()
+        self._fuzzy_index = None    # built on the first fuzzy search
+        self._fuzzy_lock = threading.Lock()
+        self._sorted_indexes = {}   # sort key -> SortedIndex, built on first use
+        self._sorted_lock = threading.Lock()
+        self._email_index = UniqueIndex('email', Validator.normalize_email)
+        self._phone_index = UniqueIndex('phone', Validator.normalize_phone)
+        self._loaded = threading.Event()
+        self._loaded.set()
+        self._indexes_ready = threading.Event()
+        self._indexes_ready.set()
+        self._local = threading.local()   # per-thread state: the open transaction's undo log
+        self._mutation_lock = threading.RLock()   # held by each mutation and open transaction
+        self._save_lock = threading.RLock()   # held while the data file is read or written
+        self._outdated = 0      # records read in an older schema version
         self._ensure_data_directory()
-        self.load_data()
+        self.change_feed = ChangeFeed(changes_path(data_file)) if change_feed else None
+        self.cold_store = self._open_cold_store()   # archived students, read on demand
+        self.load_data(background=background_load)
+    
+    @property
+    def _undo_log(self):
+        """Undo entries of the transaction open on this thread, if any"""
+        return getattr(self._local, 'undo_log', None)
+    
+    @_undo_log.setter
+    def _undo_log(self, log):
+        self._local.undo_log = log
     
     def _ensure_data_directory(self):
         """Create data directory if it doesn't exist"""
         os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
     
-    def load_data(self):
-        """Load student data from JSON file"""
-        try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                    self.students = [Student.from_dict(item) for item in data]
-            else:
+    def _open_cold_store(self):
+        """Archive tier stored next to the data file"""
+        return ColdStore(self.data_file)
+    
+    def _rebuild_indexes(self):
+        """
+        Rebuild the ID map and restore or rebuild the secondary indexes
+        
+        Large rosters first try the persisted typeahead index next to the data
+        file and build the rest on a worker thread; writes wait for it.
+        """
+        self._students_by_id = {s.student_id: s for s in self.students}
+        self._fuzzy_index = None
+        self._sorted_indexes = {}
+        if len(self.students) < self.INDEX_PERSIST_THRESHOLD:
+            self.picker_index = PrefixIndex()
+            self.picker_index.build(self.students)
+            self._build_contact_indexes(self.students)
+            return
+        
+        self._indexes_ready.clear()
+        index = load_indexes(self.data_file, len(self.students))
+        if index is not None:
+            self.picker_index = index
+        fingerprint = data_fingerprint(self.data_file)
+        students = list(self.students)
+        
+        def build():
+            if index is None:
+                picker = PrefixIndex()
+                picker.build(students)
+                self.picker_index = picker
+                save_indexes(self.data_file, fingerprint, len(students), picker)
+            self._build_contact_indexes(students)
+            self._indexes_ready.set()
+        
+        threading.Thread(target=build, name='index-builder', daemon=True).start()
+    
+    def _build_contact_indexes(self, students):
+        """Rebuild the unique email and phone indexes"""
+        students = list(students)
+        email_index = UniqueIndex('email', Validator.normalize_email)
+        email_index.build(students)
+        phone_index = UniqueIndex('phone', Validator.normalize_phone)
+        phone_index.build(students)
+        self._email_index = email_index
+        self._phone_index = phone_index
+    
+    def _ensure_contact_indexes(self):
+        """Hook for managers that build the contact indexes lazily"""
+        pass
+    
+    def _contact_conflicts(self, email=None, phone=None, student=None):
+        """
+        Check that an email and phone are not held by another student
+        
+        Values equal (after normalizing) to the student's current ones are
+        not checked, so students saved before uniqueness was enforced can
+        still be edited.
+        
+        Args:
+            email (str, optional): Email to check
+            phone (str, optional): Phone to check
+            student (Student, optional): Student being updated
+            
+        Returns:
+            list: Error messages, empty if both are free
+        """
+        self._ensure_contact_indexes()
+        errors = []
+        for value, index, label in ((email, self._email_index, "Email"),
+                                    (phone, self._phone_index, "Phone number")):
+            if value is None:
+                continue
+            if student is not None and index.normalize(value) == index.key_for(student):
+                continue
+            if index.owner(value) is not None:
+                errors.append(f"{label} is already registered to another student")
+        return errors
+    
+    def _lazy_index_bytes(self):
+        """Per-student cost of the lazily built indexes that exist right now"""
+        extra = self.SORTED_VIEW_BYTES * len(self._sorted_indexes)
+        if self._fuzzy_index is not None:
+            extra += self.FUZZY_INDEX_BYTES
+        return extra
+    
+    def estimated_memory(self):
+        """
+        Approximate memory held by the roster and its indexes
+        
+        Returns:
+            int: Bytes
+        """
+        return len(self.students) * (self.BYTES_PER_STUDENT + self._lazy_index_bytes())
+    
+    def persist_indexes(self):
+        """
+        Save the current indexes so the next start can skip rebuilding them
+        
+        Returns:
+            bool: True if written
+        """
+        self.wait_until_loaded()
+        return save_indexes(self.data_file, data_fingerprint(self.data_file),
+                            len(self.students), self.picker_index)
+    
+    @timed('manager.load_data')
+    @instrument('load_data')
+    def load_data(self, background=False):
+        """
+        Load student data from the data file
+        
+        Args:
+            background (bool): Stream JSON records on a worker thread. Records
+                become readable in batches; mutations wait until the load ends.
+        """
+        self.wait_until_loaded()
+        with self._save_lock:
+            # Taken before reading, so a write that lands mid-load is caught too
+            self._loaded_fingerprint = data_fingerprint(self.data_file)
+            try:
+                if os.path.exists(self.data_file) and detect_format(self.data_file) == 'snapshot':
+                    # Decodes every row: the manager's list and indexes need
+                    # them all. Read-only callers should query ColumnarSnapshot
+                    with ColumnarSnapshot(self.data_file) as snapshot:
+                        self.students = list(snapshot)
+                elif os.path.exists(self.data_file) and background:
+                    self._start_background_load()
+                    return
+                elif os.path.exists(self.data_file) and self.streaming:
+                    self.students = list(self._hydrate(iter_records(self.data_file)))
+                elif os.path.exists(self.data_file):
+                    data = read_records(self.data_file)
+                    self.students = list(self._hydrate(data))
+                else:
+                    self.students = []
+                    self.save_data()  # Create empty file
+            except Exception as e:
+                print(f"Error loading data: {e}")
                 self.students = []
-                self.save_data()  # Create empty file
+                self._outdated = 0   # never write back a partial roster
+        self._rebuild_indexes()
+        record_dataset(len(self.students), self.data_file)
+        self._write_back_outdated()
+    
+    def _changed_on_disk(self):
+        """Whether the data file was written by someone else since this manager loaded or saved it"""
+        return data_fingerprint(self.data_file) != self._loaded_fingerprint
+    
+    def _reload_if_changed(self):
+        """Reload the roster if another process wrote the data file"""
+        if self._changed_on_disk():
+            self.load_data()
+    
+    def _hydrate(self, records):
+        """Students from stored records, counting those upgraded from an older schema"""
+        self._outdated = 0
+        for item in records:
+            if not is_current(item):
+                self._outdated += 1
+            yield Student.from_dict(item)
+    
+    def _write_back_outdated(self):
+        """
+        Save the roster on a worker thread if any record was read in an older
+        schema version, so the file converges on the current layout without
+        delaying startup
+        
+        The thread is not a daemon, so a short-lived process (a CLI command)
+        finishes the write before exiting; the write itself is atomic.
+        """
+        if not self._outdated:
+            return
+        outdated, self._outdated = self._outdated, 0
+        
+        def write_back():
+            if self.save_data():
+                # stderr: stdout may be a JSON-lines stream (services.cli)
+                print(f"Upgraded {outdated:,} records in {self.data_file} to the current schema",
+                      file=sys.stderr)
+        
+        threading.Thread(target=write_back, name='schema-write-back').start()
+    
+    def _start_background_load(self):
+        """Reset the store and stream the data file on a worker thread"""
+        self.students = []
+        self._students_by_id = {}
+        self.picker_index.build([])
+        self._loaded.clear()
+        threading.Thread(target=self._load_in_background, name='student-loader',
+                         daemon=True).start()
+    
+    def _load_in_background(self, batch_size=5000):
+        """Worker: publish hydrated students in batches, then build indexes"""
+        try:
+            with self._save_lock:
+                batch = []
+                for student in self._hydrate(iter_records(self.data_file)):
+                    batch.append(student)
+                    if len(batch) >= batch_size:
+                        self._publish_batch(batch)
+                        batch = []
+                self._publish_batch(batch)
         except Exception as e:
             print(f"Error loading data: {e}")
             self.students = []
+            self._outdated = 0   # never write back a partial roster
+        finally:
+            self._rebuild_indexes()
+            record_dataset(len(self.students), self.data_file)
+            self._loaded.set()
+        self._write_back_outdated()
+    
+    def _publish_batch(self, batch):
+        """Make a batch of loaded students visible to readers"""
+        self.students.extend(batch)
+        self._students_by_id.update((s.student_id, s) for s in batch)
+    
+    def is_loading(self):
+        """
+        Check whether a background load is still running
+        
+        Returns:
+            bool: True until every record has been loaded
+        """
+        return not self._loaded.is_set()
+    
+    def wait_until_loaded(self, timeout=None):
+        """
+        Block until any background load and index build have finished
+        
+        Args:
+            timeout (float, optional): Maximum seconds to wait for each
+            
+        Returns:
+            bool: True if loading is complete
+        """
+        return self._loaded.wait(timeout) and self._indexes_ready.wait(timeout)
     
+    @timed('manager.save_data')
+    @instrument('save_data')
     def save_data(self):
-        """Save student data to JSON file"""
-        try:
-            with open(self.data_file, 'w') as f:
-                data = [student.to_dict() for student in self.students]
-                json.dump(data, f, indent=2)
+        """
+        Save student data using the configured encoding (or a columnar
+        snapshot for .smsc paths)
+        
+        If the data file changed on disk since this manager loaded or last
+        saved it, another process wrote it in the meantime: the save is
+        refused rather than overwriting that write, and the calling mutation
+        rolls back. The next mutation reloads the file.
+        """
+        self.wait_until_loaded()
+        # Serializes writers (e.g. a schema write-back and a user's edit); the
+        # roster is read inside the lock so the last write is the newest state
+        with self._save_lock:
+            try:
+                # Other processes' saves and migrate_file take the same lock,
+                # so nothing lands between the check and the write
+                with file_lock(self.data_file):
+                    if self._changed_on_disk():
+                        print(f"Error saving data: {self.data_file} changed on disk since it "
+                              "was loaded; reload before saving")
+                        return False
+                    if self.data_file.endswith(SNAPSHOT_EXTENSION):
+                        write_snapshot(self.data_file, self.students)
+                    else:
+                        data = [student.to_dict() for student in self.students]
+                        write_records(self.data_file, data, self.encoding)
+                    self._loaded_fingerprint = data_fingerprint(self.data_file)
+                record_dataset(len(self.students), self.data_file)
+                return True
+            except Exception as e:
+                print(f"Error saving data: {e}")
+                return False
+    
+    # Secondary indexes kept in step with every mutation and its undo
+    
+    def _index_add(self, student):
+        """Add a student to the secondary indexes"""
+        self.picker_index.add(student)
+        self._email_index.add(student)
+        self._phone_index.add(student)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.add(student)
+        for index in self._sorted_indexes.values():
+            index.add(student)
+    
+    def _index_remove(self, student):
+        """Remove a student from the secondary indexes"""
+        self.picker_index.remove(student.student_id)
+        self._email_index.remove(student)
+        self._phone_index.remove(student)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.remove(student.student_id)
+        for index in self._sorted_indexes.values():
+            index.remove(student.student_id)
+    
+    # Undo-logged mutations. Each primitive changes the student list and the
+    # indexes together and appends the entry that reverses it to a log.
+    
+    def _apply_insert(self, student, log):
+        """Append a student and index it; undo removes that exact object"""
+        self.students.append(student)
+        self._students_by_id[student.student_id] = student
+        self._index_add(student)
+        log.append(('insert', student))
+    
+    def _apply_delete(self, student, log):
+        """Remove a student, remembering its position so undo puts it back there"""
+        position = self.students.index(student)
+        del self.students[position]
+        del self._students_by_id[student.student_id]
+        self._index_remove(student)
+        log.append(('delete', student, position))
+    
+    def _apply_update(self, student, changes, log):
+        """Set changed fields, logging their previous and new values"""
+        changes = {field: value for field, value in changes.items()
+                   if getattr(student, field) != value}
+        if not changes:
+            return
+        old_values = {field: getattr(student, field) for field in changes}
+        self._index_remove(student)
+        student.update(**changes)
+        self._index_add(student)
+        log.append(('update', student, old_values, changes))
+    
+    def _apply_bulk_delete(self, students, log):
+        """Remove many students in one pass over the roster"""
+        doomed = {student.student_id for student in students}
+        kept = []
+        removed = []
+        for position, student in enumerate(self.students):
+            if student.student_id in doomed:
+                removed.append((position, student))
+            else:
+                kept.append(student)
+        self.students = kept
+        # Logged last position first, so undo reinserts in ascending order
+        for position, student in reversed(removed):
+            del self._students_by_id[student.student_id]
+            self._index_remove(student)
+            log.append(('delete', student, position))
+    
+    def _undo(self, log):
+        """Reverse logged mutations, newest first"""
+        for entry in reversed(log):
+            action, student = entry[0], entry[1]
+            if action == 'insert':
+                # The insert may not be the last element if later ones were undone
+                for position in range(len(self.students) - 1, -1, -1):
+                    if self.students[position] is student:
+                        del self.students[position]
+                        break
+                del self._students_by_id[student.student_id]
+                self._index_remove(student)
+            elif action == 'delete':
+                self.students.insert(entry[2], student)
+                self._students_by_id[student.student_id] = student
+                self._index_add(student)
+            else:
+                self._index_remove(student)
+                student.update(**entry[2])
+                self._index_add(student)
+        log.clear()
+    
+    def _commit(self, log):
+        """
+        Persist logged mutations, or hand them to the open transaction
+        
+        Returns:
+            bool: False if the save failed and the mutations were undone
+        """
+        if self._undo_log is not None:
+            self._undo_log.extend(log)
             return True
-        except Exception as e:
-            print(f"Error saving data: {e}")
-            return False
+        if self._persist(log):
+            self._publish_changes(log)
+            return True
+        self._undo(log)
+        return False
     
+    def _persist(self, log):
+        """
+        Write logged mutations to storage
+        
+        Returns:
+            bool: Success status; the caller undoes the log on failure
+        """
+        return self.save_data()
+    
+    def _publish_changes(self, log):
+        """Send a committed undo log to the change feed as ordered events"""
+        if self.change_feed is None or not log:
+            return
+        changes = []
+        for entry in log:
+            action, student = entry[0], entry[1]
+            if action == 'insert':
+                fields = student.to_dict()
+            elif action == 'update':
+                fields = dict(entry[3])
+            else:
+                fields = {}
+            changes.append({'op': action, 'student_id': student.student_id, 'fields': fields})
+        self.change_feed.publish(changes)
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Group several operations into one save
+        
+        Inside the block add/update/delete apply to memory immediately and
+        return as usual, but nothing is written until the block exits. An
+        exception undoes every change made in the block and is re-raised; a
+        failed save also undoes them and raises TransactionError. Nested
+        transactions join the outermost one. Other threads' mutations wait
+        until the block exits.
+        
+        Example:
+            with manager.transaction():
+                manager.add_student(...)
+                manager.delete_student("STU001")
+        
+        Yields:
+            StudentManager: This manager
+        """
+        with self._mutation_lock:
+            if self._undo_log is not None:
+                yield self
+                return
+            
+            self.wait_until_loaded()
+            self._reload_if_changed()
+            log = self._undo_log = []
+            try:
+                yield self
+            except BaseException:
+                self._undo_log = None
+                self._undo(log)
+                raise
+            self._undo_log = None
+            if log and not self._persist(log):
+                self._undo(log)
+                raise TransactionError("Failed to save data; transaction rolled back")
+            self._publish_changes(log)
+    
+    @timed('manager.add_student')
+    @instrument('add_student')
+    @_mutation
     def add_student(self, student_id, name, age, grade, email, phone, performance):
         """
         Add a new student
@@ -70,6 +607,7 @@ class StudentManager:
         Returns:
             tuple: (success, message)
         """
+        self.wait_until_loaded()
         # Validate all fields
         is_valid, errors = Validator.validate_all(
             student_id, name, age, grade, email, phone, performance
@@ -78,20 +616,26 @@ class StudentManager:
         if not is_valid:
             return False, errors
         
-        # Check for duplicate ID
+        # Check for duplicate ID, email and phone
         if self.get_student_by_id(student_id):
             return False, ["Student ID already exists"]
         
+        errors = self._contact_conflicts(email, phone)
+        if errors:
+            return False, errors
+        
         # Create and add student
         student = Student(student_id, name, int(age), grade, email, phone, performance)
-        self.students.append(student)
+        log = []
+        self._apply_insert(student, log)
         
-        if self.save_data():
+        if self._commit(log):
             return True, "Student added successfully"
-        else:
-            self.students.pop()  # Rollback
-            return False, ["Failed to save data"]
+        return False, ["Failed to save data"]
     
+    @timed('manager.update_student')
+    @instrument('update_student')
+    @_mutation
     def update_student(self, student_id, name=None, age=None, grade=None, 
                       email=None, phone=None, performance=None):
         """
@@ -109,10 +653,13 @@ class StudentManager:
         Returns:
             tuple: (success, message)
         """
+        self.wait_until_loaded()
         student = self.get_student_by_id(student_id)
         
         if not student:
             return False, ["Student not found"]
+        if self.is_archived(student_id):
+            return False, ["Student is archived; restore it before editing"]
         
         # Prepare validation data (use existing values if not provided)
         val_name = name if name is not None else student.name
@@ -130,26 +677,25 @@ class StudentManager:
         if not is_valid:
             return False, errors
         
-        # Store old values for rollback
-        old_data = student.to_dict()
-        
-        # Update student
-        student.update(
-            name=name,
-            age=int(age) if age is not None else None,
-            grade=grade,
-            email=email,
-            phone=phone,
-            performance=performance
-        )
+        errors = self._contact_conflicts(email, phone, student)
+        if errors:
+            return False, errors
+        
+        # Only the provided fields are changed and logged for rollback
+        changes = {'name': name, 'age': int(age) if age is not None else None,
+                   'grade': grade, 'email': email, 'phone': phone,
+                   'performance': performance}
+        changes = {field: value for field, value in changes.items() if value is not None}
+        log = []
+        self._apply_update(student, changes, log)
         
-        if self.save_data():
+        if self._commit(log):
             return True, "Student updated successfully"
-        else:
-            # Rollback
-            student.update(**old_data)
-            return False, ["Failed to save data"]
+        return False, ["Failed to save data"]
     
+    @timed('manager.delete_student')
+    @instrument('delete_student')
+    @_mutation
     def delete_student(self, student_id):
         """
         Delete a student
@@ -160,22 +706,197 @@ class StudentManager:
         Returns:
             bool: Success status
         """
+        self.wait_until_loaded()
         student = self.get_student_by_id(student_id)
         
-        if not student:
+        if not student or self.is_archived(student_id):
             return False
         
-        self.students.remove(student)
+        log = []
+        self._apply_delete(student, log)
+        return self._commit(log)
+    
+    @timed('manager.import_students')
+    @instrument('import_students')
+    def import_students(self, records):
+        """
+        Add many students with a single save
         
-        if self.save_data():
-            return True
-        else:
-            self.students.append(student)  # Rollback
-            return False
+        Each record gets the same validation and ID/email/phone uniqueness
+        checks as add_student, including against earlier records in the
+        batch. Rejected records are skipped; the rest are saved together.
+        
+        Args:
+            records (iterable): Student dicts in the data-file format
+            
+        Returns:
+            tuple: (number added, list of (record, errors) for rejected records)
+        """
+        added = 0
+        rejected = []
+        with self.transaction():
+            for record in records:
+                success, result = self.add_student(
+                    record.get('student_id'), record.get('name'), record.get('age'),
+                    record.get('grade'), record.get('email'), record.get('phone'),
+                    record.get('performance')
+                )
+                if success:
+                    added += 1
+                else:
+                    rejected.append((record, result))
+        return added, rejected
+    
+    @timed('manager.merge_students')
+    @instrument('merge_students')
+    def merge_students(self, keep_id, drop_id, fields=None):
+        """
+        Merge a duplicate enrollment into the record being kept
+        
+        The duplicate is deleted and the kept student is updated with any
+        values chosen from it, in one transaction: either both happen or
+        neither does.
+        
+        Args:
+            keep_id (str): Student ID that survives
+            drop_id (str): Duplicate student ID to remove
+            fields (dict, optional): Field values to set on the kept student,
+                e.g. {'phone': duplicate.phone}
+            
+        Returns:
+            tuple: (success, message)
+        """
+        if keep_id == drop_id:
+            return False, ["Cannot merge a student with itself"]
+        if not self.get_student_by_id(keep_id) or not self.get_student_by_id(drop_id):
+            return False, ["Student not found"]
+        if self.is_archived(keep_id) or self.is_archived(drop_id):
+            return False, ["Student is archived; restore it before merging"]
+        try:
+            with self.transaction():
+                self.delete_student(drop_id)
+                if fields:
+                    # The duplicate is gone, so its email or phone can move over
+                    success, errors = self.update_student(keep_id, **fields)
+                    if not success:
+                        raise _Rollback(errors)
+        except _Rollback as e:
+            return False, e.args[0]
+        except TransactionError:
+            return False, ["Failed to save data"]
+        return True, "Students merged successfully"
+    
+    def _inactive_ids(self, days):
+        """IDs of students with no change-feed event in the last ``days`` days"""
+        if self.change_feed is None:
+            raise ValueError("inactive_days needs a manager created with change_feed=True")
+        cutoff = time.time() - days * 86400
+        first_event = None
+        last_active = {}
+        for event in tail(self.change_feed.path):
+            if first_event is None:
+                first_event = event['ts']
+            last_active[event['student_id']] = event['ts']
+        # Students untouched since the feed started only count once it covers the window
+        stale = {student_id for student_id, ts in last_active.items() if ts < cutoff}
+        if first_event is None or first_event > cutoff:
+            return stale
+        return stale | ({s.student_id for s in self.students} - set(last_active))
+    
+    @timed('manager.archive_students')
+    @instrument('archive_students')
+    @_mutation
+    def archive_students(self, where=None, inactive_days=None):
+        """
+        Move students matching a retention policy to the cold store
+        
+        Archived students leave the roster and every index, so loads, saves
+        and queries only pay for active students. They stay reachable through
+        get_student_by_id, search_students(include_archived=True) and
+        get_statistics(include_archived=True). The archive is written before
+        the roster, so a failure never loses a record.
+        
+        Args:
+            where (str, optional): Query expression, e.g. ``grade = Senior``
+            inactive_days (int, optional): Also require no change in this many
+                days (needs a change feed)
+            
+        Returns:
+            int: Number of students archived
+            
+        Raises:
+            QueryError: If ``where`` is invalid
+            ValueError: If no policy is given or inactive_days has no feed
+            TransactionError: If called inside a transaction
+        """
+        if where is None and inactive_days is None:
+            raise ValueError("Give a where expression, inactive_days, or both")
+        if self._undo_log is not None:
+            raise TransactionError("Cannot archive students inside a transaction")
+        self.wait_until_loaded()
+        matches = self.query(where) if where else list(self.students)
+        if inactive_days is not None:
+            inactive = self._inactive_ids(inactive_days)
+            matches = [s for s in matches if s.student_id in inactive]
+        if not matches or not self.cold_store.add(matches):
+            return 0
+        
+        archived_ids = {s.student_id for s in matches}
+        log = []
+        self._apply_bulk_delete(matches, log)
+        if not self._persist(log):
+            self._undo(log)
+            self.cold_store.remove(archived_ids)
+            return 0
+        if self.change_feed is not None:
+            # Consumers see archiving as removal from the roster
+            self.change_feed.publish([{'op': 'archive', 'student_id': student_id, 'fields': {}}
+                                      for student_id in sorted(archived_ids)])
+        return len(matches)
+    
+    @timed('manager.restore_students')
+    @instrument('restore_students')
+    @_mutation
+    def restore_students(self, student_ids):
+        """
+        Move archived students back into the roster
+        
+        Args:
+            student_ids (iterable): Archived student IDs
+            
+        Returns:
+            tuple: (number restored, list of (student_id, errors) for the rest)
+            
+        Raises:
+            TransactionError: If called inside a transaction
+        """
+        if self._undo_log is not None:
+            raise TransactionError("Cannot restore students inside a transaction")
+        self.wait_until_loaded()
+        self._ensure_contact_indexes()
+        log = []
+        failed = []
+        for student_id in student_ids:
+            if not self.is_archived(student_id):
+                failed.append((student_id, ["Student is not archived"]))
+                continue
+            student = self.cold_store.get(student_id)
+            # Contacts of archived students are not reserved, so check again
+            errors = self._contact_conflicts(student.email, student.phone)
+            if errors:
+                failed.append((student_id, errors))
+                continue
+            self._apply_insert(student, log)
+        if not log:
+            return 0, failed
+        if not self._commit(log):
+            return 0, failed + [(entry[1].student_id, ["Failed to save data"]) for entry in log]
+        self.cold_store.remove(entry[1].student_id for entry in log)
+        return len(log), failed
     
     def get_student_by_id(self, student_id):
         """
-        Get a student by ID
+        Get a student by ID, falling back to the archive
         
         Args:
             student_id (str): Student ID
@@ -183,10 +904,52 @@ class StudentManager:
         Returns:
             Student or None: Student object if found
         """
-        for student in self.students:
-            if student.student_id == student_id:
-                return student
-        return None
+        student = self._students_by_id.get(student_id)
+        if student is None and student_id in self.cold_store:
+            return self.cold_store.get(student_id)
+        return student
+    
+    def is_archived(self, student_id):
+        """
+        Check whether a student lives in the cold store rather than the roster
+        
+        Args:
+            student_id (str): Student ID
+            
+        Returns:
+            bool: True if archived
+        """
+        return student_id not in self._students_by_id and student_id in self.cold_store
+    
+    def get_student_by_email(self, email):
+        """
+        Get a student by email, ignoring case
+        
+        Args:
+            email (str): Email address
+            
+        Returns:
+            Student or None: Student object if found
+        """
+        self.wait_until_loaded()
+        self._ensure_contact_indexes()
+        student_id = self._email_index.owner(email)
+        return self.get_student_by_id(student_id) if student_id else None
+    
+    def get_student_by_phone(self, phone):
+        """
+        Get a student by phone number, ignoring separators
+        
+        Args:
+            phone (str): Phone number
+            
+        Returns:
+            Student or None: Student object if found
+        """
+        self.wait_until_loaded()
+        self._ensure_contact_indexes()
+        student_id = self._phone_index.owner(phone)
+        return self.get_student_by_id(student_id) if student_id else None
     
     def get_all_students(self):
         """
@@ -197,12 +960,39 @@ class StudentManager:
         """
         return self.students
     
-    def search_students(self, query):
+    @timed('manager.suggest_students')
+    def suggest_students(self, prefix, limit=25):
+        """
+        Typeahead lookup by student ID or name prefix
+        
+        Args:
+            prefix (str): Typed prefix
+            limit (int): Maximum number of suggestions
+            
+        Returns:
+            list: Up to ``limit`` matching Student objects
+        """
+        self._loaded.wait()
+        if not self._indexes_ready.is_set():
+            # Index still building: answer with a bounded scan
+            prefix = (prefix or "").strip().lower()
+            matches = (s for s in self.students
+                       if any(key.startswith(prefix)
+                              for key in PrefixIndex._keys_for(s.student_id, s.name)))
+            return list(islice(matches, limit))
+        return [self._students_by_id[student_id]
+                for student_id in self.picker_index.search(prefix, limit)]
+    
+    @timed('manager.search_students')
+    @instrument('search_students')
+    def search_students(self, query, include_archived=False):
         """
         Search students by name or ID
         
         Args:
             query (str): Search query
+            include_archived (bool): Also search the cold store, which is
+                decompressed on first use
             
         Returns:
             list: List of matching Student objects
@@ -216,8 +1006,116 @@ class StudentManager:
                 query in student.email.lower()):
                 results.append(student)
         
+        if include_archived:
+            results.extend(s for s in self.cold_store.search(query)
+                           if s.student_id not in self._students_by_id)
         return results
     
+    @timed('manager.fuzzy_search')
+    @instrument('fuzzy_search')
+    def fuzzy_search(self, query, limit=25, max_distance=None, budget_ms=50):
+        """
+        Typo-tolerant name search, e.g. "Wiliams" finds "Williams"
+        
+        Args:
+            query (str): Name or partial name
+            limit (int): Maximum number of results
+            max_distance (int, optional): Edits tolerated per word
+            budget_ms (float): Latency budget for the index lookup
+            
+        Returns:
+            list: Up to ``limit`` Student objects, closest match first
+        """
+        self._loaded.wait()
+        with self._fuzzy_lock:
+            if self._fuzzy_index is None:
+                index = FuzzyNameIndex()
+                index.build(self.students)
+                self._fuzzy_index = index
+        matches = self._fuzzy_index.search(query, limit, max_distance, budget_ms)
+        return [self.get_student_by_id(student_id) for _, student_id in matches]
+    
+    @timed('manager.query')
+    @instrument('query')
+    def query(self, text):
+        """
+        Run a filter expression, e.g.
+        ``grade in (10, 11) and performance >= Good and email endswith "@school.org"``
+        
+        Fields are student_id, name, age, grade, email, phone and
+        performance. Operators are =, !=, <, <=, >, >=, in, not in, between,
+        contains, startswith and endswith, combined with and, or, not and
+        parentheses. Grades compare in school order and performance levels
+        from Poor up to Excellent. The expression is compiled once per text;
+        each run starts from the most selective index it can use.
+        
+        Args:
+            text (str): Query expression
+            
+        Returns:
+            list: Matching Student objects
+            
+        Raises:
+            QueryError: If the expression is invalid
+        """
+        return compile_query(text).execute(self)
+    
+    def explain_query(self, text):
+        """
+        Show how query() would run an expression against the current roster
+        
+        Args:
+            text (str): Query expression
+            
+        Returns:
+            str: The chosen access path and residual filter, one step per line
+            
+        Raises:
+            QueryError: If the expression is invalid
+        """
+        return compile_query(text).explain(self)
+    
+    @timed('manager.sorted_view')
+    @instrument('sorted_view')
+    def sorted_view(self, key, descending=False, limit=None, offset=0):
+        """
+        One page of the roster in sorted order
+        
+        Each key's ordering is built on first use and then kept current by
+        every add, update, delete and rollback, so later pages and top-K
+        lists cost O(offset + limit) rather than a full sort.
+        
+        Args:
+            key (str): 'name', 'age', 'grade', 'performance' (best first)
+                or 'student_id'; ties are ordered by student ID
+            descending (bool): Largest first
+            limit (int, optional): Maximum number of students
+            offset (int): Students to skip
+            
+        Returns:
+            list: Student objects in order
+            
+        Raises:
+            ValueError: If the key is not sortable
+        """
+        if key not in SORT_KEYS:
+            raise ValueError(f"Cannot sort by {key!r}; choose from {', '.join(SORT_KEYS)}")
+        index = self._sorted_index(key)
+        return [self.get_student_by_id(student_id)
+                for student_id in index.slice(offset, limit, descending)]
+    
+    def _sorted_index(self, key):
+        """The ordering for a sort key, building it on first use"""
+        self._loaded.wait()
+        with self._sorted_lock:
+            index = self._sorted_indexes.get(key)
+            if index is None:
+                index = SortedIndex(SORT_KEYS[key])
+                index.build(self.students)
+                self._sorted_indexes[key] = index
+        return index
+    
+    @timed('manager.filter_by_grade')
     def filter_by_grade(self, grade):
         """
         Filter students by grade
@@ -230,6 +1128,7 @@ class StudentManager:
         """
         return [s for s in self.students if s.grade == grade]
     
+    @timed('manager.filter_by_age_range')
     def filter_by_age_range(self, min_age, max_age):
         """
         Filter students by age range
@@ -244,6 +1143,7 @@ class StudentManager:
         return [s for s in self.students 
                 if min_age <= s.age <= max_age]
     
+    @timed('manager.filter_by_performance')
     def filter_by_performance(self, performance):
         """
         Filter students by performance level
@@ -256,39 +1156,49 @@ class StudentManager:
         """
         return [s for s in self.students if s.performance == performance]
     
-    def get_statistics(self):
+    @timed('manager.get_statistics')
+    @instrument('get_statistics')
+    def get_statistics(self, include_archived=False):
         """
         Get system statistics
         
+        Args:
+            include_archived (bool): Count archived students too. Uses the
+                cold store's summary, so no archived records are loaded.
+        
         Returns:
-            dict: Statistics about students
+            dict: Statistics about students; 'archived' is the number of
+                students in the cold store either way
         """
-        if not self.students:
-            return {
-                'total': 0,
-                'avg_age': 0,
-                'performance_distribution': {},
-                'grade_distribution': {}
-            }
-        
-        total = len(self.students)
-        avg_age = sum(s.age for s in self.students) / total
+        students = self.students
+        total = len(students)
+        age_total = sum(s.age for s in students)
         
         # Performance distribution
         performance_dist = {}
-        for student in self.students:
+        for student in students:
             perf = student.performance
             performance_dist[perf] = performance_dist.get(perf, 0) + 1
         
         # Grade distribution
         grade_dist = {}
-        for student in self.students:
+        for student in students:
             grade = student.grade
             grade_dist[grade] = grade_dist.get(grade, 0) + 1
         
+        archived = self.cold_store.summary()
+        if include_archived:
+            total += archived['count']
+            age_total += archived['age_total']
+            for perf, count in archived['performance_distribution'].items():
+                performance_dist[perf] = performance_dist.get(perf, 0) + count
+            for grade, count in archived['grade_distribution'].items():
+                grade_dist[grade] = grade_dist.get(grade, 0) + count
+        
         return {
             'total': total,
-            'avg_age': round(avg_age, 1),
+            'avg_age': round(age_total / total, 1) if total else 0,
             'performance_distribution': performance_dist,
-            'grade_distribution': grade_dist
+            'grade_distribution': grade_dist,
+            'archived': archived['count']
         }
\ No newline at end of file
@@ -0,0 +1,243 @@
+"""
+Tenant Registry
+One process serving many schools, each with its own data file or shard directory
+
+Managers are created on first access and kept in LRU order. Once their
+estimated memory exceeds the budget, the least recently used idle tenants
+are dropped; their data is already on disk (every change saves), so the
+next access simply reloads it.
+
+Tenants come from a JSON file:
+
+    {
+        "north": {"name": "North High", "data_file": "data/north/students.json"},
+        "south": {"name": "South Elementary", "shard_dir": "data/south/shards"}
+    }
+
+or from a directory with one subdirectory per school, each holding a
+students.json or a shards/ directory:
+
+    python -m services.tenants data/schools
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from services.metrics import forget_dataset
+from services.sharded_manager import ShardedStudentManager
+from services.student_manager import StudentManager
+
+DATA_FILE_NAME = 'students.json'
+SHARD_DIR_NAME = 'shards'
+
+
+class TenantRegistry:
+    """
+    Lazily created, LRU-evicted managers keyed by school
+
+    A tenant used within the last ``min_idle_seconds`` is never evicted, even
+    over budget, so a manager a request (or Streamlit session) is still
+    working with is not replaced by a second copy of the same data file.
+    """
+
+    def __init__(self, tenants, memory_budget_mb=512, min_idle_seconds=60, change_feed=False):
+        """
+        Args:
+            tenants (dict): key -> {'name', and 'data_file' or 'shard_dir',
+                optional 'encoding'}
+            memory_budget_mb (float): Estimated manager memory to stay under
+            min_idle_seconds (float): Minimum time since last access before
+                a tenant may be evicted
+            change_feed (bool): Create managers with a change feed
+
+        Raises:
+            ValueError: If a tenant has neither a data file nor a shard directory
+        """
+        for key, config in tenants.items():
+            if not config.get('data_file') and not config.get('shard_dir'):
+                raise ValueError(f"Tenant {key!r} needs a data_file or shard_dir")
+        self.tenants = dict(tenants)
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.min_idle_seconds = min_idle_seconds
+        self.change_feed = change_feed
+        self._managers = OrderedDict()   # key -> manager, LRU order
+        self._last_used = {}             # key -> monotonic time of last get()
+        self._lock = threading.Lock()
+        self._key_locks = {}             # key -> lock held while creating its manager
+        self.evictions = 0
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """
+        Registry for the tenants listed in a JSON file
+
+        Relative paths in the file are resolved against the file's directory.
+        """
+        with open(path, encoding='utf-8') as f:
+            tenants = json.load(f)
+        base = os.path.dirname(os.path.abspath(path))
+        for config in tenants.values():
+            for field in ('data_file', 'shard_dir'):
+                if config.get(field):
+                    config[field] = os.path.join(base, config[field])
+        return cls(tenants, **kwargs)
+
+    @classmethod
+    def from_directory(cls, root, **kwargs):
+        """
+        Registry with one tenant per subdirectory of ``root``
+
+        A subdirectory with a shards/ directory uses sharded storage;
+        anything else uses (or will create) students.json.
+        """
+        tenants = {}
+        for key in sorted(os.listdir(root)):
+            path = os.path.join(root, key)
+            if not os.path.isdir(path) or key.startswith('.'):
+                continue
+            shard_dir = os.path.join(path, SHARD_DIR_NAME)
+            if os.path.isdir(shard_dir):
+                tenants[key] = {'name': key, 'shard_dir': shard_dir}
+            else:
+                tenants[key] = {'name': key, 'data_file': os.path.join(path, DATA_FILE_NAME)}
+        return cls(tenants, **kwargs)
+
+    @classmethod
+    def from_path(cls, path, **kwargs):
+        """Registry from a tenants JSON file or a directory of schools"""
+        if os.path.isdir(path):
+            return cls.from_directory(path, **kwargs)
+        return cls.from_file(path, **kwargs)
+
+    def keys(self):
+        """Tenant keys in configuration order"""
+        return list(self.tenants)
+
+    def name(self, key):
+        """Display name of a tenant"""
+        return self.tenants[key].get('name', key)
+
+    def is_loaded(self, key):
+        """Whether a tenant currently has a manager in memory"""
+        return key in self._managers
+
+    def _create(self, key):
+        """New manager for a tenant's storage"""
+        config = self.tenants[key]
+        if config.get('shard_dir'):
+            return ShardedStudentManager(data_dir=config['shard_dir'],
+                                         encoding=config.get('encoding', 'compact'),
+                                         change_feed=self.change_feed)
+        return StudentManager(data_file=config['data_file'],
+                              encoding=config.get('encoding', 'pretty'),
+                              change_feed=self.change_feed)
+
+    def get(self, key):
+        """
+        Manager for a tenant, creating it on first access
+
+        Args:
+            key (str): Tenant key
+
+        Returns:
+            StudentManager: The tenant's manager
+
+        Raises:
+            KeyError: If the tenant is unknown
+        """
+        if key not in self.tenants:
+            raise KeyError(f"Unknown tenant: {key}")
+        with self._lock:
+            manager = self._managers.get(key)
+            if manager is not None:
+                self._managers.move_to_end(key)
+                self._last_used[key] = time.monotonic()
+                return manager
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other tenants stay available
+        with key_lock:
+            with self._lock:
+                manager = self._managers.get(key)
+            if manager is None:
+                manager = self._create(key)
+            with self._lock:
+                self._managers[key] = manager
+                self._managers.move_to_end(key)
+                self._last_used[key] = time.monotonic()
+                self._evict_over_budget(keep=key)
+        return manager
+
+    def _evict_over_budget(self, keep):
+        """Drop idle tenants, least recently used first, until under budget"""
+        usage = {key: manager.estimated_memory() for key, manager in self._managers.items()}
+        total = sum(usage.values())
+        now = time.monotonic()
+        for key in list(self._managers):
+            if total <= self.memory_budget:
+                break
+            if key == keep or now - self._last_used[key] < self.min_idle_seconds:
+                continue
+            if self._managers[key].is_loading():
+                continue
+            forget_dataset(self._managers.pop(key).data_file)
+            del self._last_used[key]
+            total -= usage[key]
+            self.evictions += 1
+
+    def evict(self, key):
+        """
+        Drop a tenant's manager regardless of budget
+
+        Returns:
+            bool: True if it was loaded
+        """
+        with self._lock:
+            self._last_used.pop(key, None)
+            manager = self._managers.pop(key, None)
+            if manager is None:
+                return False
+            forget_dataset(manager.data_file)
+            return True
+
+    def memory_usage(self):
+        """
+        Estimated memory of every loaded tenant
+
+        Returns:
+            dict: key -> bytes, least recently used first
+        """
+        with self._lock:
+            return {key: manager.estimated_memory() for key, manager in self._managers.items()}
+
+    def stats(self):
+        """Summary for monitoring"""
+        usage = self.memory_usage()
+        return {
+            'tenants': len(self.tenants),
+            'loaded': len(usage),
+            'estimated_bytes': sum(usage.values()),
+            'budget_bytes': self.memory_budget,
+            'evictions': self.evictions,
+        }
+
+
+def main(argv=None):
+    """List the tenants of a registry file or directory"""
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("Usage: python -m services.tenants <tenants.json | schools directory>")
+        return 2
+    registry = TenantRegistry.from_path(argv[0])
+    for key in registry.keys():
+        config = registry.tenants[key]
+        print(f"{key}\t{registry.name(key)}\t{config.get('shard_dir') or config['data_file']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
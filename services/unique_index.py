@@ -0,0 +1,120 @@
+"""
+Unique Index
+Hash index from a normalized field value to the one student holding it
+"""
+
+
+class UniqueIndex:
+    """
+    Maps the canonical form of a field (e.g. lowercased email) to a student ID
+
+    Lookups and uniqueness checks are O(1). Rosters saved before uniqueness
+    was enforced may already contain duplicates; the first holder owns the
+    key and later holders are remembered, so loading never fails and the
+    key passes to the next holder when the owner leaves.
+    """
+
+    def __init__(self, field, normalize):
+        """
+        Args:
+            field (str): Student attribute to index
+            normalize (callable): Maps a raw value to its canonical key
+        """
+        self.field = field
+        self.normalize = normalize
+        self._owners = {}       # key -> student_id
+        self._extra = {}        # key -> later student_ids sharing the key
+
+    def key_for(self, student):
+        """Canonical key of a student's field value"""
+        return self.normalize(getattr(student, self.field))
+
+    def build(self, students):
+        """
+        Rebuild the index from scratch
+
+        Args:
+            students (iterable): Student objects
+        """
+        owners = {}
+        extra = {}
+        field, normalize = self.field, self.normalize
+        for student in students:
+            key = normalize(getattr(student, field))
+            owner = owners.setdefault(key, student.student_id)
+            if owner != student.student_id:
+                extra.setdefault(key, []).append(student.student_id)
+        self._owners = owners
+        self._extra = extra
+
+    def add(self, student):
+        """
+        Index a student's value
+
+        Args:
+            student (Student): Student to add
+        """
+        key = self.key_for(student)
+        owner = self._owners.setdefault(key, student.student_id)
+        if owner != student.student_id:
+            self._extra.setdefault(key, []).append(student.student_id)
+
+    def remove(self, student):
+        """
+        Remove a student's current value from the index
+
+        Args:
+            student (Student): Student to remove (before its field changes)
+        """
+        key = self.key_for(student)
+        extra = self._extra.get(key)
+        if self._owners.get(key) == student.student_id:
+            if extra:
+                self._owners[key] = extra.pop(0)
+            else:
+                del self._owners[key]
+        elif extra and student.student_id in extra:
+            extra.remove(student.student_id)
+        if extra is not None and not extra:
+            del self._extra[key]
+
+    def owner(self, value):
+        """
+        Student ID holding a value
+
+        Args:
+            value (str): Raw field value; normalized before lookup
+
+        Returns:
+            str or None: Student ID, or None if the value is free
+        """
+        return self._owners.get(self.normalize(value))
+
+    def holders(self, value):
+        """
+        Every student ID holding a value, owner first
+
+        Args:
+            value (str): Raw field value; normalized before lookup
+
+        Returns:
+            list: Student IDs (more than one only for legacy duplicates)
+        """
+        key = self.normalize(value)
+        owner = self._owners.get(key)
+        if owner is None:
+            return []
+        return [owner] + self._extra.get(key, [])
+
+    def duplicates(self):
+        """
+        Values shared by more than one student (saved before enforcement)
+
+        Returns:
+            dict: key -> list of student IDs, owner first
+        """
+        return {key: [self._owners[key]] + ids for key, ids in self._extra.items()}
+
+    def __len__(self):
+        """Number of distinct values"""
+        return len(self._owners)
@@ -5,6 +5,9 @@ Provides input validation functions for student data
 
 import re
 
+# Separators Validator.normalize_phone strips from phone numbers
+_PHONE_SEPARATORS = re.compile(r'[\s\-\(\)\+]')
+
 class ValidationError(Exception):
     """Custom exception for validation errors"""
     pass
@@ -124,8 +127,7 @@ class Validator:
         if not phone or not phone.strip():
             return False, "Phone number cannot be empty"
         
-        # Remove common separators
-        cleaned_phone = re.sub(r'[\s\-\(\)\+]', '', phone)
+        cleaned_phone = Validator.normalize_phone(phone)
         
         if not cleaned_phone.isdigit():
             return False, "Phone number can only contain digits, spaces, hyphens, and parentheses"
@@ -135,6 +137,33 @@ class Validator:
         
         return True, ""
     
+    @staticmethod
+    def normalize_email(email):
+        """
+        Canonical form of an email for duplicate checks
+        
+        Args:
+            email (str): Email address
+            
+        Returns:
+            str: Trimmed, lowercased email
+        """
+        return email.strip().lower()
+    
+    @staticmethod
+    def normalize_phone(phone):
+        """
+        Canonical form of a phone number for validation and duplicate checks
+        
+        Args:
+            phone (str): Phone number
+            
+        Returns:
+            str: The number with spaces, hyphens, parentheses and '+' removed
+        """
+        # Remove common separators
+        return _PHONE_SEPARATORS.sub('', phone)
+    
     @staticmethod
     def validate_performance(performance):
         """
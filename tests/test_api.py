@@ -0,0 +1,53 @@
+"""
+HTTP API: request bodies with values of the wrong JSON type
+"""
+
+import http.client
+import json
+
+import pytest
+
+from services.api import serve
+from services.student_manager import StudentManager
+
+ADA = {'student_id': 'API001', 'name': 'Ada Lovelace', 'age': 12, 'grade': '6',
+       'email': 'adalovelace@school.org', 'phone': '+15550000001', 'performance': 'Good'}
+
+
+@pytest.fixture
+def api(tmp_path):
+    server = serve(StudentManager(str(tmp_path / 'students.json')), port=0)
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+
+    def request(method, path, body):
+        connection.request(method, path, body=json.dumps(body),
+                           headers={'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    yield request
+    connection.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_mistyped_fields_are_field_errors(api):
+    status, body = api('POST', '/students', dict(ADA, name=123, grade=6, age=[12]))
+    assert status == 400
+    assert body['errors'] == ["name must be a string", "grade must be a string",
+                              "age must be an integer"]
+
+    assert api('POST', '/students', ADA)[0] == 201
+    status, body = api('PATCH', '/students/API001', {'phone': 5550000001})
+    assert status == 400
+    assert body['errors'] == ["phone must be a string"]
+    status, body = api('PATCH', '/students/API001', {'age': '13'})    # digits, as the form sends
+    assert status == 200 and body['age'] == 13
+
+
+def test_import_rejects_only_the_mistyped_records(api):
+    alan = dict(ADA, student_id='API002', name='Alan Turing', email='alanturing@school.org',
+                phone='+15550000002')
+    status, body = api('POST', '/students/import', [dict(ADA, student_id=7), alan])
+    assert status == 200
+    assert body['added'] == 1
+    assert [r['errors'] for r in body['rejected']] == [["student_id must be a string"]]
@@ -0,0 +1,101 @@
+"""
+Change feed shared by several writers on one data file
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from services.change_feed import ChangeFeed, changes_path, tail
+from services.student_manager import StudentManager, TransactionError
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STUDENTS = {
+    'APP001': ('Ada Lovelace', 'adalovelace@school.org', '+15550000001'),
+    'APP002': ('Grace Hopper', 'gracehopper@school.org', '+15550000003'),
+    'CLI001': ('Alan Turing', 'alanturing@school.org', '+15550000002'),
+    'CLI002': ('Edsger Dijkstra', 'edsgerdijkstra@school.org', '+15550000004'),
+}
+
+
+def add(manager, student_id):
+    name, email, phone = STUDENTS[student_id]
+    success, result = manager.add_student(student_id, name, 12, '6', email, phone, 'Good')
+    assert success, result
+
+
+def saved_ids(data_file):
+    with open(data_file) as f:
+        return sorted(record['student_id'] for record in json.load(f))
+
+
+def test_two_managers_on_one_file_keep_every_write(tmp_path):
+    data_file = str(tmp_path / 'students.json')
+    app = StudentManager(data_file, change_feed=True)
+    cli = StudentManager(data_file, change_feed=True)
+    add(cli, 'CLI001')
+    add(app, 'APP001')    # reloads the file first: its roster and last_seq were stale
+
+    assert saved_ids(data_file) == ['APP001', 'CLI001']
+    assert sorted(s.student_id for s in app.get_all_students()) == ['APP001', 'CLI001']
+    events = [(e['seq'], e['op'], e['student_id']) for e in tail(changes_path(data_file))]
+    assert events == [(1, 'insert', 'CLI001'), (2, 'insert', 'APP001')]
+    assert app.change_feed.last_seq == 2
+
+
+def test_save_over_a_concurrent_write_is_refused(tmp_path):
+    data_file = str(tmp_path / 'students.json')
+    app = StudentManager(data_file, change_feed=True)
+    cli = StudentManager(data_file, change_feed=True)
+    with pytest.raises(TransactionError):
+        with app.transaction():
+            add(app, 'APP001')
+            add(cli, 'CLI001')    # lands between the app's load and its save
+
+    # The file and the feed agree: only the write that reached disk is listed
+    assert saved_ids(data_file) == ['CLI001']
+    assert [e['student_id'] for e in tail(changes_path(data_file))] == ['CLI001']
+    assert app.get_student_by_id('APP001') is None
+    add(app, 'APP002')
+    assert saved_ids(data_file) == ['APP002', 'CLI001']
+
+
+def test_foreign_events_reach_subscribers(tmp_path):
+    path = str(tmp_path / 'students.json.changes')
+    mine = ChangeFeed(path)
+    seen = []
+    mine.subscribe(seen.append)
+    ChangeFeed(path).publish([{'op': 'delete', 'student_id': 'X1', 'fields': {}}])
+    assert [e['seq'] for e in mine.read()] == [1]
+    assert [e['student_id'] for e in seen] == ['X1']
+
+
+def test_concurrent_processes_number_without_gaps(tmp_path):
+    path = str(tmp_path / 'students.json.changes')
+    script = (
+        "import sys\n"
+        "from services.change_feed import ChangeFeed\n"
+        "feed = ChangeFeed(sys.argv[1])\n"
+        "for i in range(200):\n"
+        "    feed.publish([{'op': 'delete', 'student_id': sys.argv[2] + str(i), 'fields': {}}])\n"
+    )
+    writers = [subprocess.Popen([sys.executable, '-c', script, path, name], cwd=ROOT)
+               for name in ('a', 'b', 'c')]
+    for writer in writers:
+        assert writer.wait() == 0
+    seqs = [event['seq'] for event in tail(path)]
+    assert seqs == list(range(1, 601))
+
+
+def test_torn_line_is_replaced_by_next_append(tmp_path):
+    path = str(tmp_path / 'students.json.changes')
+    ChangeFeed(path).publish([{'op': 'delete', 'student_id': 'A', 'fields': {}}])
+    with open(path, 'ab') as f:
+        f.write(b'{"seq":2,"ts":1')   # crash mid-append
+    feed = ChangeFeed(path)
+    feed.publish([{'op': 'delete', 'student_id': 'B', 'fields': {}}])
+    assert [(e['seq'], e['student_id']) for e in tail(path)] == [(1, 'A'), (2, 'B')]
@@ -0,0 +1,25 @@
+"""
+Columnar snapshots rewritten while a reader has them mapped
+"""
+
+from services.columnar import ColumnarSnapshot, write_snapshot
+
+ROWS = [
+    {'student_id': 'COL001', 'name': 'Ada Lovelace', 'age': 12, 'grade': '6',
+     'email': 'adalovelace@school.org', 'phone': '+15550000001', 'performance': 'Good'},
+    {'student_id': 'COL002', 'name': 'Alan Turing', 'age': 13, 'grade': '7',
+     'email': 'alanturing@school.org', 'phone': '+15550000002', 'performance': 'Excellent'},
+]
+
+
+def test_open_snapshot_survives_a_rewrite(tmp_path):
+    path = str(tmp_path / 'students.smsc')
+    write_snapshot(path, ROWS)
+    with ColumnarSnapshot(path) as old:
+        write_snapshot(path, ROWS[:1])
+        # The mapped file was replaced, not truncated underneath the reader
+        assert old.get_student_by_id('COL002').name == 'Alan Turing'
+        with ColumnarSnapshot(path) as new:
+            assert len(new) == 1
+    assert [p.name for p in tmp_path.iterdir()] == ['students.smsc']
+
@@ -0,0 +1,25 @@
+"""
+Candidate blocking for near-duplicate detection
+"""
+
+from models.student import Student
+from services.dedupe import find_near_duplicates
+
+
+def student(student_id, name, email):
+    return Student(student_id, name, 12, '6', email, '+15550000001', 'Good')
+
+
+def test_shared_email_is_compared_despite_a_respelled_name():
+    # Too few name trigrams in common to share a name band
+    pairs = find_near_duplicates([student('DUP001', 'Jon Smyth', 'jsmith@school.org'),
+                                  student('DUP002', 'John Smith', 'jsmith@school.org')],
+                                 threshold=0.6)
+    assert [(p['left'], p['right']) for p in pairs] == [('DUP001', 'DUP002')]
+    assert pairs[0]['fields']['email'] == 1.0
+
+
+def test_unrelated_students_are_not_reported():
+    pairs = find_near_duplicates([student('DUP001', 'Ada Lovelace', 'adalovelace@school.org'),
+                                  student('DUP002', 'Alan Turing', 'alanturing@school.org')])
+    assert pairs == []
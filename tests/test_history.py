@@ -0,0 +1,41 @@
+"""
+Point-in-time views and the History that records them
+"""
+
+import os
+import time
+
+import pytest
+
+from services.history import History
+from services.student_manager import StudentManager
+
+
+def add(manager):
+    success, result = manager.add_student('HIS001', 'Ada Lovelace', 12, '6',
+                                          'adalovelace@school.org', '+15550000001', 'Good')
+    assert success, result
+
+
+def test_view_is_read_only_and_has_no_archive(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = StudentManager(str(tmp_path / 'students.json'), change_feed=True)
+    history = History(manager)
+    add(manager)
+
+    view = history.as_of(time.time())
+    assert view.get_student_by_id('HIS001') is not None
+    assert view.get_statistics()['archived'] == 0
+    for mutation in (view.archive_students, view.restore_students):
+        with pytest.raises(TypeError):
+            mutation(['HIS001'])
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('history@')]
+
+
+def test_close_unsubscribes_from_the_feed(tmp_path):
+    manager = StudentManager(str(tmp_path / 'students.json'), change_feed=True)
+    before = len(manager.change_feed._subscribers)
+    history = History(manager)
+    assert len(manager.change_feed._subscribers) == before + 1
+    history.close()
+    assert len(manager.change_feed._subscribers) == before
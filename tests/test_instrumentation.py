@@ -0,0 +1,15 @@
+"""
+Rerun timing recorded once per script run
+"""
+
+from services.instrumentation import Profiler
+
+
+def test_each_rerun_is_recorded_once():
+    profiler = Profiler()
+    for _ in range(3):
+        profiler.start_rerun()
+        assert profiler.elapsed() >= 0
+        assert profiler.finish_rerun() > 0
+        assert profiler.finish_rerun() == 0.0
+    assert profiler.percentiles()['rerun.total']['count'] == 3
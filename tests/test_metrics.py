@@ -0,0 +1,33 @@
+"""
+Dataset gauges labelled per data file
+"""
+
+from services import metrics
+from services.student_manager import StudentManager
+from services.tenants import TenantRegistry
+
+
+def add(manager, student_id, name, email):
+    success, result = manager.add_student(student_id, name, 12, '6', email, '+15550000001', 'Good')
+    assert success, result
+
+
+def test_each_data_file_reports_its_own_series(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics.registry, 'enabled', True)
+    north = str(tmp_path / 'north' / 'students.json')
+    south = str(tmp_path / 'south' / 'students.json')
+    registry = TenantRegistry({'north': {'name': 'North', 'data_file': north},
+                               'south': {'name': 'South', 'data_file': south}})
+    add(registry.get('north'), 'NOR001', 'Ada Lovelace', 'adalovelace@school.org')
+    registry.get('south')
+
+    text = metrics.registry.render()
+    assert f'sms_students{{data_file="{north}"}} 1' in text
+    assert f'sms_students{{data_file="{south}"}} 0' in text
+    assert f'sms_data_file_bytes{{data_file="{north}"}}' in text
+
+    registry.evict('north')
+    text = metrics.registry.render()
+    assert f'data_file="{north}"' not in text
+    assert f'sms_students{{data_file="{south}"}} 0' in text
+    metrics.forget_dataset(south)
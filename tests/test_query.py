@@ -0,0 +1,101 @@
+"""
+Query language: operators, precedence and literal conversion per field
+"""
+
+import pytest
+
+from services.query import QueryError
+from services.student_manager import StudentManager
+
+ROSTER = [
+    # student_id, name, age, grade, email, phone, performance
+    ('00123', 'Ada Lovelace', 12, '6', 'adalovelace@school.org', '0123456789', 'Excellent'),
+    ('STU002', 'Alan Turing', 15, '9', 'alanturing@mail.net', '+15550000002', 'Good'),
+    ('STU003', 'Grace Hopper', 17, 'Junior', 'gracehopper@school.org', '+15550000003', 'Average'),
+    ('STU004', 'Edsger Dijkstra', 18, 'Senior', 'edsgerdijkstra@academy.edu', '+15550000004', 'Poor'),
+]
+
+
+@pytest.fixture(scope='module')
+def manager(tmp_path_factory):
+    manager = StudentManager(str(tmp_path_factory.mktemp('query') / 'students.json'))
+    for row in ROSTER:
+        success, result = manager.add_student(*row)
+        assert success, result
+    return manager
+
+
+def ids(manager, text):
+    return sorted(s.student_id for s in manager.query(text))
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('age = 15', ['STU002']),
+    ('age == 15', ['STU002']),
+    ('age != 15', ['00123', 'STU003', 'STU004']),
+    ('age < 15', ['00123']),
+    ('age <= 15', ['00123', 'STU002']),
+    ('age > 17', ['STU004']),
+    ('age >= 17', ['STU003', 'STU004']),
+    ('grade in (6, Senior)', ['00123', 'STU004']),
+    ('grade not in (6, Senior)', ['STU002', 'STU003']),
+    ('age between 15 and 17', ['STU002', 'STU003']),
+    ('name contains "hop"', ['STU003']),
+    ('name startswith al', ['STU002']),
+    ('email endswith "@school.org"', ['00123', 'STU003']),
+    ('performance >= Good', ['00123', 'STU002']),
+    ('performance = Below Average', []),
+])
+def test_operators(manager, text, expected):
+    assert ids(manager, text) == expected
+
+
+def test_and_binds_tighter_than_or(manager):
+    assert ids(manager, 'age < 13 or age > 14 and grade = Senior') == ['00123', 'STU004']
+    assert ids(manager, '(age < 13 or age > 14) and grade = Senior') == ['STU004']
+    assert ids(manager, 'not age < 13 and not grade = Senior') == ['STU002', 'STU003']
+
+
+def test_between_grades_uses_school_order(manager):
+    # 9 comes after 6 and before Freshman..Senior, not in string order
+    assert ids(manager, 'grade between 6 and 9') == ['00123', 'STU002']
+    assert ids(manager, 'grade between 9 and Junior') == ['STU002', 'STU003']
+    assert ids(manager, 'grade between Senior and 6') == []
+
+
+def test_bare_numbers_keep_leading_zeros(manager):
+    assert ids(manager, 'student_id = 00123') == ['00123']
+    assert ids(manager, 'student_id in (00123, STU004)') == ['00123', 'STU004']
+    assert ids(manager, 'phone = 0123456789') == ['00123']
+    assert ids(manager, 'phone startswith 0123') == ['00123']
+    assert ids(manager, 'age = 012') == ['00123']
+
+
+def test_invalid_queries_raise(manager):
+    for text in ('', 'age', 'height = 3', 'age = twelve', 'grade = 13', 'email < x',
+                 'age between 1', '(age = 1'):
+        with pytest.raises(QueryError):
+            manager.query(text)
+
+
+@pytest.fixture(scope='module')
+def large(tmp_path_factory):
+    from benchmarks.generator import write_roster
+    path = str(tmp_path_factory.mktemp('planner') / 'students.json')
+    write_roster(path, 2000)
+    return StudentManager(path)
+
+
+@pytest.mark.parametrize('text, path', [
+    ('student_id = BEN0000042', 'ID lookup'),
+    ('age = 7 and grade = Senior', 'Intersection of 2 index paths'),
+    ('age between 5 and 6 or grade = KG', 'Union of 2 index paths'),
+    ('name startswith "zane w"', 'Sorted name index range'),
+    ('performance >= Good', 'Full scan'),
+])
+def test_planner_matches_a_full_scan(large, text, path):
+    from services.query import compile_query
+    assert path in large.explain_query(text)
+    predicate = compile_query(text).predicate
+    expected = sorted(s.student_id for s in large.get_all_students() if predicate(s))
+    assert expected and ids(large, text) == expected
@@ -0,0 +1,106 @@
+"""
+Schema versioning: lazy upgrades, background write-back and atomic saves
+"""
+
+import gzip
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from models.schema import SCHEMA_VERSION, VERSION_FIELD
+from models.student import Student
+from services.migration import migrate_file
+from services.storage import read_records, write_records
+from services.student_manager import StudentManager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def legacy_records(count):
+    """Unstamped (version 1) records"""
+    return [{'student_id': f"STU{i:05d}", 'name': f"Student Number{i}", 'age': 10 + i % 8,
+             'grade': '5', 'email': f"student{i}@school.org", 'phone': f"+1555{i:07d}",
+             'performance': 'Good'} for i in range(count)]
+
+
+def test_from_dict_upgrades_and_keeps_extra_fields():
+    record = dict(legacy_records(1)[0], age='12', guardian='Jane Doe')
+    student = Student.from_dict(record)
+    assert student.age == 12
+    assert student.extra == {'guardian': 'Jane Doe'}
+    data = student.to_dict()
+    assert data[VERSION_FIELD] == SCHEMA_VERSION
+    assert data['guardian'] == 'Jane Doe'
+
+
+def test_read_only_cli_leaves_file_intact(tmp_path):
+    # The write-back must finish (atomically) before a short-lived process exits
+    path = tmp_path / 'students.json'
+    write_records(str(path), legacy_records(8), 'pretty')
+    for _ in range(5):
+        result = subprocess.run(
+            [sys.executable, '-m', 'services.cli', '--data-file', str(path), 'stats'],
+            cwd=ROOT, capture_output=True, text=True, check=True)
+        assert json.loads(result.stdout)['total'] == 8   # stdout stays pure JSON lines
+        records = read_records(str(path))
+        assert len(records) == 8
+        assert all(r[VERSION_FIELD] == SCHEMA_VERSION for r in records)
+
+
+def test_reload_during_write_back_reads_whole_file(tmp_path):
+    path = str(tmp_path / 'students.json')
+    write_records(path, legacy_records(20000), 'compact')
+    manager = StudentManager(path)
+    manager.load_data()
+    assert len(manager.students) == 20000
+
+
+def test_failed_write_keeps_previous_file(tmp_path, monkeypatch):
+    path = str(tmp_path / 'students.json.gz')
+    write_records(path, legacy_records(3), 'gzip')
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(gzip.GzipFile, 'write', fail)
+    with pytest.raises(OSError):
+        write_records(path, legacy_records(5), 'gzip')
+    monkeypatch.undo()
+    assert len(read_records(path)) == 3
+    assert os.listdir(tmp_path) == ['students.json.gz']
+
+
+def test_save_cannot_slip_between_migration_check_and_swap(tmp_path, monkeypatch):
+    path = str(tmp_path / 'students.json')
+    manager = StudentManager(path)
+    assert manager.add_student('MIG001', 'Ada Lovelace', 12, '6', 'adalovelace@school.org',
+                               '+15550000001', 'Good')[0]
+    results = []
+    real_replace = os.replace
+
+    def replace(src, dst):
+        if src.endswith('.migrating'):
+            # Another session saves after the migration's last check
+            session = threading.Thread(target=lambda: results.append(manager.add_student(
+                'MIG002', 'Alan Turing', 13, '7', 'alanturing@school.org',
+                '+15550000002', 'Good')))
+            session.start()
+            session.join(timeout=0.3)
+            assert session.is_alive()    # waiting for the data file lock
+            real_replace(src, dst)
+            results.append(session)
+        else:
+            real_replace(src, dst)
+    monkeypatch.setattr(os, 'replace', replace)
+    migrate_file(path)
+    results.pop(0).join()
+
+    # The save saw the swapped file and rolled back instead of overwriting it
+    assert results == [(False, ["Failed to save data"])]
+    assert [r['student_id'] for r in read_records(path)] == ['MIG001']
+    assert manager.add_student('MIG002', 'Alan Turing', 13, '7', 'alanturing@school.org',
+                               '+15550000002', 'Good')[0]
+    assert [r['student_id'] for r in read_records(path)] == ['MIG001', 'MIG002']
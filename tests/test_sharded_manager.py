@@ -0,0 +1,107 @@
+"""
+Grade-sharded storage with a tiny shard cache, so every operation evicts
+"""
+
+import os
+
+import pytest
+
+from services.sharded_manager import ShardedStudentManager
+from services.storage import read_records
+
+
+def make_manager(tmp_path):
+    manager = ShardedStudentManager(data_dir=str(tmp_path / 'shards'), max_loaded_shards=1)
+    for student_id, name, grade in (('S001', 'Ada Lovelace', '5'), ('S002', 'Alan Turing', '5'),
+                                    ('S003', 'Grace Hopper', '6')):
+        success, result = manager.add_student(student_id, name, 11, grade,
+                                              f"pupil{student_id}@school.org",
+                                              f"+1555000{student_id[-3:]}", 'Good')
+        assert success, result
+    return manager
+
+
+def shard_ids(manager, grade):
+    return {r['student_id'] for r in read_records(manager._shard_path(grade))}
+
+
+def test_grade_change_moves_student_between_shard_files(tmp_path):
+    manager = make_manager(tmp_path)
+    assert manager.update_student('S001', grade='7') == (True, "Student updated successfully")
+
+    assert shard_ids(manager, '5') == {'S002'}
+    assert shard_ids(manager, '7') == {'S001'}
+    assert sorted(s.student_id for s in manager.get_all_students()) == ['S001', 'S002', 'S003']
+
+    manager.add_student('S004', 'Edsger Dijkstra', 11, '5', 'pupilS004@school.org',
+                        '+1555000004', 'Good')
+    assert {s.student_id for s in manager.filter_by_grade('5')} == {'S002', 'S004'}
+
+    reopened = ShardedStudentManager(data_dir=str(tmp_path / 'shards'), max_loaded_shards=1)
+    assert reopened.get_student_by_id('S001').grade == '7'
+    assert len(reopened.get_all_students()) == 4
+
+
+def test_update_survives_eviction_by_contact_checks(tmp_path):
+    make_manager(tmp_path)
+    manager = ShardedStudentManager(data_dir=str(tmp_path / 'shards'), max_loaded_shards=1)
+    # On a fresh manager, changing the email reads every shard to build the
+    # uniqueness index, evicting the shard of the student being updated
+    assert manager.update_student('S001', email='renamed@school.org')[0]
+    reopened = ShardedStudentManager(data_dir=str(tmp_path / 'shards'), max_loaded_shards=1)
+    assert reopened.get_student_by_id('S001').email == 'renamed@school.org'
+
+
+def test_edits_in_one_shard_survive_a_contact_index_build(tmp_path):
+    from benchmarks.generator import write_roster
+    from services.sharded_manager import convert_to_shards
+    roster = str(tmp_path / 'roster.json')
+    write_roster(roster, 200)
+    convert_to_shards(roster, str(tmp_path / 'shards'))
+    # Fewer cached shards than grades, on a fresh manager
+    manager = ShardedStudentManager(data_dir=str(tmp_path / 'shards'), max_loaded_shards=2)
+    first, second = [s.student_id for s in manager.filter_by_grade('Sophomore')][:2]
+
+    assert manager.update_student(first, name='Renamed Student')[0]
+    assert manager.get_student_by_id(first).name == 'Renamed Student'
+    assert manager.update_student(second, performance='Poor')[0]
+
+    reopened = ShardedStudentManager(data_dir=str(tmp_path / 'shards'), max_loaded_shards=2)
+    assert reopened.get_student_by_id(first).name == 'Renamed Student'
+    assert reopened.get_student_by_id(second).performance == 'Poor'
+
+
+def test_transaction_rolls_back_every_shard(tmp_path):
+    manager = make_manager(tmp_path)
+    with pytest.raises(KeyboardInterrupt):
+        with manager.transaction():
+            manager.update_student('S001', grade='6')
+            manager.delete_student('S003')
+            raise KeyboardInterrupt
+    assert shard_ids(manager, '5') == {'S001', 'S002'}
+    assert shard_ids(manager, '6') == {'S003'}
+    assert manager.get_student_by_id('S001').grade == '5'
+    assert [s.student_id for s in manager.filter_by_grade('6')] == ['S003']
+
+
+def test_failed_directory_write_rolls_back_the_shard(tmp_path):
+    manager = make_manager(tmp_path)
+    manager._append_directory = lambda entries: False
+    assert manager.update_student('S001', grade='7') == (False, ["Failed to save data"])
+    assert shard_ids(manager, '5') == {'S001', 'S002'}
+    assert not os.path.exists(manager._shard_path('7'))
+    assert manager.get_student_by_id('S001').grade == '5'
+
+
+def test_archive_and_restore(tmp_path):
+    manager = make_manager(tmp_path)
+    assert manager.archive_students(where='grade = 5') == 2
+    assert shard_ids(manager, '6') == {'S003'}
+    assert not os.path.exists(manager._shard_path('5'))
+    assert manager.is_archived('S001')
+    assert manager.get_statistics(include_archived=True)['total'] == 3
+
+    reopened = ShardedStudentManager(data_dir=str(tmp_path / 'shards'), max_loaded_shards=1)
+    assert reopened.restore_students(['S001', 'S003']) == (1, [('S003', ["Student is not archived"])])
+    assert reopened.get_student_by_id('S001').grade == '5'
+    assert shard_ids(reopened, '5') == {'S001'}
@@ -0,0 +1,27 @@
+"""
+Data file encodings chosen when a manager is created
+"""
+
+import pytest
+
+from services.sharded_manager import ShardedStudentManager
+from services.student_manager import StudentManager
+
+
+def test_unknown_encoding_is_rejected_up_front(tmp_path):
+    # A typo in SMS_DATA_ENCODING used to surface only as a failed save
+    with pytest.raises(ValueError, match='Encoding must be one of'):
+        StudentManager(str(tmp_path / 'students.json'), encoding='gzipped')
+    with pytest.raises(ValueError, match='Encoding must be one of'):
+        ShardedStudentManager(str(tmp_path / 'shards'), encoding='lz')
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_every_encoding_round_trips(tmp_path):
+    for encoding in ('pretty', 'compact', 'gzip', 'lzma'):
+        path = str(tmp_path / f'{encoding}.json')
+        manager = StudentManager(path, encoding=encoding)
+        success, result = manager.add_student('ENC001', 'Ada Lovelace', 12, '6',
+                                              'adalovelace@school.org', '+15550000001', 'Good')
+        assert success, result
+        assert StudentManager(path).get_student_by_id('ENC001').name == 'Ada Lovelace'
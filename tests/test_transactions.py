@@ -0,0 +1,105 @@
+"""
+Transactions: one save for many changes, all undone on failure
+"""
+
+import json
+import threading
+
+import pytest
+
+from services.change_feed import changes_path, tail
+from services.student_manager import StudentManager, TransactionError
+
+STUDENTS = {
+    'TXN001': ('Ada Lovelace', 'adalovelace@school.org', '+15550000001'),
+    'TXN002': ('Alan Turing', 'alanturing@school.org', '+15550000002'),
+    'TXN003': ('Grace Hopper', 'gracehopper@school.org', '+15550000003'),
+}
+
+
+def add(manager, student_id):
+    name, email, phone = STUDENTS[student_id]
+    success, result = manager.add_student(student_id, name, 12, '6', email, phone, 'Good')
+    assert success, result
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = StudentManager(str(tmp_path / 'students.json'), change_feed=True)
+    add(manager, 'TXN001')
+    return manager
+
+
+def saved_ids(manager):
+    with open(manager.data_file) as f:
+        return sorted(record['student_id'] for record in json.load(f))
+
+
+def test_exception_undoes_every_change(manager):
+    with pytest.raises(RuntimeError):
+        with manager.transaction():
+            add(manager, 'TXN002')
+            manager.update_student('TXN001', performance='Poor')
+            manager.delete_student('TXN001')
+            raise RuntimeError("abort")
+
+    assert [s.student_id for s in manager.get_all_students()] == ['TXN001']
+    assert manager.get_student_by_id('TXN001').performance == 'Good'
+    assert manager.get_student_by_id('TXN002') is None
+    assert saved_ids(manager) == ['TXN001']
+    # The rolled-back student's contact details are free again
+    add(manager, 'TXN002')
+
+
+def test_nested_transactions_join_the_outermost(manager):
+    saves = []
+    original = manager.save_data
+    manager.save_data = lambda: saves.append(1) or original()
+    with manager.transaction():
+        add(manager, 'TXN002')
+        with manager.transaction():
+            add(manager, 'TXN003')
+        assert saved_ids(manager) == ['TXN001']
+    assert len(saves) == 1
+    assert saved_ids(manager) == ['TXN001', 'TXN002', 'TXN003']
+    events = [(e['op'], e['student_id']) for e in tail(changes_path(manager.data_file))]
+    assert events[-2:] == [('insert', 'TXN002'), ('insert', 'TXN003')]
+
+
+def test_failed_save_rolls_back_and_publishes_nothing(manager):
+    published = len(list(tail(changes_path(manager.data_file))))
+    manager.save_data = lambda: False
+    with pytest.raises(TransactionError):
+        with manager.transaction():
+            add(manager, 'TXN002')
+            manager.delete_student('TXN001')
+
+    assert [s.student_id for s in manager.get_all_students()] == ['TXN001']
+    assert len(list(tail(changes_path(manager.data_file)))) == published
+
+
+def test_other_threads_do_not_join_an_open_transaction(manager):
+    inside = threading.Event()
+    results = []
+
+    def other_session():
+        inside.wait()
+        results.append(manager.update_student('TXN001', performance='Excellent'))
+
+    other = threading.Thread(target=other_session)
+    other.start()
+    with pytest.raises(KeyboardInterrupt):
+        with manager.transaction():
+            add(manager, 'TXN002')
+            inside.set()
+            other.join(timeout=0.3)
+            assert other.is_alive()    # waiting for this transaction to finish
+            raise KeyboardInterrupt
+    other.join()
+
+    # The rollback undid only this thread's insert
+    assert results == [(True, "Student updated successfully")]
+    assert manager.get_student_by_id('TXN001').performance == 'Excellent'
+    assert manager.get_student_by_id('TXN002') is None
+    with open(manager.data_file) as f:
+        assert [r['performance'] for r in json.load(f)] == ['Excellent']
@@ -7,7 +7,9 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime
-import time
+from services.instrumentation import profiler, timed
+from services.dedupe import DEFAULT_THRESHOLD, find_near_duplicates
+from services.query import QueryError
 
 
 
@@ -16,6 +18,25 @@ GRADES = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12',
 
 PERFORMANCE_LEVELS = ['Excellent', 'Good', 'Average', 'Below Average', 'Poor']
 
+PICKER_LIMIT = 25
+FUZZY_LIMIT = 100
+DUPLICATE_PAGE_SIZE = 20
+TOP_K = 5
+DIRECTORY_PAGE_SIZE = 100
+
+SORT_OPTIONS = {
+    'Enrollment order': None,
+    'Name': 'name',
+    'Age': 'age',
+    'Grade': 'grade',
+    'Performance': 'performance',
+    'Student ID': 'student_id',
+}
+
+NEEDS_SUPPORT_LEVELS = ['Below Average', 'Poor']
+
+MERGEABLE_FIELDS = ['name', 'age', 'grade', 'email', 'phone', 'performance']
+
 PERFORMANCE_COLORS = {
     'Excellent': '#10b981',
     'Good': '#3b82f6',
@@ -34,8 +55,15 @@ def show_popup(title, message, icon="✅", type="success"):
         st.warning(f"{icon} **{title}**\n\n{message}")
     elif type == "info":
         st.info(f"{icon} **{title}**\n\n{message}")
-    
-    time.sleep(0.5)
+
+def queue_popup(title, message, icon="✅", type="success"):
+    """Queue a popup to be shown after the next rerun instead of sleeping"""
+    st.session_state.setdefault('pending_popups', []).append((title, message, icon, type))
+
+def render_pending_popups():
+    """Show popups queued by the previous rerun"""
+    for title, message, icon, type in st.session_state.pop('pending_popups', []):
+        show_popup(title, message, icon=icon, type=type)
 
 def render_dashboard_header():
     """Render sophisticated dashboard header"""
@@ -52,12 +80,16 @@ def render_dashboard_header():
     </div>
     """, unsafe_allow_html=True)
 
-def render_student_table(students):
-    """Render students in elegant table format"""
-    if not students:
-        st.info("📚 No students to display")
-        return
+def build_student_table(students):
+    """
+    Build the DataFrame shown by render_student_table
     
+    Args:
+        students (list): List of Student objects
+        
+    Returns:
+        pd.DataFrame: One row per student
+    """
     data = []
     for student in students:
         data.append({
@@ -70,7 +102,16 @@ def render_student_table(students):
             '⭐ Performance': student.performance
         })
     
-    df = pd.DataFrame(data)
+    return pd.DataFrame(data)
+
+@timed('ui.render_student_table')
+def render_student_table(students):
+    """Render students in elegant table format"""
+    if not students:
+        st.info("📚 No students to display")
+        return
+    
+    df = build_student_table(students)
     
     st.dataframe(
         df,
@@ -79,6 +120,34 @@ def render_student_table(students):
         height=450
     )
 
+@timed('ui.render_sorted_directory')
+def render_sorted_directory(manager):
+    """Render one server-sorted page of the roster instead of the whole list"""
+    total = len(manager.get_all_students())
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        sort_label = st.selectbox("Sort by", list(SORT_OPTIONS), key="directory_sort")
+    with col2:
+        descending = st.toggle("Descending", key="directory_descending")
+    pages = max(1, -(-total // DIRECTORY_PAGE_SIZE))
+    with col3:
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1,
+                               key="directory_page")
+    offset = (page - 1) * DIRECTORY_PAGE_SIZE
+    
+    key = SORT_OPTIONS[sort_label]
+    if key is None:
+        students = manager.get_all_students()
+        if descending:
+            students = students[::-1]
+        students = students[offset:offset + DIRECTORY_PAGE_SIZE]
+    else:
+        students = manager.sorted_view(key, descending=descending,
+                                       limit=DIRECTORY_PAGE_SIZE, offset=offset)
+    st.caption(f"Showing {offset + 1:,}–{offset + len(students):,} of {total:,}")
+    render_student_table(students)
+
+@timed('ui.render_add_student_form')
 def render_add_student_form(manager):
     """Render premium enrollment form"""
     with st.form("add_student_form", clear_on_submit=True):
@@ -145,7 +214,7 @@ def render_add_student_form(manager):
             )
             
             if success:
-                show_popup(
+                queue_popup(
                     "Student Enrolled Successfully",
                     f"✅ {name} has been added to the system.\n\n"
                     f"Student ID: {student_id}\n"
@@ -153,7 +222,6 @@ def render_add_student_form(manager):
                     icon="🎉",
                     type="success"
                 )
-                time.sleep(1)
                 st.rerun()
             else:
                 show_popup(
@@ -165,23 +233,58 @@ def render_add_student_form(manager):
                 for error in message:
                     st.error(f"• {error}")
 
+@timed('ui.render_student_picker')
+def render_student_picker(manager, label, key, help=None):
+    """
+    Render a typeahead student picker backed by the manager's prefix index
+    
+    Only the top PICKER_LIMIT matches for the typed prefix are sent to the
+    selectbox, so the widget stays small regardless of roster size.
+    
+    Args:
+        manager (StudentManager): Student manager
+        label (str): Selectbox label
+        key (str): Unique widget key prefix
+        help (str, optional): Selectbox help text
+        
+    Returns:
+        str or None: Selected student ID
+    """
+    query = st.text_input(
+        "Find Student",
+        placeholder="🔍 Type a student ID or name...",
+        key=f"{key}_query"
+    )
+    matches = manager.suggest_students(query, limit=PICKER_LIMIT)
+    
+    if not matches:
+        st.info("🔍 No students match that ID or name.")
+        return None
+    
+    labels = {s.student_id: f"🆔 {s.student_id} - 👤 {s.name}" for s in matches}
+    return st.selectbox(
+        label,
+        options=list(labels.keys()),
+        format_func=labels.get,
+        help=help,
+        key=f"{key}_select"
+    )
+
+@timed('ui.render_update_student_form')
 def render_update_student_form(manager):
     """Render premium update form"""
-    students = manager.get_all_students()
-    
-    if not students:
+    if not manager.get_all_students():
         st.warning("🎓 No students available. Please add students first.")
         return
     
-    student_options = {f"🆔 {s.student_id} - 👤 {s.name}": s.student_id for s in students}
-    selected = st.selectbox(
+    student_id = render_student_picker(
+        manager,
         "Select Student to Update",
-        options=list(student_options.keys()),
+        key="update_picker",
         help="Choose student to modify"
     )
     
-    if selected:
-        student_id = student_options[selected]
+    if student_id:
         student = manager.get_student_by_id(student_id)
         
         if student:
@@ -242,7 +345,7 @@ def render_update_student_form(manager):
                     )
                     
                     if success:
-                        show_popup(
+                        queue_popup(
                             "Student Updated Successfully",
                             f"✅ {name}'s information has been updated.\n\n"
                             f"Student ID: {student_id}\n"
@@ -250,7 +353,6 @@ def render_update_student_form(manager):
                             icon="💾",
                             type="success"
                         )
-                        time.sleep(1)
                         st.rerun()
                     else:
                         show_popup(
@@ -262,14 +364,23 @@ def render_update_student_form(manager):
                         for error in message:
                             st.error(f"• {error}")
 
+@timed('ui.render_search_filters')
 def render_search_filters(manager):
     """Render sophisticated search interface"""
     st.markdown("### 🔎 Quick Search")
-    search_query = st.text_input(
-        "",
-        placeholder="🔍 Search by name, ID, or email...",
-        label_visibility="collapsed"
-    )
+    col1, col2, col3 = st.columns([4, 1, 1])
+    with col1:
+        search_query = st.text_input(
+            "",
+            placeholder="🔍 Search by name, ID, or email...",
+            label_visibility="collapsed"
+        )
+    with col2:
+        fuzzy = st.toggle("Fuzzy", value=False,
+                          help="Typo-tolerant name matching, closest names first")
+    with col3:
+        include_archived = st.toggle("Archived", value=False,
+                                     help="Also search students moved to the archive")
     
     st.markdown("---")
     st.markdown("### 🎯 Advanced Filters")
@@ -296,10 +407,38 @@ def render_search_filters(manager):
             value=(5, 100)
         )
     
+    col1, col2 = st.columns([5, 1])
+    with col1:
+        advanced_query = st.text_input(
+            "🧮 Advanced query",
+            placeholder='grade in (10, 11) and performance >= Good and age between 15 and 17',
+            help="Fields: student_id, name, age, grade, email, phone, performance. "
+                 "Operators: = != < <= > >= in, not in, between, contains, startswith, "
+                 "endswith, combined with and / or / not and parentheses."
+        )
+    with col2:
+        show_plan = st.toggle("Explain", value=False,
+                              help="Show which index the query starts from")
+    
     filtered_students = manager.get_all_students()
     
-    if search_query:
-        filtered_students = manager.search_students(search_query)
+    if search_query and fuzzy:
+        filtered_students = manager.fuzzy_search(search_query, limit=FUZZY_LIMIT)
+    elif search_query:
+        filtered_students = manager.search_students(search_query, include_archived=include_archived)
+    
+    if advanced_query.strip():
+        try:
+            matches = manager.query(advanced_query)
+            if show_plan:
+                st.code(manager.explain_query(advanced_query), language=None)
+        except QueryError as e:
+            st.error(f"❌ {e}")
+            matches = []
+        if search_query:
+            allowed = {s.student_id for s in filtered_students}
+            matches = [s for s in matches if s.student_id in allowed]
+        filtered_students = matches
     
     if filter_grade != "All Grades":
         filtered_students = [s for s in filtered_students if s.grade == filter_grade]
@@ -346,6 +485,7 @@ def render_search_filters(manager):
     else:
         st.info("🔍 No students match your criteria. Try adjusting the filters.")
 
+@timed('ui.render_statistics_overview')
 def render_statistics_overview(manager):
     """Render comprehensive premium dashboard"""
     students = manager.get_all_students()
@@ -353,6 +493,8 @@ def render_statistics_overview(manager):
     
     st.markdown("## 📊 Analytics Dashboard")
     st.markdown(f"*Updated: {datetime.now().strftime('%B %d, %Y • %I:%M %p')}*")
+    if stats.get('archived'):
+        st.caption(f"🗄️ {stats['archived']:,} archived students are not included")
     
     if not students:
         st.info("🎓 No data available. Add students to see comprehensive analytics.")
@@ -410,11 +552,12 @@ def render_statistics_overview(manager):
     st.markdown("### 📊 Detailed Analytics")
     col1, col2, col3, col4, col5 = st.columns(5)
     
-    good_performers = len([s for s in students if s.performance in ['Excellent', 'Good']])
-    poor_performers = len([s for s in students if s.performance in ['Below Average', 'Poor']])
-    youngest = min(s.age for s in students)
-    oldest = max(s.age for s in students)
-    median_age = sorted([s.age for s in students])[len(students)//2]
+    performance_dist = stats['performance_distribution']
+    good_performers = sum(performance_dist.get(level, 0) for level in ['Excellent', 'Good'])
+    poor_performers = sum(performance_dist.get(level, 0) for level in NEEDS_SUPPORT_LEVELS)
+    youngest = manager.sorted_view('age', limit=1)[0].age
+    oldest = manager.sorted_view('age', descending=True, limit=1)[0].age
+    median_age = manager.sorted_view('age', offset=len(students)//2, limit=1)[0].age
     
     with col1:
         st.metric("🟢 High Achievers", good_performers, 
@@ -511,9 +654,10 @@ def render_statistics_overview(manager):
     
     with col1:
         st.markdown("### 🌟 Top Performers")
-        top_performers = [s for s in students if s.performance == 'Excellent']
+        top_performers = [s for s in manager.sorted_view('performance', limit=TOP_K)
+                          if s.performance == 'Excellent']
         if top_performers:
-            for student in top_performers[:5]:
+            for student in top_performers:
                 st.markdown(f"""
                 <div style='background: linear-gradient(135deg, #ecfdf5, #d1fae5); 
                             padding: 1rem 1.25rem; border-radius: 10px; 
@@ -529,9 +673,10 @@ def render_statistics_overview(manager):
     
     with col2:
         st.markdown("### ⚠️ Needs Attention")
-        need_support = [s for s in students if s.performance in ['Below Average', 'Poor']]
+        need_support = [s for s in manager.sorted_view('performance', descending=True, limit=TOP_K)
+                        if s.performance in NEEDS_SUPPORT_LEVELS]
         if need_support:
-            for student in need_support[:5]:
+            for student in need_support:
                 st.markdown(f"""
                 <div style='background: linear-gradient(135deg, #fef2f2, #fee2e2); 
                             padding: 1rem 1.25rem; border-radius: 10px; 
@@ -549,4 +694,103 @@ def render_statistics_overview(manager):
     st.markdown("### 📋 Complete Student Directory")
     render_student_table(students)
 
-    
\ No newline at end of file
+    
+@timed('ui.render_duplicate_review')
+def render_duplicate_review(manager):
+    """Render the near-duplicate scan with side-by-side merge actions"""
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        threshold = st.slider("🎚️ Match Threshold", min_value=0.5, max_value=1.0,
+                              value=DEFAULT_THRESHOLD, step=0.05,
+                              help="Lower finds more possible duplicates, with more false matches")
+    with col2:
+        st.markdown("<div style='padding-top: 1.75rem;'></div>", unsafe_allow_html=True)
+        if st.button("🔍 Scan for Duplicates", type="primary", use_container_width=True):
+            with st.spinner("Comparing records..."):
+                st.session_state.duplicate_pairs = find_near_duplicates(
+                    manager.get_all_students(), threshold)
+            st.session_state.dismissed_pairs = set()
+    
+    if 'duplicate_pairs' not in st.session_state:
+        st.info("🧬 Run a scan to find students who may be enrolled more than once.")
+        return
+    
+    # Drop pairs already merged, deleted or marked as distinct
+    dismissed = st.session_state.setdefault('dismissed_pairs', set())
+    pairs = [p for p in st.session_state.duplicate_pairs
+             if (p['left'], p['right']) not in dismissed
+             and manager.get_student_by_id(p['left'])
+             and manager.get_student_by_id(p['right'])]
+    
+    st.markdown(f"### 📋 {len(pairs)} Possible Duplicates")
+    if not pairs:
+        st.success("✅ No likely duplicates left to review.")
+        return
+    
+    for pair in pairs[:DUPLICATE_PAGE_SIZE]:
+        left = manager.get_student_by_id(pair['left'])
+        right = manager.get_student_by_id(pair['right'])
+        key = f"{pair['left']}|{pair['right']}"
+        with st.expander(f"{left.name} ({left.student_id}) ↔ {right.name} ({right.student_id}) — "
+                         f"{pair['score']:.0%} match"):
+            table = pd.DataFrame({
+                'Field': [field.title() for field in MERGEABLE_FIELDS],
+                left.student_id: [str(getattr(left, field)) for field in MERGEABLE_FIELDS],
+                right.student_id: [str(getattr(right, field)) for field in MERGEABLE_FIELDS],
+            })
+            st.dataframe(table, use_container_width=True, hide_index=True)
+            st.caption("Similarity: " + ", ".join(
+                f"{field} {value:.0%}" for field, value in pair['fields'].items()))
+            
+            keep_id = st.radio("Keep record", [left.student_id, right.student_id],
+                               horizontal=True, key=f"keep_{key}")
+            drop = right if keep_id == left.student_id else left
+            take = st.multiselect(f"Copy from {drop.student_id}", MERGEABLE_FIELDS,
+                                  key=f"take_{key}")
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("🔗 Merge", type="primary", use_container_width=True, key=f"merge_{key}"):
+                    fields = {field: getattr(drop, field) for field in take}
+                    success, result = manager.merge_students(keep_id, drop.student_id, fields)
+                    if success:
+                        queue_popup("Students Merged",
+                                    f"✅ {drop.student_id} was merged into {keep_id}.",
+                                    icon="🔗", type="success")
+                        st.rerun()
+                    else:
+                        for error in result:
+                            st.error(f"❌ {error}")
+            with col2:
+                if st.button("🙅 Not a Duplicate", use_container_width=True, key=f"dismiss_{key}"):
+                    dismissed.add((pair['left'], pair['right']))
+                    st.rerun()
+    
+    if len(pairs) > DUPLICATE_PAGE_SIZE:
+        st.caption(f"Showing the {DUPLICATE_PAGE_SIZE} strongest matches; "
+                   f"resolve them to see the next ones.")
+
+def render_performance_panel():
+    """Render the per-rerun timing breakdown and rolling percentiles"""
+    st.markdown("### ⏱️ PERFORMANCE")
+    st.caption(f"This rerun so far: {profiler.elapsed():.1f} ms")
+    
+    breakdown = profiler.current_breakdown()
+    if breakdown:
+        st.dataframe(
+            pd.DataFrame(breakdown, columns=['Span', 'Calls', 'ms']).round(2),
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    percentiles = profiler.percentiles()
+    if percentiles:
+        rolling_df = pd.DataFrame([
+            {'Span': name, 'n': row['count'], 'p50 ms': row['p50'], 'p95 ms': row['p95']}
+            for name, row in sorted(percentiles.items())
+        ]).round(2)
+        st.markdown("**Rolling p50 / p95**")
+        st.dataframe(rolling_df, use_container_width=True, hide_index=True)
+    
+    if st.button("Reset Timings", use_container_width=True):
+        profiler.reset()